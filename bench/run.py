@@ -0,0 +1,495 @@
+# run.py – Benchmarks sans écran ni GPU (build, normales, chargements, trackball, frame)
+# Python 3.x  +  NumPy  (+ Pillow pour les textures)
+#
+# Les mêmes scénarios tournent sur chaque viewer (cube, cube2, lesson10, car, ex3) :
+#   build     construction de la géométrie (cache disque désactivé)
+#   normals   calcul des normales sur les maillages construits
+#   world     lecture de World.txt (+ un monde synthétique de WORLD_POLYS triangles)
+#   texture   décodage (sans cache / cache disque) et upload de la texture
+#   trackball débit des mises à jour souris (on_mouse_motion, Trackball.drag / update)
+#   frame     coût CPU d'une frame (Renderer.render) + nombre d'appels GL (+ évités)
+#             + objets écartés / dessinés par le culling
+#   traffic   mode trafic (ex3) : pas de simulation, mise à jour des instances, frame
+#             (+ cpu_update_ms : même mise à jour sur le repli fixed-function, instances
+#             pré-transformées)
+#   import    ex3 : chargement d'un STL binaire de IMPORT_TRIANGLES triangles (temps + pic
+#             mémoire NumPy via tracemalloc), d'un PLY binaire et d'un OBJ
+#   simplify  décimation (common/simplify.py) d'une sphère dense à SIMPLIFY_RATIO
+#   variants  ex3 : VARIANTS voitures CarSpec (série / pool de processus) + build_car mémoïsé
+# Le rendu passe par le backend GL "record" (common/glbackend.py) : aucun contexte,
+# chaque frame est journalisée (appels, changements d'état, sommets soumis).
+#
+#   python bench/run.py                        # mesure + compare à bench/baseline.json
+#   python bench/run.py --save                 # (ré)écrit la baseline
+#   python bench/run.py --threshold 0.5 ex3    # +50 % toléré, un seul viewer
+# Code de sortie 1 si une mesure dépasse baseline × (1 + threshold).
+import argparse
+import contextlib
+import importlib.util
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, os.path.join(ROOT, "common"))
+import glbackend                     # noqa: E402
+
+recorder = glbackend.use("record")   # avant tout import de viewer
+import importers                     # noqa: E402
+import instancing                    # noqa: E402
+from mesh import weld                # noqa: E402
+from mesh_cache import MeshCache     # noqa: E402
+from normals import compute_normals  # noqa: E402
+from simplify import simplify        # noqa: E402
+from textures import Texture, TextureCache  # noqa: E402
+from world import load_world         # noqa: E402
+
+VIEWERS = {
+    "cube": "cube/main_cube.py",
+    "cube2": "cube2/main_cube2.py",
+    "lesson10": "lesson10/main.py",
+    "car": "car/main.py",
+    "ex3": "ex3_opengl_car_viewer/main.py",
+}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+WORLD_POLYS = 20000
+FRAMES = 50
+DRAG_STEPS = 500
+IMPORT_TRIANGLES = 5000000     # STL / PLY binaires
+IMPORT_OBJ_TRIANGLES = 200000  # OBJ (texte)
+SIMPLIFY_SPHERE = (128, 64)  # tranches, piles → 16 128 triangles
+SIMPLIFY_RATIO = 0.1
+VARIANTS = 64
+LOWER_IS_BETTER = ("ms", "us", "peak_mb", "gl_calls", "state_changes")  # métriques comparées
+VERBOSE_CALLS = 0  # --calls N : détail des N fonctions GL les plus appelées par frame
+
+
+# ───────────────────────────────────────────────
+# OUTILS
+# ───────────────────────────────────────────────
+def timed(fn, repeat=5, number=1):
+    """Médiane (en ms) de `repeat` mesures de `number` appels à fn."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return statistics.median(samples) * 1000.0
+
+
+@contextlib.contextmanager
+def viewer_dir(path):
+    # les viewers ouvrent leurs fichiers (textures, World.txt) en relatif
+    old = os.getcwd()
+    os.chdir(os.path.dirname(path))
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        yield
+    finally:
+        sys.path.remove(os.path.dirname(path))
+        os.chdir(old)
+
+
+def load_viewer(name):
+    path = os.path.join(ROOT, VIEWERS[name])
+    with viewer_dir(path):
+        spec = importlib.util.spec_from_file_location("viewer_" + name, path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+    mod.__bench_path__ = path
+    return mod
+
+
+def make_world(path, polys, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.uniform(-10, 10, (polys * 3, 5)).astype(np.float32)
+    with open(path, "w") as f:
+        f.write("NUMPOLLIES %d\n\n" % polys)
+        np.savetxt(f, rows, fmt="%.4f")
+
+
+def sector_meshes(sector):
+    return [v for k, v in sorted(vars(sector).items()) if k.startswith("triangles")]
+
+
+def new_sector(mod):
+    # ex3 / car passent par le cache disque : on le coupe pour mesurer le build
+    try:
+        return mod.Sector(cache=MeshCache(enabled=False))
+    except TypeError:
+        return mod.Sector()
+
+
+def new_app(mod):
+    app = mod.Renderer()
+    mod.app = app
+    app.init_gl()
+    mod.reshape(800, 600)
+    return app
+
+
+# ───────────────────────────────────────────────
+# SCÉNARIOS  (nom → fonction(mod) → dict de métriques, plus bas = mieux)
+# ───────────────────────────────────────────────
+def bench_build(name, mod):
+    if name == "lesson10":
+        world = os.path.join(os.path.dirname(mod.__bench_path__), "World.txt")
+        return {"ms": timed(lambda: weld(load_world(world)), repeat=7, number=20)}
+    out = {"ms": timed(lambda: new_sector(mod), repeat=7, number=5)}
+    if hasattr(mod, "ExtraModels"):
+        try:
+            extras = lambda: mod.ExtraModels(cache=MeshCache(enabled=False))
+            extras()
+        except TypeError:
+            extras = mod.ExtraModels
+        out["extras_ms"] = timed(extras, repeat=7, number=5)
+    return out
+
+
+def bench_normals(name, mod):
+    if name == "lesson10":
+        meshes = [mod.Sector.load_world_file("World.txt")]
+    else:
+        meshes = sector_meshes(new_sector(mod))
+    out = {"flat_ms": timed(lambda: [compute_normals(m) for m in meshes], repeat=7, number=5)}
+    out["crease_ms"] = timed(lambda: [compute_normals(m, 45.0) for m in meshes],
+                             repeat=7, number=5)
+    return out
+
+
+def bench_world(name, mod):
+    if name != "lesson10":
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "world.txt")
+        make_world(path, WORLD_POLYS)
+        return {
+            "ms": timed(lambda: load_world(path), repeat=3),
+            "weld_ms": timed(lambda: weld(load_world(path)), repeat=3),
+            "polys": WORLD_POLYS,
+        }
+
+
+def make_stl(path, triangles, seed=0, block=1000000):
+    rng = np.random.default_rng(seed)
+    with open(path, "wb") as f:
+        f.write(b"bench".ljust(importers.STL_HEADER, b" "))
+        f.write(np.uint32(triangles).tobytes())
+        for start in range(0, triangles, block):
+            rec = np.zeros(min(block, triangles - start), dtype=importers.STL_RECORD)
+            rec["v"] = rng.uniform(-10, 10, rec["v"].shape)
+            rec.tofile(f)
+
+
+def make_grid(triangles):
+    # grille n×n de quads : positions (V,3), triangles (T,3) — ≈ triangles au total
+    n = max(2, int(math.sqrt(triangles / 2.0)) + 1)
+    xs, zs = np.meshgrid(np.arange(n, dtype=np.float32), np.arange(n, dtype=np.float32))
+    pos = np.stack([xs.ravel(), np.sin(xs.ravel() * 0.1) * np.cos(zs.ravel() * 0.1),
+                    zs.ravel()], axis=1)
+    a = (np.arange(n - 1)[:, None] * n + np.arange(n - 1)).ravel()
+    tris = np.concatenate([np.stack([a, a + n, a + n + 1], 1), np.stack([a, a + n + 1, a + 1], 1)])
+    return pos, tris
+
+
+def make_ply(path, triangles, quads=False):
+    # quads=True : même grille en quadrilatères (chemin des polygones, éventails)
+    pos, tris = make_grid(triangles)
+    if quads:
+        half = len(tris) // 2
+        tris = np.concatenate([tris[:half], tris[half:, 2:]], axis=1)  # a, a+n, a+n+1, a+1
+    faces = np.zeros(len(tris), dtype=[("n", "u1"), ("v", "<i4", (tris.shape[1],))])
+    faces["n"], faces["v"] = tris.shape[1], tris
+    with open(path, "wb") as f:
+        f.write(("ply\nformat binary_little_endian 1.0\nelement vertex %d\n"
+                 "property float x\nproperty float y\nproperty float z\n"
+                 "element face %d\nproperty list uchar int vertex_indices\nend_header\n"
+                 % (len(pos), len(tris))).encode())
+        pos.astype("<f4").tofile(f)
+        faces.tofile(f)
+    return len(tris)
+
+
+def make_obj(path, triangles):
+    pos, tris = make_grid(triangles)
+    with open(path, "w") as f:
+        np.savetxt(f, pos, fmt="v %.4f %.4f %.4f")
+        np.savetxt(f, pos[:, [0, 2]] / pos[:, 0].max(), fmt="vt %.4f %.4f")
+        np.savetxt(f, np.repeat(tris + 1, 2, axis=1), fmt="f %d/%d %d/%d %d/%d")
+    return len(tris)
+
+
+def peak_mb(fn):
+    # pic des allocations Python + NumPy (NumPy déclare ses tampons à tracemalloc)
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2.0 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_import(name, mod):
+    if name != "ex3":
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        stl, ply, obj = (os.path.join(tmp, "model" + ext) for ext in (".stl", ".ply", ".obj"))
+        quads = os.path.join(tmp, "quads.ply")
+        make_stl(stl, IMPORT_TRIANGLES)
+        ply_tris = make_ply(ply, IMPORT_TRIANGLES)
+        make_ply(quads, IMPORT_TRIANGLES, quads=True)
+        obj_tris = make_obj(obj, IMPORT_OBJ_TRIANGLES)
+        return {
+            "stl_ms": timed(lambda: importers.load_stl(stl), repeat=3),
+            "stl_peak_mb": peak_mb(lambda: importers.load_stl(stl)),
+            "stl_file_mb": os.path.getsize(stl) / 2.0 ** 20,
+            "stl_triangles": IMPORT_TRIANGLES,
+            "ply_ms": timed(lambda: importers.load_ply(ply), repeat=3),
+            "ply_peak_mb": peak_mb(lambda: importers.load_ply(ply)),
+            "ply_triangles": ply_tris,
+            "ply_quads_ms": timed(lambda: importers.load_ply(quads), repeat=3),
+            "ply_quads_peak_mb": peak_mb(lambda: importers.load_ply(quads)),
+            "obj_ms": timed(lambda: importers.load_obj(obj), repeat=3),
+            "obj_triangles": obj_tris,
+        }
+
+
+def bench_texture(name, mod):
+    if not hasattr(mod, "TEXTURE_FILE"):
+        return None
+    path, size = mod.TEXTURE_FILE, mod.TEXTURE_SIZE
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = TextureCache(enabled=False)
+        warm = TextureCache(tmp, enabled=True)
+        levels = warm.get_or_decode(path, size)
+        return {
+            "decode_ms": timed(lambda: cold.get_or_decode(path, size), repeat=5, number=3),
+            "cached_ms": timed(lambda: warm.get_or_decode(path, size), repeat=5, number=3),
+            "upload_ms": timed(lambda: Texture(levels).delete(), repeat=5, number=3),
+        }
+
+
+def bench_trackball(name, mod):
+    app = new_app(mod)
+    if not hasattr(app, "on_mouse_motion"):
+        return None
+    pts = [(400 + 200 * math.cos(a), 300 + 150 * math.sin(a))
+           for a in np.linspace(0, 2 * math.pi, DRAG_STEPS)]
+    left = getattr(mod, "GLUT_LEFT_BUTTON", 0)
+    down = getattr(mod, "GLUT_DOWN", 0)
+
+    def drag():
+        app.on_mouse_click(left, down, int(pts[0][0]), int(pts[0][1]))
+        for x, y in pts:
+            app.on_mouse_motion(int(x), int(y))
+    out = {"motion_us": timed(drag, repeat=5) * 1000.0 / DRAG_STEPS}
+    if hasattr(app, "trackball"):
+        tb = app.trackball
+
+        def coalesced():  # tous les événements d'un drag, intégrés par 1 seule frame
+            tb.begin(*pts[0])
+            for x, y in pts:
+                tb.drag(x, y)
+            tb.update()
+
+        def per_frame():  # pire cas : une frame (update) par événement
+            tb.begin(*pts[0])
+            for x, y in pts:
+                tb.drag(x, y)
+                tb.update()
+        out["drag_us"] = timed(coalesced, repeat=5) * 1000.0 / DRAG_STEPS
+        out["update_us"] = timed(per_frame, repeat=5) * 1000.0 / DRAG_STEPS
+    return out
+
+
+def bench_frame(name, mod):
+    app = new_app(mod)
+    app.render()  # 1re frame : compilation des display lists / graphe de scène
+    recorder.reset()
+    app.render()
+    frame = recorder.last
+    elided = app.state.last_frame[1] if hasattr(app, "state") else 0
+    culling = app.cull_stats.last_frame if hasattr(app, "cull_stats") else None
+    recorder.enabled = False  # le temps mesuré = soumission seule, pas la comptabilité
+    try:
+        ms = timed(app.render, repeat=5, number=FRAMES)
+    finally:
+        recorder.enabled = True
+    out = {"ms": ms, "gl_calls": frame.total_calls,
+           "state_changes": frame.total_state_changes, "vertices": frame.vertices,
+           "draws": frame.draws}
+    if hasattr(app, "state"):  # glstate.StateCache : appels évités sur la frame journalisée
+        out["state_elided"] = elided
+    if culling is not None:   # bounds.CullStats : (tests, écartés, dessinés)
+        out["culled"], out["drawn"] = culling[1], culling[2]
+    if VERBOSE_CALLS:
+        for fn, n in frame.calls.most_common(VERBOSE_CALLS):
+            print("    %-28s %d" % (fn, n))
+    return out
+
+
+def _traffic_app(mod):
+    app = new_app(mod)
+    app.toggle_traffic()
+    app.render()
+
+    def update():  # matrices reposées dans tous les lots, même sans pas écoulé
+        app._traffic_tick = -1
+        app._update_traffic()
+    return app, update
+
+
+def bench_traffic(name, mod):
+    if not hasattr(mod, "TRAFFIC_CARS"):
+        return None
+    app, update = _traffic_app(mod)
+    traffic = app.traffic
+    recorder.enabled = False
+    try:
+        frame_ms = timed(app.render, repeat=5, number=10)
+    finally:
+        recorder.enabled = True
+    out = {"step_ms": timed(traffic.step, repeat=5, number=50),
+           "update_ms": timed(update, repeat=5, number=10),
+           "frame_ms": frame_ms, "cars": len(traffic)}
+    instancing.MODE = "cpu"  # contexte sans instanciation GPU : re-cuisson à chaque pas
+    try:
+        _, cpu_update = _traffic_app(mod)
+        out["cpu_update_ms"] = timed(cpu_update, repeat=5, number=5)
+    finally:
+        instancing.MODE = None
+    return out
+
+
+def bench_simplify(name, mod):
+    if not hasattr(getattr(mod, "Sector", None), "_sphere"):
+        return None
+    sphere = compute_normals(mod.Sector._sphere((0, 0, 0), 1.0, *SIMPLIFY_SPHERE).build(), 45.0)
+    out = simplify(sphere, SIMPLIFY_RATIO, crease_angle=45.0)
+    stats = out.simplify_stats
+    return {"ms": timed(lambda: simplify(sphere, SIMPLIFY_RATIO, crease_angle=45.0), repeat=3),
+            "triangles_in": stats.triangles_in, "triangles_out": stats.triangles_out,
+            "passes": stats.passes, "error_dist": math.sqrt(stats.error)}
+
+
+def bench_variants(name, mod):
+    geometry = getattr(mod, "car_geometry", None)
+    if geometry is None:
+        return None
+    specs = [geometry.CarSpec(half_len=2.0 + 0.01 * i, roof_w=0.6 + 0.005 * i)
+             for i in range(VARIANTS)]
+    batch = geometry.build_variants(specs)
+    geometry.build_car(specs[0])
+    return {"serial_ms": timed(lambda: geometry.build_variants(specs, processes=1), repeat=3),
+            "pool_ms": timed(lambda: geometry.build_variants(specs), repeat=3),
+            "memo_us": timed(lambda: geometry.build_car(specs[0]), number=1000) * 1000.0,
+            "variants": len(batch), "processes": os.cpu_count() or 1,
+            "batch_mb": batch.nbytes / 2.0 ** 20}
+
+
+SCENARIOS = {
+    "build": bench_build,
+    "normals": bench_normals,
+    "world": bench_world,
+    "import": bench_import,
+    "texture": bench_texture,
+    "trackball": bench_trackball,
+    "frame": bench_frame,
+    "traffic": bench_traffic,
+    "simplify": bench_simplify,
+    "variants": bench_variants,
+}
+
+
+# ───────────────────────────────────────────────
+# BASELINE
+# ───────────────────────────────────────────────
+def run(viewers, scenarios):
+    results = {}
+    for name in viewers:
+        mod = load_viewer(name)
+        for scen in scenarios:
+            with viewer_dir(mod.__bench_path__):
+                metrics = SCENARIOS[scen](name, mod)
+            if metrics is None:
+                continue
+            key = "%s.%s" % (name, scen)
+            results[key] = {k: round(v, 4) for k, v in metrics.items()}
+            print("%-20s %s" % (key, "  ".join("%s=%g" % kv for kv in results[key].items())))
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, metrics in results.items():
+        for metric, value in metrics.items():
+            ref = baseline.get(key, {}).get(metric)
+            if not metric.endswith(LOWER_IS_BETTER) or ref is None or ref <= 0:
+                continue
+            if value > ref * (1.0 + threshold):
+                regressions.append("%s.%s: %g → %g (+%.0f %%)"
+                                   % (key, metric, ref, value, (value / ref - 1) * 100))
+    return regressions
+
+
+def write_results(path, results, merge=False):
+    if merge and os.path.exists(path):  # --save sur un sous-ensemble : on garde le reste
+        with open(path) as f:
+            results = dict(json.load(f)["results"], **results)
+    with open(path, "w") as f:
+        json.dump({"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                            "machine": platform.platform()},
+                   "results": results}, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless viewer benchmarks")
+    parser.add_argument("viewers", nargs="*",
+                        help="viewers to run: %s (default: all)" % ", ".join(VIEWERS))
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown ratio before failing (default %(default)s)")
+    parser.add_argument("--calls", type=int, default=0, metavar="N",
+                        help="print the N most frequent GL calls of each frame scenario")
+    args = parser.parse_args(argv)
+    global VERBOSE_CALLS
+    VERBOSE_CALLS = args.calls
+    unknown = set(args.viewers) - set(VIEWERS)
+    if unknown:
+        parser.error("unknown viewer(s): %s" % ", ".join(sorted(unknown)))
+
+    results = run(args.viewers or list(VIEWERS), args.scenario or list(SCENARIOS))
+
+    if args.output:
+        write_results(args.output, results)
+    if args.save:
+        write_results(args.baseline, results, merge=True)
+        print("baseline written to %s" % args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("no baseline at %s (run with --save)" % args.baseline)
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        print("REGRESSION " + r)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
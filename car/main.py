@@ -1,27 +1,40 @@
 # main.py – Low-poly car • Trackball • HUD • Miroir • Éclairage
 # Python 3.x  +  PyOpenGL  +  FreeGLUT
+import sys, os, math, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+import glbackend  # GL_BACKEND=record|trace : rendu sans écran / comptage des appels
 from OpenGL.GL   import *
 from OpenGL.GLU  import *
 from OpenGL.GLUT import *
-import sys, math
+from mesh import MeshBuilder, Vertex
+from gpu import GpuMesh, vbo_supported
+from scheduler import FrameScheduler
+from scene import compose, translate, rotate
+from instancing import instance_matrices
+from normals import compute_normals
+from mesh_cache import default_cache
+from profiler import PassProfiler
+from text import TextRenderer
+from glstate import StateCache, material
+from bounds import Bounds, CullStats, Frustum, OUTSIDE, perspective
+from lod import LodBatch
+from simloop import FixedStep, InputQueue, lerp
+from symmetry import MIRROR_X, rotate_copies, symmetrize
 
 AXIS_LEN = 3.0  # longueur des axes XYZ
+CREASE_ANGLE = 45.0  # lissage des normales (cylindres) ; arêtes plus vives = flat
+# niveaux de détail (niveau 0 = le plus fin) et seuils de bascule (diamètre projeté, px)
+CYLINDER_LODS = (18, 9, 6)                  # segments des roues
+SPHERE_LODS = ((16, 16), (10, 8), (6, 4))   # (slices, stacks) : repères, ampoule
+LOD_THRESHOLDS = (48.0, 16.0)
+HUD_COLOR = (0, 0, 0)
+MOVE_SPEED = 3.0   # unités / s, touche maintenue (voiture, origine des axes)
+ZOOM_SPEED = 10.0  # unités / s, '+' / '-' maintenus
+PROFILER_COLOR = (0.0, 0.4, 0.0)
 
 # utilisé par reshape / callbacks
 app = None
 
-# ───────────────────────────────────────────────
-# 1)  STRUCTURES DE DONNÉES
-# ───────────────────────────────────────────────
-class Vertex:
-    def __init__(self, x, y, z, u=0, v=0):
-        self.x, self.y, self.z = x, y, z
-        self.u, self.v        = u, v
-
-class Triangle:
-    def __init__(self, vertices):
-        self.vertices = vertices           # list[3] Vertex
-
 # ───────────────────────────────────────────────
 # 2)  LOW-POLY CAR (Sector) : on modèle UNE FOIS
 # ───────────────────────────────────────────────
@@ -29,8 +42,7 @@ class Sector:
     # ---- helpers ----------------------------------------------------------------
     @staticmethod
     def _add_quad(tris, v0, v1, v2, v3):
-        tris.append(Triangle([v0, v1, v2]))
-        tris.append(Triangle([v0, v2, v3]))
+        tris.add_quad(v0, v1, v2, v3)
 
     @staticmethod
     def _cuboid(min_pt, max_pt):
@@ -39,7 +51,7 @@ class Sector:
         uv = [(0, 0), (1, 0), (1, 1), (0, 1)]
         V  = lambda x, y, z, i: Vertex(x, y, z, *uv[i])
 
-        t = []
+        t = MeshBuilder()
         Sector._add_quad(t, V(x1, y1, z2, 0), V(x2, y1, z2, 1), V(x2, y2, z2, 2), V(x1, y2, z2, 3))  # avant
         Sector._add_quad(t, V(x2, y1, z1, 0), V(x1, y1, z1, 1), V(x1, y2, z1, 2), V(x2, y2, z1, 3))  # arrière
         Sector._add_quad(t, V(x1, y2, z2, 0), V(x2, y2, z2, 1), V(x2, y2, z1, 2), V(x1, y2, z1, 3))  # dessus
@@ -50,76 +62,139 @@ class Sector:
 
     @staticmethod
     def _cylinder(center, radius, half_w, segments=18):
+        # un seul secteur, complété par segments copies tournées autour de Z (symmetry.py)
         cx, cy, cz = center
-        tris = []
-        for i in range(segments):
-            a1 = 2 * math.pi * i / segments
-            a2 = 2 * math.pi * (i + 1) / segments
-            x1, y1 = cx + radius * math.cos(a1), cy + radius * math.sin(a1)
-            x2, y2 = cx + radius * math.cos(a2), cy + radius * math.sin(a2)
-            zf, zb = cz - half_w, cz + half_w
-
-            v0, v1 = Vertex(x1, y1, zf), Vertex(x2, y2, zf)
-            v2, v3 = Vertex(x2, y2, zb), Vertex(x1, y1, zb)
-            Sector._add_quad(tris, v0, v1, v2, v3)          # bande latérale
-            tris.append(Triangle([Vertex(cx, cy, zf), v1, v0]))  # disque avant
-            tris.append(Triangle([Vertex(cx, cy, zb), v3, v2]))  # disque arrière
+        tris = MeshBuilder()
+        a = 2 * math.pi / segments
+        x1, y1 = cx + radius, cy
+        x2, y2 = cx + radius * math.cos(a), cy + radius * math.sin(a)
+        zf, zb = cz - half_w, cz + half_w
+
+        v0, v1 = Vertex(x1, y1, zf), Vertex(x2, y2, zf)
+        v2, v3 = Vertex(x2, y2, zb), Vertex(x1, y1, zb)
+        Sector._add_quad(tris, v0, v1, v2, v3)          # bande latérale
+        tris.add_tri(Vertex(cx, cy, zf), v1, v0)  # disque avant
+        tris.add_tri(Vertex(cx, cy, zb), v3, v2)  # disque arrière
+        return rotate_copies(tris.build(), segments, 2, center)
+
+    @staticmethod
+    def _sphere(center, radius, slices=12, stacks=12):
+        # sphère UV (remplace glutSolidSphere : tessellée une fois par niveau, instanciable)
+        cx, cy, cz = center
+        tris = MeshBuilder()
+
+        def P(i, j):
+            th = 2 * math.pi * i / slices
+            ph = math.pi * j / stacks - math.pi / 2
+            return Vertex(cx + radius * math.cos(ph) * math.cos(th), cy + radius * math.sin(ph),
+                          cz - radius * math.cos(ph) * math.sin(th))
+        for j in range(stacks):
+            for i in range(slices):
+                v0, v1, v2, v3 = P(i, j), P(i + 1, j), P(i + 1, j + 1), P(i, j + 1)
+                if j == 0:
+                    tris.add_tri(v0, v2, v3)           # pôle sud
+                elif j == stacks - 1:
+                    tris.add_tri(v0, v1, v2)           # pôle nord
+                else:
+                    Sector._add_quad(tris, v0, v1, v2, v3)
         return tris
     # ------------------------------------------------------------------------------
-    def __init__(self):
-        self.triangles_body, self.triangles_windows = self._build_body()
-        self.triangles_wheel = self._cylinder((0, 0, 0), 0.6, 0.2)  # une roue centrée
-        self.triangles_headlight  = self._build_headlight()
+    # symétries déclarées par pièce (appliquées au build) : côté droit modélisé, côté
+    # gauche produit par miroir → au rendu, chaque pièce est un maillage complet
+    SYMMETRY = {"triangles_body": MIRROR_X, "triangles_windows": MIRROR_X,
+                "triangles_headlight": MIRROR_X}
+
+    def __init__(self, cache=None):
+        # maillages compilés relus par mmap tant que ce fichier n'a pas changé
+        parts = (cache or default_cache()).get_or_build(
+            "car_sector", self._build, code=[__file__],
+            params={"CREASE_ANGLE": CREASE_ANGLE, "CYLINDER_LODS": CYLINDER_LODS})
+        for name, mesh in parts.items():
+            setattr(self, name, mesh)
+
+    def lod_levels(self, name):
+        # [niveau 0, 1, …] d'une pièce tessellée (triangles_wheel, triangles_wheel_lod1…)
+        return [getattr(self, name)] + [getattr(self, "%s_lod%d" % (name, k))
+                                        for k in range(1, len(CYLINDER_LODS))]
+
+    def _build(self):
+        # normales puis symétries (copie réfléchie avec ses normales), une fois au build ;
+        # carrosserie : symétrie d'abord → faces x = 0 du demi-châssis (internes) supprimées ;
+        # roue lissée (crease) → ronde sans + de segments
+        sym = lambda name, mesh: symmetrize(mesh, Sector.SYMMETRY.get(name))
+        body, windows_side, windows_center = (b.build() for b in self._build_body())
+        parts = {
+            "triangles_body": compute_normals(sym("triangles_body", body)),
+            "triangles_windows": sym("triangles_windows", compute_normals(windows_side))
+                                 + compute_normals(windows_center),
+            "triangles_headlight": sym("triangles_headlight",
+                                       compute_normals(self._build_headlight().build())),
+        }
+        for k, segments in enumerate(CYLINDER_LODS):  # une roue centrée, par niveau
+            parts["triangles_wheel" + ("_lod%d" % k if k else "")] = compute_normals(
+                self._cylinder((0, 0, 0), 0.6, 0.2, segments), CREASE_ANGLE)
+        return parts
 
     # --- un seul projecteur avant droit ---------------------------------
     def _build_headlight(self):
         return self._cuboid((0.6, -0.1, 1.05), (1.0, 0.1, 1.3))
 
     def _build_body(self):
-        body, windows = [], []
+        body, windows, center = MeshBuilder(), MeshBuilder(), MeshBuilder()
         # châssis & toit — DEMI-CHÂSSIS (côté droit seulement)
         body += self._cuboid((0, -0.5, -1), (2, 0.5, 1))  # était (-2, -0.5, -1) → ( 2, 0.5, 1)
         body += self._cuboid((0, 0.5, -1), (1, 1.5, 1))  # était (-1,  0.5, -1) → ( 1, 1.5, 1)
 
-        # vitres : (on garde le côté gauche tel quel, et on mirrora à droite dans render)
+        # vitres : côté gauche modélisé (miroir au build) ; avant / arrière pleine largeur
         y_bot, y_top, inset = 0.6, 1.4, 0.001
         V = lambda x, y, z: Vertex(x, y, z)
-        self._add_quad(windows, V(-0.9, y_bot, 1.0 + inset), V(0.9, y_bot, 1.0 + inset),
+        self._add_quad(center, V(-0.9, y_bot, 1.0 + inset), V(0.9, y_bot, 1.0 + inset),
                        V(0.9, y_top, 1.0 + inset), V(-0.9, y_top, 1.0 + inset))
-        self._add_quad(windows, V(0.9, y_bot, -1.0 - inset), V(-0.9, y_bot, -1.0 - inset),
+        self._add_quad(center, V(0.9, y_bot, -1.0 - inset), V(-0.9, y_bot, -1.0 - inset),
                        V(-0.9, y_top, -1.0 - inset), V(0.9, y_top, -1.0 - inset))
         self._add_quad(windows, V(-1.0 - inset, y_bot, -1.0), V(-1.0 - inset, y_bot, 0.0),
                        V(-1.0 - inset, y_top, 0.0), V(-1.0 - inset, y_top, -1.0))
         self._add_quad(windows, V(-1.0 - inset, y_bot, 0.0), V(-1.0 - inset, y_bot, 1.0),
                        V(-1.0 - inset, y_top, 1.0), V(-1.0 - inset, y_top, 0.0))
-        return body, windows
+        return body, windows, center
 
 class ExtraModels:
-    def __init__(self):
-        self.tris = []
-        self.tris += self._build_lamp_post()
+    # Sphère émissive (optionnel, visible uniquement)
+    lamp_sphere_pos = (5.0, 2.1, 0.0)
+    marker_radius = 0.25  # sphères repères des lumières (ex-glutSolidSphere(0.25,16,16))
+
+    def __init__(self, cache=None):
+        parts = (cache or default_cache()).get_or_build(
+            "car_extras", self._build, code=[__file__],
+            params={"CREASE_ANGLE": CREASE_ANGLE, "SPHERE_LODS": SPHERE_LODS})
+        self.tris = parts["lamp_post"]
+        # sphère → [niveau 0, 1, …]
+        self.lods = {name: [parts[name]] + [parts["%s_lod%d" % (name, k)]
+                                            for k in range(1, len(SPHERE_LODS))]
+                     for name in ("bulb", "marker")}
+        # poteau + sphère émissive : un seul volume (repère monde)
+        r = 0.15
+        self.bounds = Bounds.union([self.tris.bounds, Bounds(
+            [c - r for c in self.lamp_sphere_pos], [c + r for c in self.lamp_sphere_pos])])
+
+    def _build(self):
+        parts = {"lamp_post": compute_normals(self._build_lamp_post().build(), CREASE_ANGLE)}
+        for k, (slices, stacks) in enumerate(SPHERE_LODS):
+            suffix = "_lod%d" % k if k else ""
+            parts["bulb" + suffix] = compute_normals(Sector._sphere(
+                self.lamp_sphere_pos, 0.15, slices, stacks).build(), CREASE_ANGLE)
+            parts["marker" + suffix] = compute_normals(Sector._sphere(
+                (0, 0, 0), self.marker_radius, slices, stacks).build(), CREASE_ANGLE)
+        return parts
 
     def _build_lamp_post(self):
-        t = []
+        t = MeshBuilder()
         # Tige verticale
         t += Sector._cylinder((5, 0, 0), 0.1, 2.0)
         # Tête du lampadaire
         t += Sector._cuboid((4.8, 2.0, -0.2), (5.2, 2.2, 0.2))
-        # Sphère émissive (optionnel, visible uniquement)
-        self.lamp_sphere_pos = (5.0, 2.1, 0.0)
         return t
 
-    def draw_emissive_sphere(self):
-        # Sphère lumineuse jaune non affectée par l’éclairage
-        glPushAttrib(GL_LIGHTING_BIT)
-        glMaterialfv(GL_FRONT, GL_EMISSION, [1, 1, 0.2, 1])  # jaune doux
-        glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, [1, 1, 0.2, 1])
-        glPushMatrix()
-        glTranslatef(*self.lamp_sphere_pos)
-        glutSolidSphere(0.15, 12, 12)
-        glPopMatrix()
-        glMaterialfv(GL_FRONT, GL_EMISSION, [0, 0, 0, 1])  # reset
-        glPopAttrib()
 
 # ───────────────────────────────────────────────
 # 3)  RENDERER
@@ -129,8 +204,35 @@ class Renderer:
     LIGHT0_POS = [ 3.0, 3.0,  4.0, 1.0]
     LIGHT1_POS = [-4.0, 5.0, -2.0, 1.0]
 
+    # --- instances : roues (cylindre symétrique → translation seule) ----
+    WHEEL_TRANSFORMS = [
+        (translate(x, y, z),)
+        for x, y, z in [(1.1, -0.5, -1.5), (-1.1, -0.5, -1.5),
+                        (1.1, -0.5, 1.5), (-1.1, -0.5, 1.5)]
+    ]
+
+    # matériaux (ambient+diffuse, specular, shininess) — émis seulement s'ils changent
+    MAT_BODY      = material([0.9, 0.1, 0.1, 1], [1, 1, 1, 1], 64)
+    MAT_WINDOWS   = material([0.1, 0.1, 0.1, 1], [0.5, 0.5, 0.5, 1], 16)
+    MAT_HEADLIGHT = material([1.0, 0.9, 0.3, 1], [1.0, 1.0, 0.8, 1], 32)
+    MAT_WHEEL     = material([0.05, 0.05, 0.05, 1], [0.3, 0.3, 0.3, 1], 8)
+    MAT_LAMP_POST = material([0.3, 0.3, 0.3, 1], [0.5, 0.5, 0.5, 1], 16)
+    MAT_BULB      = material([1.0, 1.0, 0.2, 1], [0, 0, 0, 1], 0, emission=[1, 1, 0.2, 1])  # jaune doux
+    MAT_MARKER    = material([1.0, 1.0, 0.0, 1], [0, 0, 0, 1], 0, emission=[1, 1, 0, 1])    # jaune émissif
+
+    # passes chronométrées ('p' : overlay p50/p95/p99, 'P' : export CSV)
+    PROFILE_PASSES = ("camera", "axes", "body", "windows", "headlights", "wheels",
+                      "light_spheres", "lamp_post", "hud", "swap")
+
     def __init__(self):
         self.sector = Sector()
+        self.scheduler = FrameScheduler(self.render)  # redessin à la demande
+        self.profiler = PassProfiler(Renderer.PROFILE_PASSES)
+        self.text = TextRenderer()  # atlas rastérisé ici, uploadé dans init_gl
+        self.state = StateCache()   # matériaux : appels redondants évités
+        self.cull_stats = CullStats()
+        self.projection = None      # matrice de gluPerspective (reshape) → frustum
+        self.view = None            # matrice caméra de la frame (culling, niveaux de détail)
 
         # caméra / trackball
         self.zoom            = 10.0
@@ -143,6 +245,11 @@ class Renderer:
         self.car_pos     = [0.0, 0.0, 0.0]
         self.axis_origin = [0.0, 0.0, 0.0]
 
+        # entrées en file (vidée 1 fois par frame) + pas fixes ; rendu interpolé
+        self.input = InputQueue(wake=self.scheduler.notify_input)
+        self.clock = FixedStep()
+        self._prev_state = self.view_car_pos, self.view_axis_origin = self._sim_state()
+
         # toggle sphères lumières
         self.show_lights = True
 
@@ -150,6 +257,14 @@ class Renderer:
         self.last_vec = (0.0, 0.0, 1.0)
         self.win_w, self.win_h = 800, 600
         self.extras = ExtraModels()
+
+        # VBO uploadés une fois (init_gl) ; False → ancien mode immédiat
+        self.use_vbo = True
+        self.gpu = None
+        self.wheels = None
+        self.markers = self.bulbs = None
+        self.car_bounds = None      # volume de la voiture (repère voiture) ; _car_world : monde
+        self._car_world = self._car_world_key = None
     # ------------------------------------------------------------------
     # 1)  INITIALISATION OPENGL
     # ------------------------------------------------------------------
@@ -178,51 +293,126 @@ class Renderer:
         glLightfv(GL_LIGHT1, GL_DIFFUSE, [0.8, 0.8, 1, 1])
         glLightfv(GL_LIGHT1, GL_SPECULAR, [0.8, 0.8, 1, 1])
 
+        self.text.atlas.upload()  # hors display list : le HUD compilé ne fait que la lier
+        self._upload_meshes()
+        self._build_instances()
+
+    def _upload_meshes(self):
+        # géométrie statique → un seul VBO, une plage par pièce
+        if not (self.use_vbo and vbo_supported()):
+            self.use_vbo = False
+            return
+        s = self.sector
+        # carrosserie, vitres, phares : complets dès le build (Sector.SYMMETRY), aucun miroir
+        self.gpu = GpuMesh({"body": s.triangles_body, "windows": s.triangles_windows,
+                            "headlights": s.triangles_headlight,
+                            "lamp_post": self.extras.tris})
+
+    def _build_instances(self):
+        # roues : 1 maillage, N transformations, 1 appel de dessin
+        for batch in (self.wheels, self.markers, self.bulbs):
+            if batch is not None:
+                batch.delete()
+        s = self.sector
+        # roues et sphères : niveau de détail choisi par instance (lod.py)
+        self.wheels = LodBatch(s.lod_levels("triangles_wheel"),
+                               instance_matrices(Renderer.WHEEL_TRANSFORMS), LOD_THRESHOLDS,
+                               use_vbo=self.use_vbo)
+        self.wheels.camera = lambda: (self.view @ compose((translate(*self.view_car_pos),)),
+                                      self.projection, self.win_h)
+        e = self.extras
+        self.markers = LodBatch(e.lods["marker"], instance_matrices(
+            [(translate(*p[:3]),) for p in (Renderer.LIGHT0_POS, Renderer.LIGHT1_POS)]),
+            LOD_THRESHOLDS, use_vbo=self.use_vbo)
+        self.bulbs = LodBatch(e.lods["bulb"], instance_matrices([()]), LOD_THRESHOLDS,
+                              use_vbo=self.use_vbo)
+        self.markers.camera = self.bulbs.camera = lambda: (self.view, self.projection, self.win_h)
+        self.car_bounds = Bounds.union(
+            [s.triangles_body.bounds, s.triangles_windows.bounds,
+             s.triangles_headlight.bounds, self.wheels.bounds])
+        self._car_world_key = None
 
     # ---------- utilitaires ------------------------------------------------------
     def _draw_axes(self):
         glLineWidth(2.0)
         glBegin(GL_LINES)
-        glColor3f(1, 0, 0); glVertex3f(*self.axis_origin); glVertex3f(self.axis_origin[0]+AXIS_LEN, self.axis_origin[1], self.axis_origin[2])
-        glColor3f(0, 1, 0); glVertex3f(*self.axis_origin); glVertex3f(self.axis_origin[0], self.axis_origin[1]+AXIS_LEN, self.axis_origin[2])
-        glColor3f(0, 0, 1); glVertex3f(*self.axis_origin); glVertex3f(self.axis_origin[0], self.axis_origin[1], self.axis_origin[2]+AXIS_LEN)
+        ox, oy, oz = self.view_axis_origin
+        glColor3f(1, 0, 0); glVertex3f(ox, oy, oz); glVertex3f(ox + AXIS_LEN, oy, oz)
+        glColor3f(0, 1, 0); glVertex3f(ox, oy, oz); glVertex3f(ox, oy + AXIS_LEN, oz)
+        glColor3f(0, 0, 1); glVertex3f(ox, oy, oz); glVertex3f(ox, oy, oz + AXIS_LEN)
         glEnd()
         glColor3f(1, 1, 1)
 
-    def _draw_text(self, txt, x, y, color=(0, 0, 0)):
-        glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity()
-        gluOrtho2D(0, 800, 0, 600)
-        glMatrixMode(GL_MODELVIEW);  glPushMatrix(); glLoadIdentity()
-        glDisable(GL_LIGHTING); glDisable(GL_DEPTH_TEST)
-        glColor3f(*color)
-        glRasterPos2f(x, y)
-        for ch in txt:
-            glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(ch))
-        glEnable(GL_DEPTH_TEST); glEnable(GL_LIGHTING)
-        glPopMatrix(); glMatrixMode(GL_PROJECTION); glPopMatrix(); glMatrixMode(GL_MODELVIEW)
-
-    @staticmethod
-    def _face_normal(p0, p1, p2):
-        ux, uy, uz = p1.x-p0.x, p1.y-p0.y, p1.z-p0.z
-        vx, vy, vz = p2.x-p0.x, p2.y-p0.y, p2.z-p0.z
-        nx, ny, nz = uy*vz - uz*vy, uz*vx - ux*vz, ux*vy - uy*vx
-        inv_len = 1.0 / math.sqrt(nx*nx + ny*ny + nz*nz)
-        return nx*inv_len, ny*inv_len, nz*inv_len
+    def _hud_lines(self):
+        # (texte, x, y depuis le haut, couleur) ; mises en page en cache dans self.text
+        lines = [("Car Pos:   [%.2f, %.2f, %.2f]" % tuple(self.car_pos), 10, 6, HUD_COLOR),
+                 ("Axis Orig: [%.2f, %.2f, %.2f]" % tuple(self.axis_origin), 10, 30, HUD_COLOR),
+                 ("'l' : toggle light spheres  'p' : profiler", 10, 54, HUD_COLOR)]
+        if self.profiler.enabled:
+            step = self.text.line_height
+            lines += [(line, 10, 90 + step * i, PROFILER_COLOR)
+                      for i, line in enumerate(self.profiler.lines() + [
+                          self.state.line(), self.cull_stats.line(), self._lod_line()])]
+        return lines
+
+    def _lod_line(self):
+        lods = [b for b in (self.wheels, self.markers, self.bulbs) if b is not None]
+        return "lod: %d vertices (%d at full detail)" % (
+            sum(b.vertices for b in lods), sum(b.full_vertices for b in lods))
 
     def _draw_mesh(self, tris):
+        # repli mode immédiat : normales pré-calculées au build (plus de sqrt par frame)
+        pos, nrm = tris.positions.tolist(), tris.normals.tolist()
         glBegin(GL_TRIANGLES)
-        for tri in tris:
-            n = self._face_normal(*tri.vertices)
-            glNormal3f(*n)
-            for v in tri.vertices:
-                glVertex3f(v.x, v.y, v.z)
+        for i in tris.indices.ravel().tolist():
+            glNormal3f(*nrm[i])
+            glVertex3f(*pos[i])
         glEnd()
 
+    def _draw_part(self, name, tris):
+        # 1 glDrawElements si VBO, sinon repli glBegin/glEnd
+        if self.use_vbo and self.gpu:
+            self.gpu.draw(name)
+        else:
+            self._draw_mesh(tris)
+
+    # ---------- culling -----------------------------------------------------------
+    def _frustum(self):
+        # plans en repère monde : projection × caméra (mêmes opérations que render)
+        self.view = compose((translate(0, 0, -self.zoom), rotate(self.angle_x, 1, 0, 0),
+                             rotate(self.angle_y, 0, 1, 0)))
+        if self.projection is None:
+            return None
+        return Frustum(self.projection @ self.view)
+
+    def _car_visible(self, frustum):
+        # volume monde recalculé seulement quand la voiture bouge
+        key = self.view_car_pos
+        if key != self._car_world_key:
+            self._car_world = self.car_bounds.translated(key)
+            self._car_world_key = key
+        return self._visible(frustum, self._car_world, 4)
+
+    def _visible(self, frustum, bounds, draws):
+        stats = self.cull_stats
+        if frustum is None:
+            stats.drawn += draws
+            return True
+        stats.tested += 1
+        if frustum.classify(bounds) == OUTSIDE:
+            stats.culled += draws
+            return False
+        stats.drawn += draws
+        return True
+
     # ---------- dessin principal --------------------------------------------------
     # ------------------------------------------------------------------
     # 3)  RENDER
     # ------------------------------------------------------------------
     def render(self):
+        prof = self.profiler
+        prof.begin_frame()
+        self.tick()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
 
@@ -232,104 +422,68 @@ class Renderer:
         glTranslatef(0, 0, -self.zoom)
         glRotatef(self.angle_x, 1, 0, 0)
         glRotatef(self.angle_y, 0, 1, 0)
+        frustum = self._frustum()
 
         # positions des lampes dans le repère courant
         glLightfv(GL_LIGHT0, GL_POSITION, Renderer.LIGHT0_POS)
         glLightfv(GL_LIGHT1, GL_POSITION, Renderer.LIGHT1_POS)
+        prof.mark("camera")
 
         self._draw_axes()
+        prof.mark("axes")
 
-        # ------------------ voiture -----------------------------------
-        glPushMatrix()
-        glTranslatef(*self.car_pos)
-
-        # carrosserie (demi-châssis modélisé une seule fois → miroir X pour l’autre côté)
-        glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [0.9, 0.1, 0.1, 1])
-        glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [1, 1, 1, 1])
-        glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 64)
-
-        # côté droit (modélisé)
-        self._draw_mesh(self.sector.triangles_body)
-
-        # miroir X → côté gauche (1 axe négatif → winding inversé)
-        glPushMatrix()
-        glScalef(-1, 1, 1)
-        glFrontFace(GL_CW)
-        self._draw_mesh(self.sector.triangles_body)
-        glFrontFace(GL_CCW)
-        glPopMatrix()
-
-        # vitres (gauche + miroir droite)
-        glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [0.1, 0.1, 0.1, 1])
-        glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [0.5, 0.5, 0.5, 1])
-        glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 16)
-        self._draw_mesh(self.sector.triangles_windows)
-        glPushMatrix()
-        glScalef(-1, 1, 1);
-        glFrontFace(GL_CW)
-        self._draw_mesh(self.sector.triangles_windows)
-        glFrontFace(GL_CCW);
-        glPopMatrix()
-
-        # ----- phares (un modèle, miroir à gauche) --------------------------
-        glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [1.0, 0.9, 0.3, 1])
-        glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [1.0, 1.0, 0.8, 1])
-        glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 32)
-
-        # projecteur droit (celui qu’on a réellement modélisé)
-        self._draw_mesh(self.sector.triangles_headlight)
-
-        # miroir : projecteur gauche
-        glPushMatrix()
-        glScalef(-1, 1, 1)
-        glFrontFace(GL_CW)
-        self._draw_mesh(self.sector.triangles_headlight)
-        glFrontFace(GL_CCW)
-        glPopMatrix()
-
-        # roues (4 × même mesh)
-        glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [0.05, 0.05, 0.05, 1])
-        glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [0.3, 0.3, 0.3, 1])
-        glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 8)
-        for x, y, z in [(1.1, -0.5, -1.5), (-1.1, -0.5, -1.5),
-                        (1.1, -0.5, 1.5), (-1.1, -0.5, 1.5)]:
-            glPushMatrix();
-            glTranslatef(x, y, z)
-            if x < 0:
-                glScalef(-1, 1, 1);
-                glFrontFace(GL_CW)
-            self._draw_mesh(self.sector.triangles_wheel)
-            if x < 0: glFrontFace(GL_CCW)
-            glPopMatrix()
-
-        glPopMatrix()  # voiture
+        # ------------------ voiture (écartée en bloc hors du frustum) ----
+        state = self.state
+        if self._car_visible(frustum):
+            glPushMatrix()
+            glTranslatef(*self.view_car_pos)
+
+            # carrosserie (demi-châssis modélisé une seule fois, complété au build)
+            s = self.sector
+            state.set_material(Renderer.MAT_BODY)
+            self._draw_part("body", s.triangles_body)
+            prof.mark("body")
+
+            # vitres (gauche + miroir droite, au build)
+            state.set_material(Renderer.MAT_WINDOWS)
+            self._draw_part("windows", s.triangles_windows)
+            prof.mark("windows")
+
+            # ----- phares (un modèle + son miroir, au build) -----------------------
+            state.set_material(Renderer.MAT_HEADLIGHT)
+            self._draw_part("headlights", s.triangles_headlight)
+            prof.mark("headlights")
+
+            # roues (4 × même mesh)
+            state.set_material(Renderer.MAT_WHEEL)
+            self.wheels.draw()
+
+            glPopMatrix()  # voiture
+            prof.mark("wheels")
 
         # ------------------ sphères-repères des lampes -----------------
         if self.show_lights:
-            glPushAttrib(GL_LIGHTING_BIT)
-            glMaterialfv(GL_FRONT, GL_EMISSION, [1, 1, 0, 1])  # jaune émissif
-            glMaterialfv(GL_FRONT, GL_AMBIENT_AND_DIFFUSE, [1, 1, 0, 1])
-            for px, py, pz, _ in (Renderer.LIGHT0_POS, Renderer.LIGHT1_POS):
-                glPushMatrix();
-                glTranslatef(px, py, pz)
-                glutSolidSphere(0.25, 16, 16)
-                glPopMatrix()
-            glMaterialfv(GL_FRONT, GL_EMISSION, [0, 0, 0, 1])  # reset
-            glPopAttrib()
+            state.set_material(Renderer.MAT_MARKER)
+            self.markers.draw()
+        prof.mark("light_spheres")
 
         # ------------------ modèle bonus : lampadaire ---------------------
-        glMaterialfv(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE, [0.3, 0.3, 0.3, 1])
-        glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [0.5, 0.5, 0.5, 1])
-        glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 16)
-        self._draw_mesh(self.extras.tris)
-        self.extras.draw_emissive_sphere()
+        if self._visible(frustum, self.extras.bounds, 2):
+            state.set_material(Renderer.MAT_LAMP_POST)
+            self._draw_part("lamp_post", self.extras.tris)
+            state.set_material(Renderer.MAT_BULB)
+            self.bulbs.draw()
+            prof.mark("lamp_post")
 
         # ------------------ HUD ----------------------------------------
-        self._draw_text(f"Car Pos:   {self.car_pos}", 10, 580)
-        self._draw_text(f"Axis Orig: {self.axis_origin}", 10, 555)
-        self._draw_text(f"'l' : toggle light spheres", 10, 530)
+        self.text.draw(self._hud_lines(), self.win_w, self.win_h)  # 1 draw, lot en cache
+        prof.mark("hud")
 
         glutSwapBuffers()
+        prof.mark("swap")
+        prof.end_frame()
+        state.end_frame()
+        self.cull_stats.end_frame()
 
     # -------- quaternions utilitaires -----------------------------------
     def _project_on_sphere(self, x, y):
@@ -374,61 +528,112 @@ class Renderer:
              0,  0,  0, 1
         ]
 
+    # ---------- simulation à pas fixe -------------------------------------------------
+    # touches maintenues → (attribut, axe, sens) ; '+' / '-' : zoom
+    HELD_KEYS = {
+        b'w': ("car_pos", 1, +1),
+        b's': ("car_pos", 1, -1),
+        b'a': ("car_pos", 0, -1),
+        b'd': ("car_pos", 0, +1),
+        b'z': ("car_pos", 2, +1),
+        b'x': ("car_pos", 2, -1),
+        b'i': ("axis_origin", 1, +1),
+        b'k': ("axis_origin", 1, -1),
+        b'j': ("axis_origin", 0, -1),
+        b'L': ("axis_origin", 0, +1),  # (majuscule)
+        b'u': ("axis_origin", 2, +1),
+        b'o': ("axis_origin", 2, -1),
+    }
+
+    def _sim_state(self):
+        return tuple(self.car_pos), tuple(self.axis_origin)
+
+    def _step(self, dt, keys):
+        # un pas de dt secondes : mouvement proportionnel au temps, pas au nombre d'appuis
+        self._prev_state = self._sim_state()
+        for key in keys:
+            move = Renderer.HELD_KEYS.get(key)
+            if move is not None:
+                attr, axis, sign = move
+                getattr(self, attr)[axis] += sign * MOVE_SPEED * dt
+        if b'+' in keys:
+            self.zoom = max(2.0, self.zoom - ZOOM_SPEED * dt)
+        if b'-' in keys:
+            self.zoom += ZOOM_SPEED * dt
+
+    def tick(self):
+        # 1 vidage de la file par frame, puis les pas fixes écoulés ; état affiché interpolé
+        for event in self.input.drain():
+            if event[0] == "key":
+                self._key(event[1])
+            elif event[0] == "click":
+                self._click(*event[1:])
+            elif event[0] == "motion":
+                self._motion(*event[1:])
+
+        clock = self.clock
+        steps = clock.advance()
+        if steps:
+            keys = self.input.keys()
+            for _ in range(steps):
+                self._step(clock.dt, keys)
+            self.input.stepped()
+        if not self.input.keys():  # au repos : pas de rattrapage au prochain appui
+            clock.pause()
+            self._prev_state = self._sim_state()
+
+        prev, cur = self._prev_state, self._sim_state()
+        self.view_car_pos = lerp(prev[0], cur[0], clock.alpha)
+        self.view_axis_origin = lerp(prev[1], cur[1], clock.alpha)
+        self.scheduler.set_animating(self.profiler.enabled or bool(self.input.keys()))
+
     # ---------- entrées clavier/souris -------------------------------------------
+    # les callbacks GLUT ne font que poster dans la file ; traitement dans tick()
+    def on_keys(self, key, *_):
+        self.input.key_down(key)
+
+    def on_keys_up(self, key, *_):
+        self.input.key_up(key)
+
+    def on_mouse_click(self, button, state, x, y):
+        self.input.click(button, state, x, y)
+
+    def on_mouse_motion(self, x, y):
+        self.input.motion(x, y)
+
     # ------------------------------------------------------------------
     # 2)  CLAVIER
     # ------------------------------------------------------------------
-    def on_keys(self, key, *_):
-        if key == b'w':
-            self.car_pos[1] += 0.1
-        elif key == b's':
-            self.car_pos[1] -= 0.1
-        elif key == b'a':
-            self.car_pos[0] -= 0.1
-        elif key == b'd':
-            self.car_pos[0] += 0.1
-        elif key == b'z':
-            self.car_pos[2] += 0.1
-        elif key == b'x':
-            self.car_pos[2] -= 0.1
-
-        elif key == b'i':
-            self.axis_origin[1] += 0.1
-        elif key == b'k':
-            self.axis_origin[1] -= 0.1
-        elif key == b'j':
-            self.axis_origin[0] -= 0.1
-        elif key == b'L':
-            self.axis_origin[0] += 0.1  # (majuscule)
-
-        elif key == b'u':
-            self.axis_origin[2] += 0.1
-        elif key == b'o':
-            self.axis_origin[2] -= 0.1
-
-        elif key == b'+':
-            self.zoom = max(2.0, self.zoom - 0.5)
-        elif key == b'-':
-            self.zoom += 0.5
+    def _key(self, key):
+        if key in Renderer.HELD_KEYS or key in (b'+', b'-'):
+            pass  # déplacement : intégré par _step tant que la touche est tenue
 
         elif key == b'l':
             self.show_lights = not self.show_lights  # toggle sphères
 
-        glutPostRedisplay()
-
+        elif key == b'p':  # profiler : redessin continu tant qu'il est affiché
+            self.profiler.toggle()
+        elif key == b'P':
+            print("profile written to", self.profiler.dump_csv(
+                time.strftime("profile_%Y%m%d_%H%M%S.csv")))
 
+        elif key == b'v':
+            self.use_vbo = not self.use_vbo  # VBO ↔ mode immédiat
+            if self.use_vbo and self.gpu is None:
+                self._upload_meshes()
+            self._build_instances()
 
-    def on_mouse_click(self, button, state, x, y):
+    def _click(self, button, state, x, y):
         if button == 3 and state == GLUT_DOWN:  # molette +
-            self.zoom = max(2.0, self.zoom - 0.5); glutPostRedisplay(); return
+            self.zoom = max(2.0, self.zoom - 0.5); return
         if button == 4 and state == GLUT_DOWN:  # molette -
-            self.zoom += 0.5; glutPostRedisplay(); return
+            self.zoom += 0.5; return
         if button == GLUT_RIGHT_BUTTON:
             self.mouse_drag_zoom = (state == GLUT_DOWN); self.last_mouse = (x, y)
         if button == GLUT_LEFT_BUTTON:
             self.mouse_drag = (state == GLUT_DOWN); self.last_mouse = (x, y)
 
-    def on_mouse_motion(self, x, y):
+    def _motion(self, x, y):
         if self.mouse_drag_zoom:
             dy = y - self.last_mouse[1]
             self.zoom = max(2.0, self.zoom + dy * 0.05)
@@ -442,7 +647,6 @@ class Renderer:
             # self.angle_x = max(-89.0, min(89.0, self.angle_x))
 
         self.last_mouse = (x, y)
-        glutPostRedisplay()
 
 
 # ───────────────────────────────────────────────
@@ -456,6 +660,7 @@ def reshape(w, h):
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
     gluPerspective(80.0, w / float(h), 0.1, 100.0)
+    app.projection = perspective(80.0, w / float(h), 0.1, 100.0)  # même matrice, côté CPU
     glMatrixMode(GL_MODELVIEW)
 # ───────────────────────────────────────────────
 # 5)  MAIN
@@ -470,12 +675,13 @@ def main():
     app = Renderer()
     app.init_gl()
 
-    glutDisplayFunc(app.render)
     glutReshapeFunc(reshape)
     glutKeyboardFunc(app.on_keys)
+    glutKeyboardUpFunc(app.on_keys_up)
+    glutIgnoreKeyRepeat(1)  # touche tenue = 1 appui + 1 relâchement (mouvement au temps)
     glutMouseFunc(app.on_mouse_click)
     glutMotionFunc(app.on_mouse_motion)
-    glutIdleFunc(app.render)
+    app.scheduler.install()
 
     glutMainLoop()
 
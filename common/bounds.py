@@ -0,0 +1,288 @@
+# bounds.py – Volumes englobants, frustum et BVH (culling hiérarchique)
+# Python 3.x  +  NumPy
+#
+# Bounds    : AABB (lo, hi) + sphère englobante (center, radius), calculés au build
+# Frustum   : 6 plans extraits de projection @ vue (Gribb–Hartmann) ; test sphère
+#             (rapide) puis AABB (sommet "positif") → OUTSIDE / INTERSECT / INSIDE
+# BVH       : arbre plat (tableaux) sur N éléments ; un nœud INSIDE rend tout son
+#             sous-arbre visible sans autre test, un nœud OUTSIDE l'écarte en entier ;
+#             seuls les éléments des feuilles à cheval sont testés un par un.
+#             refit() ne recalcule que les ancêtres des éléments qui ont bougé ;
+#             cull() parcourt l'arbre niveau par niveau, vectorisé (pas de boucle
+#             Python par élément).
+# CullStats : compteurs par frame (testés / écartés / dessinés) pour le HUD et le bench.
+import math
+
+import numpy as np
+
+OUTSIDE, INTERSECT, INSIDE = 0, 1, 2
+
+
+def perspective(fovy, aspect, near, far):
+    """Même matrice que gluPerspective (ligne-majeur, vecteurs colonnes)."""
+    f = 1.0 / math.tan(math.radians(fovy) / 2.0)
+    m = np.zeros((4, 4))
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far)
+    m[2, 3] = 2.0 * far * near / (near - far)
+    m[3, 2] = -1.0
+    return m
+
+
+# ───────────────────────────────────────────────
+# VOLUME ENGLOBANT
+# ───────────────────────────────────────────────
+class Bounds:
+    __slots__ = ("lo", "hi", "center", "radius")
+
+    def __init__(self, lo, hi, center=None, radius=None):
+        self.lo = np.asarray(lo, dtype=np.float64)
+        self.hi = np.asarray(hi, dtype=np.float64)
+        if center is None:  # sphère autour de la boîte (les points ne sont plus là)
+            center = (self.lo + self.hi) * 0.5
+            radius = float(np.linalg.norm(self.hi - self.lo)) * 0.5
+        self.center = np.asarray(center, dtype=np.float64)
+        self.radius = float(radius)
+
+    @classmethod
+    def from_points(cls, points):
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if not len(pts):
+            return None
+        lo, hi = pts.min(axis=0), pts.max(axis=0)
+        center = (lo + hi) * 0.5
+        # sphère centrée sur la boîte mais ajustée aux points (≤ demi-diagonale)
+        radius = float(np.sqrt(((pts - center) ** 2).sum(axis=1).max()))
+        return cls(lo, hi, center, radius)
+
+    @staticmethod
+    def union(items):
+        items = [b for b in items if b is not None]
+        if not items:
+            return None
+        if len(items) == 1:
+            return items[0]
+        lo = np.min([b.lo for b in items], axis=0)
+        hi = np.max([b.hi for b in items], axis=0)
+        return Bounds(lo, hi)
+
+    def transformed(self, m):
+        """Bounds dans le repère parent (m : 4×4) — AABB par la méthode d'Arvo."""
+        lin, t = m[:3, :3], m[:3, 3]
+        c, e = (self.lo + self.hi) * 0.5, (self.hi - self.lo) * 0.5
+        c2, e2 = lin @ c + t, np.abs(lin) @ e
+        scale = float(np.sqrt((lin * lin).sum(axis=0)).max())
+        return Bounds(c2 - e2, c2 + e2, lin @ self.center + t, self.radius * scale)
+
+    def translated(self, offset):
+        offset = np.asarray(offset, dtype=np.float64)
+        return Bounds(self.lo + offset, self.hi + offset, self.center + offset, self.radius)
+
+    def __repr__(self):
+        return "Bounds(lo=%s, hi=%s, r=%.3f)" % (self.lo.round(3), self.hi.round(3), self.radius)
+
+
+def instances_bounds(bounds, matrices):
+    """Union des bounds d'un maillage placé par N matrices (lot d'instances)."""
+    if bounds is None or not len(matrices):
+        return None
+    n = len(matrices)
+    lin, t = matrices[:, :3, :3].reshape(3 * n, 3), matrices[:, :3, 3]
+    c, e = (bounds.lo + bounds.hi) * 0.5, (bounds.hi - bounds.lo) * 0.5
+    c2 = (lin @ c).reshape(n, 3) + t         # 1 produit (3N,3)·(3,) plutôt que N petits
+    e2 = (np.abs(lin) @ e).reshape(n, 3)
+    return Bounds((c2 - e2).min(axis=0), (c2 + e2).max(axis=0))
+
+
+# ───────────────────────────────────────────────
+# FRUSTUM
+# ───────────────────────────────────────────────
+class Frustum:
+    def __init__(self, clip):
+        # clip = projection @ modelview : plans dans le repère des objets testés
+        m = np.asarray(clip, dtype=np.float64)
+        planes = np.array([m[3] + m[0], m[3] - m[0],    # gauche, droite
+                           m[3] + m[1], m[3] - m[1],    # bas, haut
+                           m[3] + m[2], m[3] - m[2]])   # proche, lointain
+        self.planes = planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+        self._abs_n = np.abs(self.planes[:, :3])
+
+    def transformed(self, m):
+        """Même frustum exprimé dans un repère enfant (m : enfant → repère actuel)."""
+        return Frustum.__new__(Frustum)._set(self.planes @ m)
+
+    def _set(self, planes):
+        self.planes = planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+        self._abs_n = np.abs(self.planes[:, :3])
+        return self
+
+    def classify(self, b):
+        n, w = self.planes[:, :3], self.planes[:, 3]
+        d = n @ b.center + w
+        if (d < -b.radius).any():
+            return OUTSIDE
+        if (d >= b.radius).all():
+            return INSIDE
+        # sphère à cheval : test AABB, plus serré
+        c, e = (b.lo + b.hi) * 0.5, (b.hi - b.lo) * 0.5
+        dist, reach = n @ c + w, self._abs_n @ e
+        if (dist + reach < 0).any():
+            return OUTSIDE
+        return INSIDE if (dist - reach >= 0).all() else INTERSECT
+
+    def classify_boxes(self, lo, hi):
+        """(K,3) boîtes → (K,) OUTSIDE / INTERSECT / INSIDE, vectorisé."""
+        c, e = (lo + hi) * 0.5, (hi - lo) * 0.5
+        dist = c @ self.planes[:, :3].T + self.planes[:, 3]   # (K,6)
+        reach = e @ self._abs_n.T
+        out = np.full(len(lo), INTERSECT, dtype=np.int8)
+        out[(dist - reach >= 0).all(axis=1)] = INSIDE
+        out[(dist + reach < 0).any(axis=1)] = OUTSIDE
+        return out
+
+
+# ───────────────────────────────────────────────
+# BVH (tableaux plats, nœuds en préordre : parent < enfants)
+# ───────────────────────────────────────────────
+class BVH:
+    def __init__(self, lo, hi, leaf_size=4):
+        lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3)
+        hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3)
+        self.leaf_size = leaf_size
+        n = len(lo)
+        self.order = np.arange(n)             # éléments regroupés feuille par feuille
+        centroids = (lo + hi) * 0.5
+        first, count, left, right, parent, depth = [], [], [], [], [], []
+        stack = [(0, n, -1, 0)] if n else []
+        while stack:                          # découpe médiane sur l'axe le plus étendu
+            s, e, par, d = stack.pop()
+            node = len(first)
+            first.append(s); count.append(e - s); parent.append(par); depth.append(d)
+            left.append(-1); right.append(-1)
+            if par >= 0:
+                if left[par] < 0:
+                    left[par] = node
+                else:
+                    right[par] = node
+            if e - s <= leaf_size:
+                continue
+            idx = self.order[s:e]
+            axis = int(np.ptp(centroids[idx], axis=0).argmax())
+            mid = (e - s) // 2
+            self.order[s:e] = idx[np.argpartition(centroids[idx, axis], mid)]
+            stack.append((s + mid, e, node, d + 1))   # droite empilée d'abord
+            stack.append((s, s + mid, node, d + 1))   # → gauche numérotée juste après
+        self.first, self.count = np.array(first, np.intp), np.array(count, np.intp)
+        self.left, self.right = np.array(left, np.intp), np.array(right, np.intp)
+        self.parent, self.depth = np.array(parent, np.intp), np.array(depth, np.intp)
+        self.is_leaf = self.left < 0
+        self.leaves = np.flatnonzero(self.is_leaf)    # triées par `first` (préordre)
+        self.item_leaf = np.empty(n, dtype=np.intp)   # élément → feuille
+        self.item_leaf[self.order] = np.repeat(self.leaves, self.count[self.leaves])
+        self.item_lo, self.item_hi = lo.copy(), hi.copy()
+        self.lo = np.zeros((len(first), 3))
+        self.hi = np.zeros((len(first), 3))
+        self._levels = [np.flatnonzero((self.depth == d) & ~self.is_leaf)
+                        for d in range(int(self.depth.max()) + 1 if n else 0)]
+        self.refit()
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def node_count(self):
+        return len(self.first)
+
+    @property
+    def bounds(self):
+        return Bounds(self.lo[0], self.hi[0]) if len(self.first) else None
+
+    def refit(self, items=None, lo=None, hi=None):
+        """Met à jour les boîtes des éléments `items` (tout si None) puis les ancêtres."""
+        if not len(self.first):
+            return
+        if items is None:
+            if lo is not None:
+                self.item_lo[:], self.item_hi[:] = lo, hi
+            olo, ohi = self.item_lo[self.order], self.item_hi[self.order]
+            starts = self.first[self.leaves]
+            self.lo[self.leaves] = np.minimum.reduceat(olo, starts, axis=0)
+            self.hi[self.leaves] = np.maximum.reduceat(ohi, starts, axis=0)
+            for nodes in reversed(self._levels):      # du plus profond vers la racine
+                l, r = self.left[nodes], self.right[nodes]
+                self.lo[nodes] = np.minimum(self.lo[l], self.lo[r])
+                self.hi[nodes] = np.maximum(self.hi[l], self.hi[r])
+            return
+        items = np.asarray(items, dtype=np.intp)
+        self.item_lo[items], self.item_hi[items] = lo, hi
+        dirty = set()
+        for leaf in np.unique(self.item_leaf[items]).tolist():
+            node = leaf
+            while node >= 0 and node not in dirty:    # chemin vers la racine, une fois
+                dirty.add(node)
+                node = int(self.parent[node])
+        for node in sorted(dirty, reverse=True):      # enfants (index plus grands) d'abord
+            if self.is_leaf[node]:
+                sel = self.order[self.first[node]:self.first[node] + self.count[node]]
+                self.lo[node] = self.item_lo[sel].min(axis=0)
+                self.hi[node] = self.item_hi[sel].max(axis=0)
+            else:
+                l, r = self.left[node], self.right[node]
+                self.lo[node] = np.minimum(self.lo[l], self.lo[r])
+                self.hi[node] = np.maximum(self.hi[l], self.hi[r])
+
+    def cull(self, frustum, stats=None):
+        """Masque (N,) des éléments visibles : parcours niveau par niveau."""
+        visible = np.zeros(len(self.order), dtype=bool)
+        frontier = np.zeros(1, dtype=np.intp) if len(self.first) else np.zeros(0, np.intp)
+        accepted = []                                 # nœuds dont tout le sous-arbre est visible
+        tested = 0
+        leaves = []                                   # feuilles à cheval : test par élément
+        while len(frontier):
+            tested += len(frontier)
+            state = frustum.classify_boxes(self.lo[frontier], self.hi[frontier])
+            accepted.append(frontier[state == INSIDE])
+            partial = frontier[state == INTERSECT]
+            leaves.append(partial[self.is_leaf[partial]])
+            inner = partial[~self.is_leaf[partial]]
+            frontier = np.concatenate([self.left[inner], self.right[inner]])
+        for nodes in accepted:
+            for s, c in zip(self.first[nodes].tolist(), self.count[nodes].tolist()):
+                visible[self.order[s:s + c]] = True
+        leaves = np.concatenate(leaves) if leaves else leaves
+        if len(leaves):
+            items = self.order[np.concatenate([np.arange(s, s + c) for s, c in zip(
+                self.first[leaves].tolist(), self.count[leaves].tolist())])]
+            tested += len(items)
+            state = frustum.classify_boxes(self.item_lo[items], self.item_hi[items])
+            visible[items[state != OUTSIDE]] = True
+        if stats is not None:
+            stats.tested += tested
+            n_visible = int(visible.sum())
+            stats.drawn += n_visible
+            stats.culled += len(visible) - n_visible
+        return visible
+
+    def visible_ranges(self, frustum, stats=None):
+        """Plages contiguës (début, fin) dans `order` des feuilles visibles, fusionnées."""
+        mask = self.cull(frustum, stats)[self.order]
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.view(np.int8), [0]])))
+        return edges.reshape(-1, 2)
+
+
+# ───────────────────────────────────────────────
+# STATISTIQUES
+# ───────────────────────────────────────────────
+class CullStats:
+    def __init__(self):
+        self.tested = self.culled = self.drawn = 0
+        self.last_frame = (0, 0, 0)
+
+    def end_frame(self):
+        self.last_frame = (self.tested, self.culled, self.drawn)
+        self.tested = self.culled = self.drawn = 0
+
+    def line(self):
+        return "culling: %d drawn, %d culled (%d tests)" % (
+            self.last_frame[2], self.last_frame[1], self.last_frame[0])
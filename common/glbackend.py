@@ -0,0 +1,356 @@
+# glbackend.py – Couche entre les renderers et OpenGL.GL / GLU / GLUT
+# Python 3.x  (+ PyOpenGL pour le backend "trace")
+#
+# Backend choisi par use(nom) ou la variable d'environnement GL_BACKEND, AVANT
+# les "from OpenGL.GL import *" des viewers :
+#   "opengl" (défaut) : PyOpenGL tel quel, rien n'est intercepté
+#   "trace"           : PyOpenGL, mais chaque appel gl*/glu*/glut* passe par le recorder
+#   "record"          : aucun contexte ni PyOpenGL — faux modules qui enregistrent les
+#                       appels ; glutMainLoop() joue GL_BACKEND_FRAMES frames puis
+#                       affiche le bilan (rendu testable en CI, sans écran)
+# Le recorder tient un journal par frame (frontière = glutSwapBuffers) : appels par
+# fonction, changements d'état, sommets soumis (glVertex*, glDraw*, display lists).
+import collections
+import itertools
+import os
+import re
+import sys
+import types
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+# appels qui modifient l'état du pipeline (clé = fonction + 1er argument nommé)
+STATE_CHANGES = {
+    "glEnable", "glDisable", "glEnableClientState", "glDisableClientState",
+    "glMaterialfv", "glMaterialf", "glLightfv", "glLightModeli", "glColor3f",
+    "glBindTexture", "glBindBuffer", "glUseProgram", "glTexParameteri",
+    "glFrontFace", "glCullFace", "glPolygonMode", "glShadeModel", "glLineWidth",
+    "glMatrixMode", "glPushAttrib", "glPopAttrib",
+}
+
+
+# ───────────────────────────────────────────────
+# JOURNAL
+# ───────────────────────────────────────────────
+class FrameLog:
+    __slots__ = ("calls", "state_changes", "vertices", "draws", "replayed")
+
+    def __init__(self):
+        self.calls = collections.Counter()          # fonction → appels émis par Python
+        self.state_changes = collections.Counter()  # "glEnable(GL_LIGHTING)" → n
+        self.vertices = 0                           # sommets soumis (y compris display lists)
+        self.draws = 0                              # glBegin / glDraw* / glCallList
+        self.replayed = collections.Counter()       # appels rejoués par glCallList
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    @property
+    def total_state_changes(self):
+        return sum(self.state_changes.values())
+
+    def as_dict(self):
+        return {"calls": self.total_calls, "state_changes": self.total_state_changes,
+                "vertices": self.vertices, "draws": self.draws}
+
+
+class _ListLog:
+    # contenu d'une display list compilée : rejoué (compté) à chaque glCallList
+    __slots__ = ("calls", "vertices", "draws")
+
+    def __init__(self):
+        self.calls = collections.Counter()
+        self.vertices = self.draws = 0
+
+
+class Recorder:
+    def __init__(self, keep=1000):
+        self.frames = collections.deque(maxlen=keep)  # frames terminées (les plus récentes)
+        self.current = FrameLog()
+        self.enabled = True
+        self._names = {}        # valeur de constante → nom (pour les clés d'état)
+        self._lists = {}        # id display list → _ListLog
+        self._compiling = None  # _ListLog en cours de glNewList
+
+    def name_constants(self, *modules):
+        for mod in modules:
+            for k, v in vars(mod).items():
+                if k.startswith(("GL_", "GLU_", "GLUT_")) and isinstance(v, int):
+                    self._names.setdefault(int(v), k)
+
+    def _arg_name(self, arg):
+        try:
+            return self._names.get(int(arg), str(arg))
+        except (TypeError, ValueError):
+            return type(arg).__name__
+
+    # ---------- enregistrement -------------------------------------------------------
+    def record(self, name, args):
+        if not self.enabled:
+            return
+        frame = self.current
+        frame.calls[name] += 1
+        if name in STATE_CHANGES:
+            key = "%s(%s)" % (name, self._arg_name(args[0])) if args else name
+            frame.state_changes[key] += 1
+
+        vertices, draw = _submitted(name, args)
+        target = self._compiling
+        if target is not None and name not in ("glNewList", "glEndList"):
+            target.calls[name] += 1
+            target.vertices += vertices
+            target.draws += draw
+        else:
+            frame.vertices += vertices
+            frame.draws += draw
+
+        if name == "glNewList":
+            self._compiling = self._lists[args[0]] = _ListLog()
+        elif name == "glEndList":
+            self._compiling = None
+        elif name == "glCallList":
+            content = self._lists.get(args[0])
+            if content is not None:
+                frame.vertices += content.vertices
+                frame.draws += content.draws
+                frame.replayed.update(content.calls)
+        elif name == "glutSwapBuffers":
+            self.end_frame()
+
+    def end_frame(self):
+        self.frames.append(self.current)
+        self.current = FrameLog()
+
+    def reset(self):
+        self.frames.clear()
+        self.current = FrameLog()
+
+    # ---------- bilans ----------------------------------------------------------------
+    @property
+    def last(self):
+        return self.frames[-1] if self.frames else self.current
+
+    def summary(self, frames=None):
+        """Moyennes par frame sur les `frames` dernières frames terminées."""
+        logs = list(self.frames)[-frames:] if frames else list(self.frames)
+        n = max(len(logs), 1)
+        calls = collections.Counter()
+        for log in logs:
+            calls.update(log.calls)
+        return {
+            "frames": len(logs),
+            "calls": sum(l.total_calls for l in logs) / n,
+            "state_changes": sum(l.total_state_changes for l in logs) / n,
+            "vertices": sum(l.vertices for l in logs) / n,
+            "draws": sum(l.draws for l in logs) / n,
+            "by_function": {k: v / n for k, v in calls.most_common()},
+        }
+
+    def report(self, top=15, out=None):
+        out = out or sys.stdout
+        s = self.summary()
+        print("GL frames: %d  calls/frame: %.1f  state changes/frame: %.1f  "
+              "vertices/frame: %.0f  draws/frame: %.1f"
+              % (s["frames"], s["calls"], s["state_changes"], s["vertices"], s["draws"]),
+              file=out)
+        for name, count in list(s["by_function"].items())[:top]:
+            print("  %-28s %8.1f" % (name, count), file=out)
+
+
+def _submitted(name, args):
+    # (sommets, appels de dessin) d'un appel
+    if name.startswith("glVertex") and name[8:9].isdigit():  # pas glVertexPointer…
+        return 1, 0
+    if name == "glBegin":
+        return 0, 1
+    if name in ("glDrawElements", "glDrawArrays"):
+        return int(args[1] if name == "glDrawElements" else args[2]), 1
+    if name == "glDrawElementsInstanced":
+        return int(args[1]) * int(args[4]), 1
+    if name == "glCallList":
+        return 0, 1
+    return 0, 0
+
+
+recorder = Recorder()
+
+
+# ───────────────────────────────────────────────
+# BACKEND "record" : faux modules OpenGL
+# ───────────────────────────────────────────────
+# valeurs dont les viewers dépendent (boutons souris, booléens)
+_FIXED = {"GL_FALSE": 0, "GL_TRUE": 1, "GLUT_LEFT_BUTTON": 0, "GLUT_MIDDLE_BUTTON": 1,
+          "GLUT_RIGHT_BUTTON": 2, "GLUT_DOWN": 0, "GLUT_UP": 1}
+
+_ids = itertools.count(1)
+
+
+def _gen(n):
+    ids = [next(_ids) for _ in range(n)]
+    return ids[0] if n == 1 else ids
+
+
+class _Glut:
+    # boucle GLUT simulée : callbacks enregistrés, timers joués sans attendre
+    def __init__(self):
+        self.display = self.reshape = self.idle = None
+        self.timers = collections.deque()
+        self.redisplay = False
+        self.window = (800, 600)
+
+    def main_loop(self, frames):
+        if self.reshape:
+            self.reshape(*self.window)
+        self.redisplay = self.redisplay or self.display is not None
+        rendered = 0
+        while rendered < frames:
+            while self.timers and not self.redisplay:
+                func, value = self.timers.popleft()
+                func(value)
+            if self.redisplay and self.display:
+                self.redisplay = False
+                self.display()
+                rendered += 1
+            elif self.idle:
+                self.idle()
+                rendered += 1
+            else:
+                break  # plus rien à faire : la scène est au repos
+        recorder.report()
+
+
+_glut = _Glut()
+
+
+def _set(attr):
+    return lambda func, *_: setattr(_glut, attr, func)
+
+
+_RESULTS = {
+    "glGenLists": lambda n: next(_ids),
+    "glGenBuffers": _gen,
+    "glGenTextures": _gen,
+    "glGetAttribLocation": lambda prog, name: int(name[-1]) if name[-1].isdigit() else 0,
+    "gluNewQuadric": lambda: object(),
+    "glutCreateWindow": lambda title: 1,
+    "glutGet": lambda what: 0,
+    "glutInitWindowSize": lambda w, h: setattr(_glut, "window", (w, h)),
+    "glutDisplayFunc": _set("display"),
+    "glutReshapeFunc": _set("reshape"),
+    "glutIdleFunc": _set("idle"),
+    "glutTimerFunc": lambda ms, func, value: _glut.timers.append((func, value)),
+    "glutPostRedisplay": lambda: setattr(_glut, "redisplay", True),
+    "glutMainLoop": lambda: _glut.main_loop(int(os.environ.get("GL_BACKEND_FRAMES", "100"))),
+    "compileShader": lambda src, kind: next(_ids),
+    "compileProgram": lambda *shaders: next(_ids),
+}
+
+
+def _scan_names():
+    # "from OpenGL.GL import *" a besoin de la liste complète des noms
+    pattern = re.compile(r"\b(?:glu?t?[A-Z]\w*|GL(?:U|UT)?_\w+)\b")
+    names = set()
+    for d, _, files in os.walk(ROOT):
+        for f in files:
+            if f.endswith(".py"):
+                with open(os.path.join(d, f), encoding="utf-8") as src:
+                    names.update(pattern.findall(src.read()))
+    return names
+
+
+def _fake_function(name):
+    result = _RESULTS.get(name)
+
+    def call(*args):
+        recorder.record(name, args)
+        return result(*args) if result else None
+    call.__name__ = name
+    return call
+
+
+def _fake_module(name, symbols):
+    mod = types.ModuleType(name)
+    for sym in symbols:
+        setattr(mod, sym, _fake_function(sym) if sym[:2] == "gl" else _FIXED.get(sym, next(_ids)))
+    mod.__all__ = sorted(symbols)
+    return mod
+
+
+def _install_record():
+    names = _scan_names()
+    gl = _fake_module("OpenGL.GL", {n for n in names if re.match(r"gl[A-Z]|GL_", n)})
+    glu = _fake_module("OpenGL.GLU", {n for n in names if re.match(r"glu[A-Z]|GLU_", n)})
+    glut = _fake_module("OpenGL.GLUT", {n for n in names if re.match(r"glut[A-Z]|GLUT_", n)})
+    shaders = types.ModuleType("OpenGL.GL.shaders")
+    shaders.compileShader = _fake_function("compileShader")
+    shaders.compileProgram = _fake_function("compileProgram")
+    gl.shaders = shaders
+
+    root = types.ModuleType("OpenGL")
+    root.GL, root.GLU, root.GLUT = gl, glu, glut
+    sys.modules.update({"OpenGL": root, "OpenGL.GL": gl, "OpenGL.GLU": glu,
+                        "OpenGL.GLUT": glut, "OpenGL.GL.shaders": shaders})
+    recorder.name_constants(gl, glu, glut)
+
+
+# ───────────────────────────────────────────────
+# BACKEND "trace" : PyOpenGL + enregistrement
+# ───────────────────────────────────────────────
+class _Traced:
+    # garde bool(f) de PyOpenGL (False pour une extension absente : vbo_supported…)
+    __slots__ = ("__name__", "__wrapped__")
+
+    def __init__(self, name, func):
+        self.__name__, self.__wrapped__ = name, func
+
+    def __call__(self, *args, **kwargs):
+        recorder.record(self.__name__, args)
+        return self.__wrapped__(*args, **kwargs)
+
+    def __bool__(self):
+        return bool(self.__wrapped__)
+
+
+def _install_trace():
+    import importlib
+    for modname in ("OpenGL.GL", "OpenGL.GLU", "OpenGL.GLUT"):
+        real = importlib.import_module(modname)
+        proxy = types.ModuleType(modname)
+        proxy.__dict__.update({k: v for k, v in vars(real).items()
+                               if not k.startswith("__") or k in ("__path__", "__package__")})
+        for k, v in vars(real).items():
+            if re.match(r"glu?t?[A-Z]", k) and callable(v):
+                setattr(proxy, k, _Traced(k, v))
+        proxy.__all__ = [k for k in vars(proxy) if not k.startswith("_")]
+        sys.modules[modname] = proxy
+        setattr(sys.modules["OpenGL"], modname.split(".")[1], proxy)
+        recorder.name_constants(real)
+
+
+# ───────────────────────────────────────────────
+# SÉLECTION
+# ───────────────────────────────────────────────
+BACKENDS = ("opengl", "trace", "record")
+active = None
+
+
+def use(name):
+    """Installe le backend `name` ; à appeler avant l'import de OpenGL.* par les viewers."""
+    global active
+    if name not in BACKENDS:
+        raise ValueError("unknown GL backend %r (expected one of %s)" % (name, ", ".join(BACKENDS)))
+    if active is not None:
+        if active != name:
+            raise RuntimeError("GL backend already set to %r" % active)
+        return recorder
+    if name == "record":
+        _install_record()
+    elif name == "trace":
+        _install_trace()
+    active = name
+    return recorder
+
+
+if os.environ.get("GL_BACKEND"):
+    use(os.environ["GL_BACKEND"])
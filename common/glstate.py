@@ -0,0 +1,112 @@
+# glstate.py – Cache d'état GL : les appels qui ne changent rien ne partent pas
+# Python 3.x  +  PyOpenGL
+#
+# StateCache garde une ombre de l'état fixe :
+#   • matériau (ambient+diffuse, specular, shininess, emission) composante par composante
+#   • glEnable / glDisable par capacité
+#   • glFrontFace
+#   • texture liée (par cible)
+# Un appel identique à l'ombre est compté dans `elided` et n'est pas émis.
+# État inconnu au départ (ou après invalidate()) → le 1er appel part toujours.
+# Les blocs glPushAttrib / glPopAttrib restaurent eux-mêmes l'état : le code qui y
+# touche directement ne désynchronise pas l'ombre. Tout autre changement "à la main"
+# doit être suivi d'un invalidate().
+#
+# Chaque draw porte une clé de matériau (material(...)) : les renderers trient leurs
+# draws par cette clé pour que les matériaux identiques se suivent.
+from OpenGL.GL import *
+
+NO_EMISSION = (0.0, 0.0, 0.0, 1.0)
+
+
+def material(diffuse, specular, shininess, emission=NO_EMISSION):
+    """Matériau hashable (sert aussi de clé de tri) : 4 composantes figées en tuples."""
+    return (tuple(map(float, diffuse)), tuple(map(float, specular)), float(shininess),
+            tuple(map(float, emission)))
+
+
+def sort_key(mat):
+    # les draws sans matériau d'abord, puis groupés par matériau
+    return (0, ()) if mat is None else (1, mat)
+
+
+class StateCache:
+    def __init__(self):
+        self.issued = self.elided = 0   # totaux depuis le début
+        self.frame_issued = self.frame_elided = 0
+        self.last_frame = (0, 0)        # (émis, évités) de la dernière frame terminée
+        self.invalidate()
+
+    def invalidate(self):
+        self._caps = {}
+        self._material = {}             # (face, pname) → valeur
+        self._front_face = None
+        self._textures = {}
+
+    def _count(self, changed):
+        if changed:
+            self.frame_issued += 1
+        else:
+            self.frame_elided += 1
+        return changed
+
+    # ---------- enable / disable -----------------------------------------------------
+    def set_enabled(self, cap, on):
+        if self._count(self._caps.get(cap) != on):
+            (glEnable if on else glDisable)(cap)
+            self._caps[cap] = on
+
+    def enable(self, *caps):
+        for cap in caps:
+            self.set_enabled(cap, True)
+
+    def disable(self, *caps):
+        for cap in caps:
+            self.set_enabled(cap, False)
+
+    # ---------- front face / texture ---------------------------------------------------
+    def front_face(self, mode):
+        if self._count(self._front_face != mode):
+            glFrontFace(mode)
+            self._front_face = mode
+
+    def bind_texture(self, texture, target=GL_TEXTURE_2D):
+        if self._count(self._textures.get(target) != texture):
+            glBindTexture(target, texture)
+            self._textures[target] = texture
+
+    # ---------- matériau -----------------------------------------------------------------
+    def _material_param(self, face, pname, value):
+        key = (face, pname)
+        if self._count(self._material.get(key) != value):
+            if isinstance(value, float):
+                glMaterialf(face, pname, value)
+            else:
+                glMaterialfv(face, pname, value)
+            self._material[key] = value
+
+    def set_material(self, mat, face=GL_FRONT_AND_BACK):
+        """mat = material(...) ; seules les composantes qui changent sont émises."""
+        diffuse, specular, shininess, emission = mat
+        self._material_param(face, GL_AMBIENT_AND_DIFFUSE, diffuse)
+        self._material_param(face, GL_SPECULAR, specular)
+        self._material_param(face, GL_SHININESS, shininess)
+        self._material_param(face, GL_EMISSION, emission)
+
+    def apply(self, mat=None, enable=(), disable=()):
+        # état complet d'un draw (SceneNode) : capacités puis matériau
+        self.enable(*enable)
+        self.disable(*disable)
+        if mat is not None:
+            self.set_material(mat)
+
+    # ---------- bilan --------------------------------------------------------------------
+    def end_frame(self):
+        self.last_frame = (self.frame_issued, self.frame_elided)
+        self.issued += self.frame_issued
+        self.elided += self.frame_elided
+        self.frame_issued = self.frame_elided = 0
+
+    def line(self):
+        issued, elided = self.last_frame
+        return "state calls: %d issued, %d elided" % (issued, elided)
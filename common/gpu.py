@@ -0,0 +1,151 @@
+# gpu.py – Maillages "retenus" côté GPU (VBO interleavé, uploadé une seule fois)
+# Python 3.x  +  PyOpenGL  +  NumPy
+#
+# Plusieurs pièces (carrosserie, vitres, roue…) partagent un seul VBO + IBO ;
+# chaque pièce = une plage contiguë d'indices → un glDrawElements par matériau.
+# DynamicGpuMesh : même dessin, contenu réécrit souvent (instances pré-transformées) →
+# tampons gardés, glBufferSubData ; réalloués seulement si le contenu grandit.
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+from normals import compute_normals
+
+# x y z | nx ny nz | u v  (float32)
+STRIDE = 8 * 4
+_OFF_NORMAL = ctypes.c_void_p(3 * 4)
+_OFF_UV = ctypes.c_void_p(6 * 4)
+
+
+def vbo_supported():
+    # glGenBuffers est un "null function" si le contexte ne gère pas les VBO (GL < 1.5)
+    return bool(glGenBuffers)
+
+
+def interleave(mesh):
+    # (N,8) position | normale | uv — normales du build, sinon calculées (flat)
+    if mesh.normals is None:
+        mesh = compute_normals(mesh)
+    out = np.empty((mesh.vertex_count, 8), dtype=np.float32)
+    out[:, 0:3] = mesh.positions
+    out[:, 3:6] = mesh.normals
+    out[:, 6:8] = mesh.uvs
+    return out, mesh.indices
+
+
+def draw_immediate(mesh):
+    # repli sans VBO : glBegin/glEnd avec les normales du build
+    if mesh.normals is None:
+        mesh = compute_normals(mesh)
+    pos, nrm = mesh.positions.tolist(), mesh.normals.tolist()
+    glBegin(GL_TRIANGLES)
+    for i in mesh.indices.ravel().tolist():
+        glNormal3f(*nrm[i])
+        glVertex3f(*pos[i])
+    glEnd()
+
+
+class GpuMesh:
+    def __init__(self, parts, textured=False):
+        # parts : dict nom → Mesh (ou un Mesh seul, nommé None)
+        if not isinstance(parts, dict):
+            parts = {None: parts}
+        self.textured = textured
+        self.ranges = {}
+        verts, elems = [], []
+        base = first = 0
+        for name, mesh in parts.items():
+            data, idx = interleave(mesh)
+            self.ranges[name] = (first, idx.size)
+            verts.append(data)
+            elems.append(idx.reshape(-1) + np.uint32(base))
+            base += len(data)
+            first += idx.size
+        verts = np.ascontiguousarray(np.concatenate(verts))
+        elems = np.ascontiguousarray(np.concatenate(elems), dtype=np.uint32)
+
+        self.vbo, self.ibo = glGenBuffers(2)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, verts.nbytes, verts, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, elems.nbytes, elems, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.vertex_count = base
+        self.index_count = first
+
+    def bind(self):
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, STRIDE, None)
+        glNormalPointer(GL_FLOAT, STRIDE, _OFF_NORMAL)
+        if self.textured:
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glTexCoordPointer(2, GL_FLOAT, STRIDE, _OFF_UV)
+
+    def unbind(self):
+        if self.textured:
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw_range(self, name=None):
+        # à appeler entre bind() / unbind()
+        first, count = self.ranges[name]
+        glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * 4))
+
+    def draw(self, name=None):
+        self.bind()
+        self.draw_range(name)
+        self.unbind()
+
+    def draw_spans(self, spans, name=None):
+        # spans : (début, fin) en triangles dans la pièce (feuilles BVH visibles, fusionnées)
+        first = self.ranges[name][0]
+        self.bind()
+        for t0, t1 in spans:
+            glDrawElements(GL_TRIANGLES, 3 * (t1 - t0), GL_UNSIGNED_INT,
+                           ctypes.c_void_p((first + 3 * t0) * 4))
+        self.unbind()
+
+    def delete(self):
+        if self.vbo:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = self.ibo = 0
+
+
+class DynamicGpuMesh(GpuMesh):
+    def __init__(self, textured=False):
+        # une seule pièce (None) ; tampons vides jusqu'au premier set_vertices / set_indices
+        self.textured = textured
+        self.vbo, self.ibo = glGenBuffers(2)
+        self.capacity = {self.vbo: 0, self.ibo: 0}  # octets alloués par tampon
+        self.reallocs = 0   # glBufferData émis (croissance)
+        self.vertex_count = self.index_count = 0
+        self.ranges = {None: (0, 0)}
+
+    def _fill(self, target, buf, data):
+        glBindBuffer(target, buf)
+        if data.nbytes > self.capacity[buf]:  # croissance ×2 : quelques réallocations au plus
+            self.capacity[buf] = max(data.nbytes, 2 * self.capacity[buf])
+            glBufferData(target, self.capacity[buf], None, GL_DYNAMIC_DRAW)
+            self.reallocs += 1
+        if data.nbytes:
+            glBufferSubData(target, 0, data.nbytes, data)
+        glBindBuffer(target, 0)
+
+    def set_vertices(self, data):
+        # data : (N,8) float32 contigu, même disposition que interleave()
+        self._fill(GL_ARRAY_BUFFER, self.vbo, data)
+        self.vertex_count = len(data)
+
+    def set_indices(self, indices):
+        indices = np.ascontiguousarray(indices, dtype=np.uint32).reshape(-1)
+        self._fill(GL_ELEMENT_ARRAY_BUFFER, self.ibo, indices)
+        self.index_count = indices.size
+        self.ranges[None] = (0, indices.size)
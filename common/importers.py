@@ -0,0 +1,453 @@
+# importers.py – Modèles externes : OBJ, STL binaire, PLY binaire → dict pièce → Mesh
+# Python 3.x  +  NumPy
+#
+# Aucun objet Python par sommet : les fichiers sont lus par blocs et convertis d'un coup.
+#   • STL binaire : enregistrements de 50 octets lus dans un tampon réutilisé (readinto)
+#     puis vus par np.frombuffer (dtype structuré) et copiés dans les tableaux de sortie,
+#     alloués d'après le nombre de triangles de l'en-tête ; normales de face calculées
+#     bloc par bloc → mémoire ≈ résultat + 1 bloc. Soupe non soudée : en rendu flat
+#     chaque coin a de toute façon son propre sommet.
+#   • PLY binaire (little / big endian) : dtype structuré construit depuis l'en-tête ;
+#     éléments à liste (faces) lus par blocs : une suite d'enregistrements de même taille
+#     (que des triangles, que des quads…) = un dtype à pas fixe vu par np.frombuffer ;
+#     seul un changement de taille coûte une itération Python. Éléments ignorés : sautés
+#     (seek) ou, à liste, parcourus sans rien garder
+#   • OBJ (texte) : blocs coupés sur fin de ligne (comme world.py) ; lignes v / vt / vn / f
+#     converties par bloc (np.fromstring) ; indices négatifs ; formats v, v/t, v//n, v/t/n
+# Polygones découpés en éventails. Une pièce par groupe de matériau (OBJ `usemtl`,
+# propriété de face PLY `material_index`), "default" sinon ; le STL n'a qu'une pièce.
+# Normales absentes du fichier : OBJ → compute_normals (flat, modèles "à facettes") ;
+# PLY (scans, gros maillages indexés) → normales lissées par sommet (somme des normales
+# de face pondérées par l'aire) sans dédoubler les sommets.
+import os
+
+import numpy as np
+
+from mesh import Mesh, weld
+from normals import compute_normals
+from world import CHUNK_BYTES, fields_per_row, line_chunks
+
+DEFAULT_PART = "default"
+RUN_WINDOW = 64  # enregistrements PLY examinés d'un coup au début d'une suite (puis ×2)
+
+
+def _fan(counts, items):
+    """Polygones (counts (F,), indices à plat) → triangles (T,3) en éventail + face (T,)."""
+    counts = np.asarray(counts, dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    ntri = np.maximum(counts - 2, 0)
+    face = np.repeat(np.arange(len(counts)), ntri)
+    k = np.arange(int(ntri.sum())) - np.repeat(np.cumsum(ntri) - ntri, ntri)
+    base = offsets[face]
+    tris = np.stack([items[base], items[base + k + 1], items[base + k + 2]], axis=1)
+    return tris, face
+
+
+def _triangle_normals(tri):
+    # tri (K,3,3) → normales unitaires (K,3) float32 + masque dégénéré (K,)
+    tri = tri.astype(np.float64)
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    length = np.sqrt(np.einsum("ij,ij->i", n, n))
+    degenerate = length * length <= 1e-12
+    n = np.divide(n, length[:, None], out=np.zeros_like(n), where=~degenerate[:, None])
+    return n.astype(np.float32), degenerate
+
+
+def _vertex_normals(positions, tris):
+    # normales lissées (N,3) : Σ normales de face × aire, accumulées par np.bincount
+    p = positions.astype(np.float64)
+    n = np.cross(p[tris[:, 1]] - p[tris[:, 0]], p[tris[:, 2]] - p[tris[:, 0]])
+    corners = tris.reshape(-1)
+    acc = np.stack([np.bincount(corners, np.repeat(n[:, c], 3), len(positions))
+                    for c in range(3)], axis=1)
+    length = np.sqrt(np.einsum("ij,ij->i", acc, acc))[:, None]
+    return np.divide(acc, length, out=np.zeros_like(acc), where=length > 0).astype(np.float32)
+
+
+def _split_parts(positions, uvs, normals, tris, group, names):
+    """Une pièce (Mesh indexé, sommets compactés) par valeur de group (T,)."""
+    if len(names) == 1:  # un seul groupe : tableaux repris tels quels
+        return {names[0]: Mesh(positions, uvs, tris, normals)}
+    parts = {}
+    for g in np.unique(group):
+        sel = tris[group == g]
+        used, local = np.unique(sel.reshape(-1), return_inverse=True)
+        parts[names[g]] = Mesh(positions[used], None if uvs is None else uvs[used],
+                               local.reshape(-1, 3), normals[used])
+    return parts
+
+
+# ───────────────────────────────────────────────
+# 1)  STL BINAIRE
+# ───────────────────────────────────────────────
+STL_HEADER = 80
+STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("v", "<f4", (3, 3)), ("attr", "<u2")])
+
+
+def load_stl(filename, chunk_bytes=CHUNK_BYTES):
+    """STL binaire → {"default": Mesh soupe avec normales de face}."""
+    with open(filename, "rb") as f:
+        head = f.read(STL_HEADER + 4)
+        if len(head) < STL_HEADER + 4:
+            raise ValueError("%s: truncated STL header" % filename)
+        count = int.from_bytes(head[STL_HEADER:], "little")
+        size = os.fstat(f.fileno()).st_size
+        if size != STL_HEADER + 4 + count * STL_RECORD.itemsize:
+            if head[:5].lower() == b"solid":
+                raise ValueError("%s: ASCII STL is not supported (binary only)" % filename)
+            raise ValueError("%s: %d triangles declared, file size %d does not match"
+                             % (filename, count, size))
+
+        positions = np.empty((count * 3, 3), dtype=np.float32)
+        normals = np.empty((count * 3, 3), dtype=np.float32)
+        degenerate = np.empty(count, dtype=bool)
+        per = max(1, chunk_bytes // STL_RECORD.itemsize)
+        buf = bytearray(per * STL_RECORD.itemsize)
+        done = 0
+        while done < count:
+            k = min(per, count - done)
+            nbytes = k * STL_RECORD.itemsize
+            if f.readinto(memoryview(buf)[:nbytes]) != nbytes:
+                raise ValueError("%s: truncated STL data" % filename)
+            tri = np.frombuffer(buf, dtype=STL_RECORD, count=k)["v"]
+            positions[3 * done:3 * (done + k)] = tri.reshape(-1, 3)
+            n, degenerate[done:done + k] = _triangle_normals(tri)
+            normals[3 * done:3 * (done + k)] = np.repeat(n, 3, axis=0)
+            done += k
+
+    mesh = Mesh(positions, None, None, normals)
+    mesh.degenerate = degenerate
+    return {DEFAULT_PART: mesh}
+
+
+# ───────────────────────────────────────────────
+# 2)  PLY BINAIRE
+# ───────────────────────────────────────────────
+_PLY_TYPES = {"char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+              "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+              "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+              "float": "f4", "float32": "f4", "double": "f8", "float64": "f8"}
+_PLY_UV = (("u", "v"), ("s", "t"), ("texture_u", "texture_v"), ("texture_s", "texture_t"))
+_PLY_MATERIAL = ("material_index", "material")
+
+
+def _ply_type(filename, name, endian):
+    try:
+        return np.dtype(endian + _PLY_TYPES[name.decode()])
+    except KeyError:
+        raise ValueError("%s: unknown PLY property type %r" % (filename, name.decode()))
+
+
+def _ply_header(f, filename):
+    # → (endianness, [(élément, nombre, [(propriété, dtype | (dtype compteur, dtype item))])])
+    if f.readline().strip() != b"ply":
+        raise ValueError("%s: not a PLY file" % filename)
+    fmt, elements = None, []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("%s: PLY header has no end_header" % filename)
+        tok = line.split()
+        if not tok or tok[0] in (b"comment", b"obj_info"):
+            continue
+        if tok[0] == b"end_header":
+            break
+        if tok[0] == b"format":
+            fmt = tok[1].decode()
+        elif tok[0] == b"element":
+            elements.append((tok[1].decode(), int(tok[2]), []))
+        elif tok[0] == b"property":
+            if not elements:
+                raise ValueError("%s: PLY property before any element" % filename)
+            elements[-1][2].append(tok)
+    endian = {"binary_little_endian": "<", "binary_big_endian": ">"}.get(fmt)
+    if endian is None:
+        raise ValueError("%s: PLY format %r is not supported (binary only)" % (filename, fmt))
+    for _, _, props in elements:
+        for k, tok in enumerate(props):
+            if tok[1] == b"list":
+                props[k] = (tok[4].decode(), (_ply_type(filename, tok[2], endian),
+                                              _ply_type(filename, tok[3], endian)))
+            else:
+                props[k] = (tok[2].decode(), _ply_type(filename, tok[1], endian))
+    return endian, elements
+
+
+def _read_records(f, dtype, count, chunk_bytes, filename):
+    # count enregistrements de taille fixe, lus par blocs directement dans le résultat
+    out = np.empty(count, dtype=dtype)
+    raw = out.view(np.uint8)
+    step = max(chunk_bytes, dtype.itemsize)
+    for start in range(0, raw.size, step):
+        view = raw[start:start + step]
+        if f.readinto(memoryview(view)) != view.size:
+            raise ValueError("%s: truncated PLY data" % filename)
+    return out
+
+
+def _list_record(props, li, n):
+    # enregistrement d'un élément dont la liste (propriété li) a exactement n items
+    fields = [(name, t) if k != li else ("__count", t[0]) for k, (name, t) in enumerate(props)]
+    fields.insert(li + 1, ("__items", props[li][1][1], (n,)))
+    return np.dtype(fields)
+
+
+def _refill(f, buf, pos, need, chunk_bytes, filename):
+    # reste non consommé + bloc suivant ; au moins `need` octets disponibles
+    data = f.read(max(chunk_bytes, need - (len(buf) - pos)))
+    buf = buf[pos:] + data
+    if len(buf) < need:
+        raise ValueError("%s: truncated PLY data" % filename)
+    return buf, 0
+
+
+def _read_list_element(f, count, props, chunk_bytes, filename, keep=True):
+    """Élément à UNE propriété liste (tailles variables), lu par blocs : les
+    enregistrements consécutifs de même taille forment une suite, vue d'un coup par
+    np.frombuffer (dtype à pas fixe) puis copiée ; aucun objet Python par enregistrement.
+    → (dict scalaires, compteurs (N,), items à plat) ; keep=False : élément seulement
+    parcouru (rien n'est gardé) → None. Le flux est repositionné en fin d'élément."""
+    lists = [k for k, (_, t) in enumerate(props) if isinstance(t, tuple)]
+    if len(lists) != 1:
+        raise ValueError("%s: PLY list elements need exactly one list property" % filename)
+    li = lists[0]
+    ctype = props[li][1][0]
+    at_count = sum(t.itemsize for _, t in props[:li])
+    head = at_count + ctype.itemsize
+    dtypes, runs = {}, []
+    buf, pos, done, window = b"", 0, 0, RUN_WINDOW
+    while done < count:
+        if len(buf) - pos < head:
+            buf, pos = _refill(f, buf, pos, head, chunk_bytes, filename)
+        n = int(np.frombuffer(buf, ctype, 1, pos + at_count)[0])
+        if n < 0:
+            raise ValueError("%s: negative PLY list size" % filename)
+        rec = dtypes.get(n)
+        if rec is None:
+            rec = dtypes[n] = _list_record(props, li, n)
+        if len(buf) - pos < rec.itemsize:
+            buf, pos = _refill(f, buf, pos, rec.itemsize, chunk_bytes, filename)
+        m = min((len(buf) - pos) // rec.itemsize, count - done, window)
+        view = np.frombuffer(buf, rec, m, pos)
+        # le 1er compteur vaut n : la suite s'arrête au premier qui diffère (lu au bon
+        # endroit, puisque tous les précédents font n items)
+        k = int(np.argmax(view["__count"] != n)) or m
+        window = max(RUN_WINDOW, 2 * k)
+        if keep:
+            runs.append((n, view[:k].copy()))  # copie : le bloc n'est plus référencé
+        pos += k * rec.itemsize
+        done += k
+    f.seek(pos - len(buf), 1)  # octets lus d'avance : élément suivant
+    if not keep:
+        return None
+
+    counts = np.repeat(np.array([n for n, _ in runs], dtype=np.int64),
+                       [len(r) for _, r in runs])
+    items = np.concatenate([r["__items"].reshape(-1) for _, r in runs]) if runs \
+        else np.zeros(0, dtype=props[li][1][1])
+    scalars = {name: np.concatenate([r[name] for _, r in runs]) if runs
+               else np.zeros(0, dtype=t)
+               for k, (name, t) in enumerate(props) if k != li}
+    return scalars, counts, items
+
+
+def _read_faces(f, count, props, chunk_bytes, filename):
+    # → (dict scalaires, triangles (T,3), face d'origine (T,))
+    if sum(isinstance(t, tuple) for _, t in props) != 1:
+        raise ValueError("%s: PLY faces need exactly one list property" % filename)
+    scalars, counts, items = _read_list_element(f, count, props, chunk_bytes, filename)
+    if (counts == 3).all():  # que des triangles : pas d'éventail
+        return scalars, items.reshape(-1, 3).astype(np.int64), np.arange(count)
+    tris, face = _fan(counts, items.astype(np.int64))
+    return scalars, tris, face
+
+
+def load_ply(filename, chunk_bytes=CHUNK_BYTES):
+    """PLY binaire → dict pièce → Mesh indexé (une pièce par material_index)."""
+    with open(filename, "rb") as f:
+        _, elements = _ply_header(f, filename)
+        vertices = faces = None
+        for name, count, props in elements:
+            if name == "face":
+                faces = _read_faces(f, count, props, chunk_bytes, filename)
+            elif any(isinstance(t, tuple) for _, t in props):  # ignoré (tristrips…)
+                _read_list_element(f, count, props, chunk_bytes, filename, keep=False)
+            elif name == "vertex":
+                vertices = _read_records(f, np.dtype(props), count, chunk_bytes, filename)
+            else:  # ignoré, taille fixe : sauté sans être lu
+                f.seek(count * np.dtype(props).itemsize, 1)
+                if f.tell() > os.fstat(f.fileno()).st_size:
+                    raise ValueError("%s: truncated PLY data" % filename)
+
+    if vertices is None or not {"x", "y", "z"} <= set(vertices.dtype.names):
+        raise ValueError("%s: PLY file has no vertex positions" % filename)
+    names = vertices.dtype.names
+    positions = np.stack([vertices[c] for c in "xyz"], axis=1).astype(np.float32)
+    normals = np.stack([vertices[c] for c in ("nx", "ny", "nz")], axis=1).astype(np.float32) \
+        if {"nx", "ny", "nz"} <= set(names) else None
+    uv = next((pair for pair in _PLY_UV if set(pair) <= set(names)), None)
+    uvs = None if uv is None else np.stack([vertices[c] for c in uv], axis=1)
+    if faces is None:
+        return {DEFAULT_PART: Mesh(positions, uvs, np.zeros((0, 3)), normals)}
+
+    scalars, tris, face = faces
+    if len(tris) and (tris.min() < 0 or tris.max() >= len(positions)):
+        raise ValueError("%s: PLY face index out of range" % filename)
+    if normals is None:
+        normals = _vertex_normals(positions, tris)
+    key = next((k for k in _PLY_MATERIAL if k in scalars), None)
+    if key is None:
+        group, names = np.zeros(len(tris), dtype=np.intp), [DEFAULT_PART]
+    else:
+        ids, group = np.unique(scalars[key][face], return_inverse=True)
+        names = ["material_%d" % i for i in ids]
+    return _split_parts(positions, uvs, normals, tris, group.reshape(-1), names)
+
+
+# ───────────────────────────────────────────────
+# 3)  OBJ (texte)
+# ───────────────────────────────────────────────
+def _parse_floats(rows, width, filename, what):
+    # lignes "x y z [w]…" d'un bloc → (n, width) ; colonnes en trop ignorées
+    text = b"\n".join(rows)
+    fields = fields_per_row(text, len(rows))
+    try:
+        values = np.fromstring(text, dtype=np.float32, sep=" ")
+    except ValueError:
+        values = np.empty(0, dtype=np.float32)
+    if values.size != fields.sum() or fields.min() < width:
+        raise ValueError("%s: malformed '%s' line" % (filename, what))
+    if (fields == fields[0]).all():
+        return values.reshape(len(rows), -1)[:, :width]
+    first = np.cumsum(fields) - fields  # largeurs mêlées (v x y z / v x y z r g b)
+    return values[first[:, None] + np.arange(width)]
+
+
+def _parse_faces(rows, bases, filename):
+    # lignes "f a/b/c …" → (compteurs (F,), indices v, vt, vn à plat, base 0, -1 = absent)
+    text = b"\n".join(rows).replace(b"//", b"/0/")
+    counts = fields_per_row(text, len(rows))
+    # largeur (1 : v, 2 : v/t, 3 : v/t/n) de chaque ligne : nombre de "/" par sommet
+    buf = np.frombuffer(text, dtype=np.uint8)
+    line = np.searchsorted(np.flatnonzero(buf == 10), np.flatnonzero(buf == 47))
+    slashes = np.bincount(line, minlength=len(rows))
+    width = slashes // np.maximum(counts, 1) + 1
+    try:
+        values = np.fromstring(text.replace(b"/", b" "), dtype=np.int64, sep=" ")
+    except ValueError:
+        values = np.empty(0, dtype=np.int64)
+    per_line = counts * width
+    if counts.min() < 3 or width.max() > 3 or (slashes % np.maximum(counts, 1)).any() \
+            or values.size != per_line.sum():
+        raise ValueError("%s: malformed 'f' line" % filename)
+
+    corner_line = np.repeat(np.arange(len(rows)), counts)
+    corner = np.arange(len(corner_line)) - np.repeat(np.cumsum(counts) - counts, counts)
+    start = np.repeat(np.cumsum(per_line) - per_line, counts) + corner * width[corner_line]
+    out = []
+    for c in range(3):
+        has = width[corner_line] > c
+        i = np.where(has, values[np.where(has, start + c, 0)], 0)
+        base = bases[corner_line, c]  # (v, vt, vn) déjà lus à cette ligne
+        out.append(np.where(i < 0, base + i, i - 1))
+        out[-1][i == 0] = -1  # absent ("v", "v/t", "v//n")
+    return counts, out
+
+
+def load_obj(filename, chunk_bytes=CHUNK_BYTES):
+    """OBJ → dict matériau → Mesh (normales du fichier si toutes les faces en ont)."""
+    blocks = {b"v": [], b"vt": [], b"vn": []}
+    faces = []          # par bloc : (triangles v, vt, vn (T,3) ×3, matériau (T,))
+    materials = {}
+    mat = None
+    seen = {b"v": 0, b"vt": 0, b"vn": 0}
+    with open(filename, "rb") as f:
+        for lines in line_chunks(f, chunk_bytes):
+            rows = {b"v": [], b"vt": [], b"vn": []}
+            face_rows, face_mat, bases = [], [], []
+            for line in lines:
+                tok = line.split(None, 1)
+                if len(tok) < 2:
+                    continue
+                key = tok[0]
+                if key in rows:
+                    rows[key].append(tok[1])
+                    seen[key] += 1
+                elif key == b"f":
+                    face_rows.append(tok[1])
+                    face_mat.append(mat)
+                    bases.append((seen[b"v"], seen[b"vt"], seen[b"vn"]))
+                elif key == b"usemtl":
+                    mat = materials.setdefault(tok[1].strip().decode(errors="replace"),
+                                               len(materials))
+            for key, width in ((b"v", 3), (b"vt", 2), (b"vn", 3)):
+                if rows[key]:
+                    blocks[key].append(_parse_floats(rows[key], width, filename,
+                                                     key.decode()))
+            if face_rows:
+                counts, corners = _parse_faces(face_rows, np.array(bases), filename)
+                tris = [_fan(counts, c) for c in corners]
+                group = np.array([-1 if m is None else m for m in face_mat])[tris[0][1]]
+                faces.append(([t for t, _ in tris], group))
+
+    arrays = {key: np.concatenate(b) if b else np.zeros((0, w), dtype=np.float32)
+              for (key, b), w in zip(blocks.items(), (3, 2, 3))}
+    if not faces:
+        return {DEFAULT_PART: Mesh(arrays[b"v"])}
+    tv, tt, tn = (np.concatenate([f[0][c] for f in faces]) for c in range(3))
+    group = np.concatenate([f[1] for f in faces])
+    for tri, key in ((tv, b"v"), (tt, b"vt"), (tn, b"vn")):
+        if tri.max(initial=-1) >= len(arrays[key]) or tri.min(initial=0) < -1 or \
+                (key == b"v" and tri.min(initial=0) < 0):
+            raise ValueError("%s: OBJ face index out of range" % filename)
+
+    names = {i: name for name, i in materials.items()}
+    names[-1] = DEFAULT_PART
+    parts = {}
+    for g in np.unique(group):
+        sel = group == g
+        corners = tv[sel].reshape(-1)
+        uv_idx, n_idx = tt[sel].reshape(-1), tn[sel].reshape(-1)
+        uvs = np.zeros((len(corners), 2), dtype=np.float32)
+        has_uv = uv_idx >= 0
+        uvs[has_uv] = arrays[b"vt"][uv_idx[has_uv]]
+        if len(arrays[b"vn"]) and (n_idx >= 0).all():
+            parts[names[g]] = weld(Mesh(arrays[b"v"][corners], uvs, None,
+                                        arrays[b"vn"][n_idx]))
+        else:
+            parts[names[g]] = compute_normals(Mesh(arrays[b"v"][corners], uvs))
+    return parts
+
+
+def load_mtl(obj_filename):
+    """Matériaux des fichiers `mtllib` d'un OBJ : nom → (diffuse, specular, shininess)
+    (RGBA, RGBA, 0..128). Fichiers .mtl absents ignorés."""
+    libs = []
+    with open(obj_filename, "rb") as f:
+        for lines in line_chunks(f, CHUNK_BYTES):
+            libs += [l.split(None, 1)[1].strip().decode(errors="replace")
+                     for l in lines if l.startswith(b"mtllib") and len(l.split()) > 1]
+    out, current = {}, None
+    for lib in libs:
+        path = os.path.join(os.path.dirname(os.path.abspath(obj_filename)), lib)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for line in f:
+                tok = line.split()
+                if not tok:
+                    continue
+                if tok[0] == b"newmtl" and len(tok) > 1:
+                    current = out[tok[1].decode(errors="replace")] = \
+                        [(0.8, 0.8, 0.8, 1.0), (0.0, 0.0, 0.0, 1.0), 0.0]
+                elif current is None:
+                    continue
+                elif tok[0] == b"Kd" and len(tok) >= 4:
+                    current[0] = tuple(float(t) for t in tok[1:4]) + current[0][3:]
+                elif tok[0] == b"Ks" and len(tok) >= 4:
+                    current[1] = tuple(float(t) for t in tok[1:4]) + (1.0,)
+                elif tok[0] == b"Ns" and len(tok) >= 2:
+                    current[2] = min(float(tok[1]) * 128.0 / 1000.0, 128.0)
+                elif tok[0] == b"d" and len(tok) >= 2:
+                    current[0] = current[0][:3] + (float(tok[1]),)
+    return {name: tuple(m) for name, m in out.items()}
@@ -0,0 +1,264 @@
+# instancing.py – Un maillage stocké une fois, dessiné pour N transformations
+# Python 3.x  +  PyOpenGL  +  NumPy
+#
+# Deux chemins, même API (InstanceBatch) :
+#   "gpu" : glDrawElementsInstanced + matrice par instance (attribut, divisor = 1)
+#           et un petit shader GLSL 1.20 qui reproduit l'éclairage fixe (2 lampes)
+#   "cpu" : pré-transformation vectorisée de toutes les instances dans UN maillage
+#           (contextes fixed-function) → 1 glDrawElements, re-cuit si les matrices changent :
+#           sommets écrits en place dans un tableau entrelacé gardé d'un appel à l'autre,
+#           VBO réécrit par glBufferSubData (DynamicGpuMesh), indices renvoyés seulement
+#           si le nombre d'instances ou l'ensemble des miroirs change
+# Dans les deux cas : 1 appel de dessin, quel que soit le nombre d'instances.
+# Une instance miroir (déterminant < 0) garde un winding CCW : pas de glFrontFace.
+# (chemin "gpu" : les miroirs utilisent une copie des indices à winding inversé,
+#  dessinée par un second appel instancié → au plus 2 appels par lot)
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+from bounds import instances_bounds
+from gpu import DynamicGpuMesh, GpuMesh, draw_immediate
+from mesh import Mesh
+from normals import compute_normals
+from scene import compose
+
+_VERTEX_SHADER = """
+#version 120
+attribute vec4 inst0;
+attribute vec4 inst1;
+attribute vec4 inst2;
+attribute vec4 inst3;
+void main() {
+    mat4 inst = mat4(inst0, inst1, inst2, inst3);
+    vec4 eye = gl_ModelViewMatrix * inst * gl_Vertex;
+    vec3 n = normalize(gl_NormalMatrix * (mat3(inst) * gl_Normal));
+    vec4 color = gl_FrontLightModelProduct.sceneColor;
+    for (int i = 0; i < 2; ++i) {
+        vec3 L = normalize(gl_LightSource[i].position.xyz - eye.xyz * gl_LightSource[i].position.w);
+        float d = max(dot(n, L), 0.0);
+        color += gl_FrontLightProduct[i].ambient + gl_FrontLightProduct[i].diffuse * d;
+        if (d > 0.0) {
+            vec3 H = normalize(L + vec3(0.0, 0.0, 1.0));
+            color += gl_FrontLightProduct[i].specular * pow(max(dot(n, H), 0.0), gl_FrontMaterial.shininess);
+        }
+    }
+    gl_FrontColor = color;
+    gl_BackColor = color;
+    gl_TexCoord[0] = gl_MultiTexCoord0;
+    gl_Position = gl_ProjectionMatrix * eye;
+}
+"""
+
+_FRAGMENT_SHADER = """
+#version 120
+void main() { gl_FragColor = gl_Color; }
+"""
+
+MODE = None      # "gpu" | "cpu" imposé à tous les lots (bench, débogage) ; None = auto
+_program = None  # programme partagé par tous les lots (compilé au premier besoin)
+
+
+def _instancing_program():
+    global _program
+    if _program is None:
+        from OpenGL.GL import shaders
+        try:
+            prog = shaders.compileProgram(
+                shaders.compileShader(_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(_FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+            locs = [glGetAttribLocation(prog, "inst%d" % k) for k in range(4)]
+            _program = (prog, locs) if min(locs) >= 0 else False
+        except Exception:  # pas de GLSL 1.20 / erreur de compilation → chemin CPU
+            _program = False
+    return _program
+
+
+def instancing_supported():
+    if not (bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)):
+        return False
+    return bool(_instancing_program())
+
+
+def instance_matrices(transforms):
+    # transforms : liste de tuples d'opérations scene.translate/rotate/scale → (N,4,4)
+    return np.array([compose(ops) for ops in transforms], dtype=np.float64).reshape(-1, 4, 4)
+
+
+def mirrored_mask(matrices):
+    # det(3×3) < 0 par produit mixte, vectorisé (np.linalg.det : LU par matrice, plus lent)
+    a, b, c = matrices[:, :3, 0], matrices[:, :3, 1], matrices[:, :3, 2]
+    return np.einsum("ij,ij->i", a, np.cross(b, c)) < 0
+
+
+def _normal_matrices(lin):
+    # inverse transposée = cofacteurs / det (colonnes : produits vectoriels, sans inversion
+    # LU par matrice) ; instance conforme (rotation × échelle uniforme) : normalisation
+    # repliée dans la matrice → aucune racine par sommet
+    a0, a1, a2 = lin[:, :, 0], lin[:, :, 1], lin[:, :, 2]
+    nm = np.stack([np.cross(a1, a2), np.cross(a2, a0), np.cross(a0, a1)], axis=2)
+    nm /= np.einsum("ij,ij->i", a0, nm[:, :, 0])[:, None, None]
+    gram = nm.transpose(0, 2, 1) @ nm
+    s2 = np.trace(gram, axis1=1, axis2=2) / 3.0
+    conformal = np.abs(gram - s2[:, None, None] * np.identity(3)).max(axis=(1, 2)) \
+        <= 1e-6 * s2
+    nm[conformal] /= np.sqrt(s2[conformal])[:, None, None]
+    return nm, ~conformal
+
+
+def bake_vertices(mesh, matrices, out=None):
+    """Sommets entrelacés (N,V,8) float32 de toutes les instances (disposition de
+    gpu.interleave), écrits dans out s'il est fourni (uv déjà en place)."""
+    n, v = len(matrices), mesh.vertex_count
+    if out is None:
+        out = np.empty((n, v, 8), dtype=np.float32)
+        out[:, :, 6:8] = mesh.uvs
+    # UN produit matriciel (3N,4) × (4,V) en coordonnées homogènes, translation comprise
+    ph = np.ones((4, v), dtype=np.float32)
+    ph[:3] = mesh.positions.T
+    rows = matrices[:, :3, :].astype(np.float32).reshape(3 * n, 4)
+    out[:, :, 0:3] = (rows @ ph).reshape(n, 3, v).transpose(0, 2, 1)
+    if mesh.normals is not None:
+        nm, skewed = _normal_matrices(matrices[:, :3, :3])
+        rows = nm.astype(np.float32).reshape(3 * n, 3)
+        out[:, :, 3:6] = (rows @ mesh.normals.T).reshape(n, 3, v).transpose(0, 2, 1)
+        if skewed.any():  # échelle non uniforme : normalisation par sommet
+            nrm = out[skewed, :, 3:6]
+            length = np.linalg.norm(nrm, axis=2, keepdims=True)
+            out[skewed, :, 3:6] = np.divide(nrm, length, out=np.zeros_like(nrm),
+                                            where=length > 0)
+    return out
+
+
+def instance_indices(mesh, n, mirrored):
+    # miroir (det < 0) → on échange 2 colonnes d'indices pour rester CCW
+    idx = np.broadcast_to(mesh.indices, (n,) + mesh.indices.shape).copy()
+    idx[mirrored] = idx[mirrored][:, :, [0, 2, 1]]
+    idx += (np.arange(n, dtype=np.uint32) * np.uint32(mesh.vertex_count))[:, None, None]
+    return idx.reshape(-1, 3)
+
+
+def bake_instances(mesh, matrices):
+    """Pré-transforme toutes les instances en un seul Mesh (vectorisé)."""
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    n = len(matrices)
+    verts = bake_vertices(mesh, matrices).reshape(-1, 8)
+    out = Mesh(verts[:, 0:3], verts[:, 6:8], instance_indices(mesh, n, mirrored_mask(matrices)),
+               None if mesh.normals is None else verts[:, 3:6])
+    if mesh.degenerate is not None:
+        out.degenerate = np.tile(mesh.degenerate, n)
+    return out
+
+
+# ───────────────────────────────────────────────
+# LOT D'INSTANCES
+# ───────────────────────────────────────────────
+class InstanceBatch:
+    def __init__(self, mesh, matrices, mode=None, use_vbo=True):
+        # mode : "gpu" | "cpu" | None (auto) ; use_vbo=False → mode immédiat (repli ultime)
+        self.mesh = mesh
+        self.use_vbo = use_vbo
+        mode = mode or MODE
+        if mode is None:
+            mode = "gpu" if use_vbo and instancing_supported() else "cpu"
+        self.mode = mode
+        self.gpu = None
+        self.baked = None
+        self._inst_vbo = 0
+        self._n_direct = 0
+        self._verts = None     # cpu : (capacité,V,8) entrelacé, réécrit en place
+        self._mirrored = None  # cpu : masque des miroirs des indices envoyés
+        if self.mode == "cpu" and mesh.normals is None:
+            self.mesh = mesh = compute_normals(mesh)  # une fois, pas à chaque re-cuisson
+        if self.mode == "gpu":
+            mirrored = Mesh(mesh.positions, mesh.uvs, mesh.indices[:, [0, 2, 1]], mesh.normals)
+            self.gpu = GpuMesh({None: mesh, "mirrored": mirrored})
+            self._inst_vbo = glGenBuffers(1)
+        self.set_matrices(matrices)
+
+    @property
+    def compilable(self):
+        # les draws instanciés ne vont pas dans une display list
+        return self.mode != "gpu"
+
+    def __len__(self):
+        return len(self.matrices)
+
+    def set_matrices(self, matrices):
+        self.matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+        self.bounds = instances_bounds(self.mesh.bounds, self.matrices)  # tout le lot
+        if self.mode == "gpu":
+            # instances directes d'abord, miroirs ensuite (winding inversé)
+            mirrored = mirrored_mask(self.matrices)
+            order = np.argsort(mirrored, kind="stable")
+            self._n_direct = int((~mirrored).sum())
+            # colonne-majeur : 4 attributs vec4 = 4 colonnes de la matrice
+            data = np.ascontiguousarray(self.matrices[order].transpose(0, 2, 1), dtype=np.float32)
+            glBindBuffer(GL_ARRAY_BUFFER, self._inst_vbo)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            return
+        self._bake()
+
+    def _bake(self):
+        # chemin cpu : sommets recalculés en place ; VBO / IBO gardés (DynamicGpuMesh)
+        mesh, n = self.mesh, len(self.matrices)
+        if self._verts is None or len(self._verts) < n:  # capacité ×2 (niveaux LOD variables)
+            grown = max(n, 2 * (0 if self._verts is None else len(self._verts)))
+            self._verts = np.empty((grown, mesh.vertex_count, 8), dtype=np.float32)
+            self._verts[:, :, 6:8] = mesh.uvs
+        verts = bake_vertices(mesh, self.matrices, self._verts[:n]).reshape(-1, 8)
+        if self.use_vbo and self.gpu is None:
+            self.gpu = DynamicGpuMesh()
+        mirrored = mirrored_mask(self.matrices)
+        if self._mirrored is None or not np.array_equal(mirrored, self._mirrored):  # n compris
+            self._mirrored = mirrored
+            self._indices = instance_indices(mesh, n, mirrored)
+            if self.gpu is not None:
+                self.gpu.set_indices(self._indices)
+        if self.gpu is not None:
+            self.gpu.set_vertices(verts)
+        else:
+            self.baked = Mesh(verts[:, 0:3], verts[:, 6:8], self._indices, verts[:, 3:6])
+
+    def draw(self):
+        if not len(self.matrices):
+            return
+        if self.mode == "cpu":
+            if self.gpu is not None:
+                self.gpu.draw()
+            else:
+                draw_immediate(self.baked)
+            return
+
+        prog, locs = _instancing_program()
+        glUseProgram(prog)
+        self.gpu.bind()
+        glBindBuffer(GL_ARRAY_BUFFER, self._inst_vbo)
+        for loc in locs:
+            glEnableVertexAttribArray(loc)
+            glVertexAttribDivisor(loc, 1)
+        n_total = len(self.matrices)
+        for part, start, n in ((None, 0, self._n_direct),
+                               ("mirrored", self._n_direct, n_total - self._n_direct)):
+            if not n:
+                continue
+            for k, loc in enumerate(locs):
+                glVertexAttribPointer(loc, 4, GL_FLOAT, GL_FALSE, 64,
+                                      ctypes.c_void_p(64 * start + 16 * k))
+            first, count = self.gpu.ranges[part]
+            glDrawElementsInstanced(GL_TRIANGLES, count, GL_UNSIGNED_INT,
+                                    ctypes.c_void_p(first * 4), n)
+        for loc in locs:
+            glVertexAttribDivisor(loc, 0)
+            glDisableVertexAttribArray(loc)
+        self.gpu.unbind()
+        glUseProgram(0)
+
+    def delete(self):
+        if self.gpu is not None:
+            self.gpu.delete()
+        if self._inst_vbo:
+            glDeleteBuffers(1, [self._inst_vbo])
+            self._inst_vbo = 0
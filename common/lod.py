@@ -0,0 +1,121 @@
+# lod.py – Niveaux de détail par instance (taille projetée à l'écran + hystérésis)
+# Python 3.x  +  PyOpenGL  +  NumPy
+#
+# Une primitive (cylindre, sphère…) est tessellée UNE fois par niveau au build (les
+# niveaux passent par le cache disque comme les autres pièces) : niveau 0 = le plus fin.
+# LodBatch remplace un InstanceBatch (même API : set_matrices / draw / bounds / delete) :
+#   • à chaque draw, diamètre projeté (pixels) de chaque instance, vectorisé :
+#       rayon × f × hauteur viewport / profondeur   (f = projection[1,1])
+#   • niveau = nombre de seuils (pixels, décroissants) au-dessus de la taille, avec une
+#     bande d'hystérésis ±HYSTERESIS autour de chaque seuil : une instance ne change de
+#     niveau qu'une fois la bande franchie → pas de clignotement à la limite
+#   • 1 InstanceBatch par niveau ; les instances ne sont redistribuées que si un
+#     niveau a changé (ou si les matrices ont bougé)
+# camera : () → (modelview du repère des instances, projection, hauteur viewport) ;
+#          None ou projection None → niveau 0 partout.
+import numpy as np
+
+from bounds import instances_bounds
+from instancing import InstanceBatch
+
+HYSTERESIS = 0.15  # ±15 % autour de chaque seuil
+
+
+def projected_size(centers, radii, modelview, projection, viewport_h):
+    """Diamètre à l'écran (pixels) de N sphères (centres (N,3), rayons (N,)) ; inf si la
+    sphère touche le plan de la caméra."""
+    lin, t = modelview[:3, :3], modelview[:3, 3]
+    depth = -(centers @ lin[2] + t[2])
+    scale = float(np.sqrt((lin * lin).sum(axis=0)).max())
+    size = np.full(len(centers), np.inf)
+    far = depth > radii * scale
+    size[far] = radii[far] * scale * projection[1, 1] * viewport_h / depth[far]
+    return size
+
+
+def select_levels(size, thresholds, current=None, hysteresis=HYSTERESIS):
+    """Niveaux (N,) pour des tailles (N,) ; thresholds : pixels, décroissants
+    (len = niveaux - 1). current : niveaux précédents (-1 = pas encore choisi)."""
+    thr = np.asarray(thresholds, dtype=np.float64)
+    below = size[:, None] < thr
+    raw = below.sum(axis=1)
+    if current is None or hysteresis <= 0:
+        return raw
+    # passer au niveau plus fin exige taille ≥ seuil·(1+h) ; au plus grossier, < seuil·(1-h)
+    finest = (size[:, None] < thr * (1.0 - hysteresis)).sum(axis=1)
+    coarsest = (size[:, None] < thr * (1.0 + hysteresis)).sum(axis=1)
+    return np.where(current < 0, raw, np.clip(current, finest, coarsest))
+
+
+class LodBatch:
+    compilable = False  # le niveau change avec la caméra → jamais en display list
+
+    def __init__(self, levels, matrices, thresholds, hysteresis=HYSTERESIS, use_vbo=True,
+                 radius=None):
+        # radius : taille du détail tessellé (rayon d'un poteau fin) ; défaut = sphère englobante
+        if len(thresholds) != len(levels) - 1:
+            raise ValueError("LodBatch: %d levels need %d thresholds, got %d"
+                             % (len(levels), len(levels) - 1, len(thresholds)))
+        self.levels = list(levels)
+        self.thresholds = tuple(float(t) for t in thresholds)
+        self.hysteresis = hysteresis
+        self.radius = radius
+        self.camera = None
+        empty = np.zeros((0, 4, 4))
+        self.batches = [InstanceBatch(m, empty, use_vbo=use_vbo) for m in self.levels]
+        self._level_vertices = np.array([m.vertex_count for m in self.levels])
+        self.level = np.zeros(0, dtype=np.intp)
+        self.vertices = self.full_vertices = 0  # sommets du dernier draw / au niveau 0
+        self.switches = 0                       # changements de niveau (toutes instances)
+        self.set_matrices(matrices)
+
+    def __len__(self):
+        return len(self.matrices)
+
+    @property
+    def mode(self):
+        return self.batches[0].mode
+
+    def set_matrices(self, matrices):
+        self.matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+        n = len(self.matrices)
+        ref = self.levels[0].bounds
+        self.bounds = instances_bounds(ref, self.matrices)
+        if ref is not None and n:
+            lin = self.matrices[:, :3, :3]
+            self._centers = (lin.reshape(3 * n, 3) @ ref.center).reshape(n, 3) \
+                + self.matrices[:, :3, 3]
+            radius = ref.radius if self.radius is None else self.radius
+            self._radii = radius * np.sqrt((lin * lin).sum(axis=1)).max(axis=1)
+        else:
+            self._centers, self._radii = np.zeros((n, 3)), np.zeros(n)
+        if len(self.level) != n:  # nouvelles instances : niveau choisi sans hystérésis
+            self.level = np.full(n, -1, dtype=np.intp)
+        self._dirty = True
+
+    def update(self, modelview=None, projection=None, viewport_h=None):
+        """Choisit le niveau de chaque instance ; redistribue si quelque chose a changé."""
+        if projection is None or modelview is None or not len(self.matrices):
+            level = np.zeros(len(self.matrices), dtype=np.intp)
+        else:
+            size = projected_size(self._centers, self._radii, modelview, projection, viewport_h)
+            level = select_levels(size, self.thresholds, self.level, self.hysteresis)
+        changed = level != self.level
+        if changed.any() or self._dirty:
+            self.switches += int((changed & (self.level >= 0)).sum())
+            self.level = level
+            for k, batch in enumerate(self.batches):
+                batch.set_matrices(self.matrices[level == k])
+            self._dirty = False
+        counts = np.bincount(self.level, minlength=len(self.levels))
+        self.vertices = int(counts @ self._level_vertices)
+        self.full_vertices = len(self.matrices) * int(self._level_vertices[0])
+
+    def draw(self):
+        self.update(*(self.camera() if self.camera is not None else ()))
+        for batch in self.batches:
+            batch.draw()
+
+    def delete(self):
+        for batch in self.batches:
+            batch.delete()
@@ -0,0 +1,233 @@
+# mesh.py – Stockage compact des maillages (tableaux float32 + indices)
+# Python 3.x  +  NumPy
+#
+# Un Mesh garde des tableaux contigus :
+#   positions (N,3) float32 • uvs (N,2) float32 • normals (N,3) float32 ou None
+#   indices   (M,3) uint32  → un triangle = 3 indices dans les tableaux de sommets
+# Les normales sont calculées une fois au build (voir normals.py), le volume
+# englobant (mesh.bounds : AABB + sphère, voir bounds.py) au premier accès.
+# Les anciens appelants (tri.vertices[i].x) passent par des vues en lecture seule.
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+from bounds import Bounds
+
+# sommet "brut" utilisé par les builders : un tuple, pas de __dict__
+Vertex = namedtuple("Vertex", "x y z u v", defaults=(0.0, 0.0))
+
+
+# ───────────────────────────────────────────────
+# 1)  VUES LECTURE SEULE (compatibilité)
+# ───────────────────────────────────────────────
+class VertexView:
+    __slots__ = ("_mesh", "_i")
+
+    def __init__(self, mesh, i):
+        self._mesh, self._i = mesh, i
+
+    x = property(lambda self: float(self._mesh.positions[self._i, 0]))
+    y = property(lambda self: float(self._mesh.positions[self._i, 1]))
+    z = property(lambda self: float(self._mesh.positions[self._i, 2]))
+    u = property(lambda self: float(self._mesh.uvs[self._i, 0]))
+    v = property(lambda self: float(self._mesh.uvs[self._i, 1]))
+
+
+class TriangleView:
+    __slots__ = ("_mesh", "_t")
+
+    def __init__(self, mesh, t):
+        self._mesh, self._t = mesh, t
+
+    @property
+    def vertices(self):
+        i0, i1, i2 = self._mesh.indices[self._t]
+        m = self._mesh
+        return (VertexView(m, int(i0)), VertexView(m, int(i1)), VertexView(m, int(i2)))
+
+
+# ───────────────────────────────────────────────
+# 2)  MESH
+# ───────────────────────────────────────────────
+class Mesh:
+    def __init__(self, positions, uvs=None, indices=None, normals=None):
+        self.positions = np.ascontiguousarray(positions, dtype=np.float32).reshape(-1, 3)
+        n = len(self.positions)
+        if uvs is None:
+            uvs = np.zeros((n, 2), dtype=np.float32)
+        self.uvs = np.ascontiguousarray(uvs, dtype=np.float32).reshape(-1, 2)
+        if indices is None:  # soupe de triangles : sommets pris 3 par 3
+            indices = np.arange(n, dtype=np.uint32)
+        self.indices = np.ascontiguousarray(indices, dtype=np.uint32).reshape(-1, 3)
+        self.normals = None if normals is None else \
+            np.ascontiguousarray(normals, dtype=np.float32).reshape(-1, 3)
+        self.degenerate = None      # masque (M,) rempli par normals.compute_normals
+        self.weld_stats = None      # WeldStats si le maillage sort de weld()
+        self.simplify_stats = None  # SimplifyStats si le maillage sort de simplify()
+        self._bounds = None         # Bounds (AABB + sphère), calculé au 1er accès
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 3), dtype=np.float32))
+
+    @classmethod
+    def concat(cls, meshes):
+        meshes = list(meshes)
+        if not meshes:
+            return cls.empty()
+        offsets = np.cumsum([0] + [len(m.positions) for m in meshes[:-1]])
+        normals = None
+        if all(m.normals is not None for m in meshes):
+            normals = np.concatenate([m.normals for m in meshes])
+        out = cls(
+            np.concatenate([m.positions for m in meshes]),
+            np.concatenate([m.uvs for m in meshes]),
+            np.concatenate([m.indices + np.uint32(o) for m, o in zip(meshes, offsets)]),
+            normals,
+        )
+        if all(m.degenerate is not None for m in meshes):
+            out.degenerate = np.concatenate([m.degenerate for m in meshes])
+        return out
+
+    def __add__(self, other):
+        return Mesh.concat([self, other])
+
+    # ---- accès "à l'ancienne" : séquence de triangles -----------------------
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, t):
+        if t < 0:
+            t += len(self.indices)
+        if not 0 <= t < len(self.indices):
+            raise IndexError(t)
+        return TriangleView(self, t)
+
+    def __iter__(self):
+        for t in range(len(self.indices)):
+            yield TriangleView(self, t)
+
+    # ---- utilitaires -----------------------------------------------------------
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+    @property
+    def nbytes(self):
+        total = self.positions.nbytes + self.uvs.nbytes + self.indices.nbytes
+        if self.normals is not None:
+            total += self.normals.nbytes
+        return total
+
+    @property
+    def bounds(self):
+        # positions figées après le build → calculé une fois (ou relu du cache disque)
+        if self._bounds is None:
+            self._bounds = Bounds.from_points(self.positions)
+        return self._bounds
+
+    @bounds.setter
+    def bounds(self, value):
+        self._bounds = value
+
+    def triangle_positions(self):
+        # (M,3,3) : coordonnées des 3 coins de chaque triangle
+        return self.positions[self.indices]
+
+
+# ───────────────────────────────────────────────
+# 3)  SOUDURE DES SOMMETS (soupe → indices + sommets uniques)
+# ───────────────────────────────────────────────
+WELD_EPS = 1e-6  # deux attributs à moins de WELD_EPS = même sommet
+
+# multiplicateurs (impairs, 64 bits) pour le hachage des lignes quantifiées
+_HASH_MULT = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+                       0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53,
+                       0x94D049BB133111EB, 0xBF58476D1CE4E5B9], dtype=np.uint64)
+
+
+class WeldStats:
+    def __init__(self, vertices_in, vertices_out, bytes_in, bytes_out):
+        self.vertices_in, self.vertices_out = vertices_in, vertices_out
+        self.bytes_in, self.bytes_out = bytes_in, bytes_out
+
+    @property
+    def saved_vertices(self):
+        return self.vertices_in - self.vertices_out
+
+    @property
+    def saved_ratio(self):
+        return 1.0 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    def __repr__(self):
+        return (f"WeldStats({self.vertices_in} → {self.vertices_out} sommets, "
+                f"{self.bytes_in} → {self.bytes_out} octets, -{self.saved_ratio:.0%})")
+
+
+def unique_rows(q):
+    """Lignes identiques d'un tableau entier (N,K) → (first, inverse) : q[first][inverse]
+    == q, comme np.unique(axis=0) mais sans tri lexicographique (groupes dans un ordre
+    quelconque) : 1 clé de hachage uint64 par ligne, collisions vérifiées (repli exact)."""
+    h = np.zeros(len(q), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for k in range(q.shape[1]):
+            h = (h ^ q[:, k].astype(np.uint64)) * _HASH_MULT[k % len(_HASH_MULT)]
+    _, first, inverse = np.unique(h, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    if not np.array_equal(q, q[first][inverse]):  # collision (rarissime) → tri exact
+        _, first, inverse = np.unique(q, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+    return first, inverse
+
+
+def weld(mesh, eps=WELD_EPS):
+    """Fusionne les sommets dont position, uv (et normale si présente) coïncident
+    à eps près. Renvoie un nouveau Mesh ; mesh.weld_stats indique le gain."""
+    cols = [mesh.positions, mesh.uvs]
+    if mesh.normals is not None:  # arêtes vives : normales différentes = sommets distincts
+        cols.append(mesh.normals)
+    rows = np.hstack(cols).astype(np.float64)
+    q = np.round(rows / eps).astype(np.int64) if eps > 0 else rows.view(np.int64)
+    first, inverse = unique_rows(q)
+
+    out = Mesh(mesh.positions[first], mesh.uvs[first], inverse[mesh.indices],
+               None if mesh.normals is None else mesh.normals[first])
+    out.degenerate = mesh.degenerate
+    out.weld_stats = WeldStats(mesh.vertex_count, out.vertex_count, mesh.nbytes, out.nbytes)
+    return out
+
+
+# ───────────────────────────────────────────────
+# 4)  BUILDER (remplace les listes de Triangle)
+# ───────────────────────────────────────────────
+class MeshBuilder:
+    """Accumule une soupe de triangles dans des tableaux plats (aucun objet par
+    sommet) ; build() la soude en sommets uniques + indices."""
+
+    def __init__(self):
+        self._verts = array("f")
+
+    def add_tri(self, v0, v1, v2):
+        for v in (v0, v1, v2):
+            self._verts.extend(v if len(v) == 5 else Vertex(*v))
+
+    def add_quad(self, v0, v1, v2, v3):
+        self.add_tri(v0, v1, v2)
+        self.add_tri(v0, v2, v3)
+
+    def __iadd__(self, other):
+        if isinstance(other, MeshBuilder):
+            self._verts.extend(other._verts)
+            return self
+        corners = other.indices.reshape(-1)
+        data = np.hstack([other.positions[corners], other.uvs[corners]])
+        self._verts.frombytes(np.ascontiguousarray(data, dtype=np.float32).tobytes())
+        return self
+
+    def __len__(self):
+        return len(self._verts) // 15
+
+    def build(self, eps=WELD_EPS):
+        data = np.frombuffer(self._verts, dtype=np.float32).reshape(-1, 5)
+        return weld(Mesh(data[:, :3], data[:, 3:]), eps)
@@ -0,0 +1,359 @@
+# mesh_cache.py – Cache disque des maillages compilés (lecture par mmap)
+# Python 3.x  +  NumPy
+#
+# Une entrée = un fichier binaire par nom ("ex3_sector.mesh", "World.txt.mesh"…) :
+#   [MAGIC 8o | version u32 | taille en-tête u32] [en-tête JSON] [tableaux alignés 64o]
+# L'en-tête porte la clé (hash des paramètres de géométrie + du code qui construit),
+# l'empreinte des fichiers sources (taille, mtime, sha256) et les plages de chaque pièce
+# (sommets / indices) et leur volume englobant → au démarrage : 1 mmap + vérification
+# de l'en-tête, sans repasser sur les positions.
+# Clé différente ou source modifiée ⇒ entrée périmée, reconstruite et réécrite.
+# Source touchée mais identique (même sha256) ⇒ nouveau mtime réécrit dans l'en-tête.
+#
+# load_model(path, lods=(0.5, 0.25)) ajoute des pièces décimées "<pièce>_lodK"
+# (simplify.py) dans la MÊME entrée : les niveaux sont relus avec le maillage.
+#
+# CLI :  python common/mesh_cache.py warm <dossier> [--lods 0.5 0.25]
+#        python common/mesh_cache.py list | clear
+import hashlib
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from bounds import Bounds
+from mesh import Mesh
+
+MAGIC = b"MESHCACH"
+VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<8sII")
+
+# modules dont dépend le résultat d'un build → leur code fait partie de la clé
+_HERE = os.path.dirname(os.path.abspath(__file__))
+CODE_FILES = [os.path.join(_HERE, f)
+              for f in ("mesh.py", "normals.py", "symmetry.py", "bounds.py",
+                        "mesh_cache.py")]
+
+# (champ Mesh, dtype, largeur) ; les champs None sont simplement absents du fichier
+_FIELDS = (("positions", "<f4", 3), ("uvs", "<f4", 2), ("normals", "<f4", 3),
+           ("indices", "<u4", 3), ("degenerate", "|b1", 1))
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def default_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pyopengl-viewers", "meshes")
+
+
+def _sha256_file(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def cache_key(params=None, code=()):
+    """Clé d'une entrée : paramètres de géométrie (dict JSON-able) + code source."""
+    h = hashlib.sha256()
+    h.update(json.dumps(params, sort_keys=True, default=repr).encode())
+    for path in list(code) + CODE_FILES:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# ───────────────────────────────────────────────
+# CACHE
+# ───────────────────────────────────────────────
+class MeshCache:
+    def __init__(self, directory=None, enabled=None):
+        self.directory = directory or os.environ.get("MESH_CACHE_DIR") or default_dir()
+        if enabled is None:  # MESH_CACHE=0 → toujours reconstruire
+            enabled = os.environ.get("MESH_CACHE", "1") != "0"
+        self.enabled = enabled
+        self.hits = self.misses = 0
+
+    def path(self, name):
+        safe = "".join(c if c.isalnum() or c in "._-" else "_" for c in name)
+        return os.path.join(self.directory, safe + ".mesh")
+
+    # ---------- lecture -------------------------------------------------------------
+    @staticmethod
+    def _read_header(path):
+        with open(path, "rb") as f:
+            magic, version, size = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC or version != VERSION:
+                return None
+            header = json.loads(f.read(size))
+        header["data_start"], header["header_size"] = _align(_PREFIX.size + size), size
+        return header
+
+    @staticmethod
+    def _sources_match(stamps):
+        """True si les sources n'ont pas changé ; met à jour en place le mtime des
+        fichiers touchés mais identiques (stamp["refreshed"]) pour ne plus les rehacher."""
+        for old in stamps:
+            try:
+                new = _file_stamp(old["path"])
+            except OSError:
+                return False
+            if new["size"] != old["size"]:
+                return False
+            # mtime identique → pas besoin de relire ; sinon on compare le contenu
+            if new["mtime_ns"] != old["mtime_ns"]:
+                if _sha256_file(old["path"]) != old["sha256"]:
+                    return False
+                old["mtime_ns"], old["refreshed"] = new["mtime_ns"], True
+        return True
+
+    @staticmethod
+    def _rewrite_header(path, header):
+        """Réécrit l'en-tête sur place (nouveaux mtime) s'il tient avant les données."""
+        for stamp in header["files"]:
+            stamp.pop("refreshed", None)
+        text = json.dumps({k: v for k, v in header.items()
+                           if k not in ("data_start", "header_size")}).encode()
+        start, size = header["data_start"], header["header_size"]
+        if len(text) < size:  # le JSON tolère des espaces en fin
+            text += b" " * (size - len(text))
+        if _align(_PREFIX.size + len(text)) != start:
+            return  # ne tient plus : tant pis, la prochaine écriture le rafraîchira
+        try:
+            with open(path, "r+b") as f:
+                f.write(_PREFIX.pack(MAGIC, VERSION, len(text)))
+                f.write(text)
+        except OSError:  # cache en lecture seule : on rehachera la prochaine fois
+            pass
+
+    def load(self, name, key):
+        """dict nom → Mesh (tableaux mmap en lecture seule), ou None si absent/périmé."""
+        if not self.enabled:
+            return None
+        path = self.path(name)
+        try:
+            header = self._read_header(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        if header is None or header["key"] != key or not self._sources_match(header["files"]):
+            return None
+        if any(stamp.get("refreshed") for stamp in header["files"]):
+            self._rewrite_header(path, header)
+
+        raw = np.asarray(np.memmap(path, dtype=np.uint8, mode="r"))  # vue ndarray du mmap
+        arrays = {}
+        for field, (offset, dtype, count, width) in header["arrays"].items():
+            offset += header["data_start"]
+            nbytes = count * width * np.dtype(dtype).itemsize
+            arrays[field] = raw[offset:offset + nbytes].view(dtype).reshape(count, width)
+
+        normals, degenerate = arrays.get("normals"), arrays.get("degenerate")
+        bounds = header.get("bounds", {})
+        parts = {}
+        for pname, (v0, v1, i0, i1) in header["parts"].items():
+            mesh = Mesh(arrays["positions"][v0:v1], arrays["uvs"][v0:v1],
+                        arrays["indices"][i0:i1],
+                        None if normals is None else normals[v0:v1])
+            if degenerate is not None:
+                mesh.degenerate = degenerate[i0:i1, 0]
+            if bounds.get(pname):
+                mesh.bounds = Bounds(*bounds[pname])
+            parts[pname] = mesh
+        return parts
+
+    # ---------- écriture ------------------------------------------------------------
+    def store(self, name, key, parts, files=()):
+        if not self.enabled:
+            return
+        meshes = list(parts.values())
+        ranges, v, i = {}, 0, 0
+        for pname, m in parts.items():
+            ranges[pname] = (v, v + m.vertex_count, i, i + len(m.indices))
+            v, i = v + m.vertex_count, i + len(m.indices)
+
+        blobs, arrays, offset = [], {}, 0
+        for field, dtype, width in _FIELDS:
+            values = [getattr(m, field) for m in meshes]
+            if not values or any(a is None for a in values):
+                continue
+            # une seule pièce (gros modèle importé) : pas de copie concaténée
+            data = values[0] if len(values) == 1 else np.concatenate(values)
+            data = np.ascontiguousarray(data, dtype=dtype).reshape(-1, width)
+            offset = _align(offset)
+            arrays[field] = (offset, dtype, len(data), width)  # relatif au début des données
+            blobs.append((offset, data))
+            offset += data.nbytes
+
+        stamps = []
+        for f in files:
+            stamp = _file_stamp(f)
+            stamp["sha256"] = _sha256_file(f)
+            stamps.append(stamp)
+        bounds = {}
+        for pname, m in parts.items():
+            b = m.bounds
+            bounds[pname] = None if b is None else \
+                (b.lo.tolist(), b.hi.tolist(), b.center.tolist(), b.radius)
+        header = json.dumps({"key": key, "files": stamps, "arrays": arrays,
+                             "parts": ranges, "bounds": bounds}).encode()
+        start = _align(_PREFIX.size + len(header))
+
+        path = self.path(name)
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+                f.write(header)
+                for off, data in blobs:
+                    f.seek(start + off)
+                    data.tofile(f)
+            os.replace(tmp, path)  # écriture atomique : jamais d'entrée à moitié écrite
+        except OSError as e:  # dossier en lecture seule, fichier mappé ailleurs (Windows)…
+            print(f"Warning: mesh cache entry '{name}' not written ({e})")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # ---------- usage courant --------------------------------------------------------
+    def get_or_build(self, name, build, params=None, code=(), files=()):
+        """build() → dict nom → Mesh ; relu depuis le cache si la clé et les sources
+        (files) n'ont pas changé, sinon reconstruit puis réécrit."""
+        key = cache_key(params, code)
+        parts = self.load(name, key)
+        if parts is not None:
+            self.hits += 1
+            return parts
+        self.misses += 1
+        parts = build()
+        self.store(name, key, parts, files)
+        return parts
+
+    def entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, f)
+                      for f in os.listdir(self.directory) if f.endswith(".mesh"))
+
+    def clear(self):
+        for path in self.entries():
+            os.remove(path)
+
+
+_default = None
+
+
+def default_cache():
+    global _default
+    if _default is None:
+        _default = MeshCache()
+    return _default
+
+
+# ───────────────────────────────────────────────
+# MODÈLES SUR DISQUE (une entrée par fichier source)
+# ───────────────────────────────────────────────
+def _build_world(path):
+    from mesh import weld
+    from world import load_world
+    return {"world": weld(load_world(path))}  # soupe → sommets uniques + indices
+
+
+def _build_import(loader):
+    def build(path):
+        import importers
+        return getattr(importers, loader)(path)
+    return build
+
+
+# extension → (fonction de build, modules dont dépend le résultat)
+_IMPORT_CODE = [os.path.join(_HERE, f) for f in ("importers.py", "world.py")]
+LOADERS = {
+    ".txt": (_build_world, [os.path.join(_HERE, "world.py")]),
+    ".obj": (_build_import("load_obj"), _IMPORT_CODE),
+    ".stl": (_build_import("load_stl"), _IMPORT_CODE),
+    ".ply": (_build_import("load_ply"), _IMPORT_CODE),
+}
+# normales des niveaux décimés, comme à l'import : PLY lissé, OBJ / STL / World.txt flat
+LOD_CREASE = {".ply": 180.0}
+
+
+def load_model(path, cache=None, lods=()):
+    """Charge un modèle (dict nom de pièce → Mesh) en passant par le cache.
+    lods : fractions de triangles des niveaux décimés à ajouter ("<pièce>_lodK")."""
+    cache = cache or default_cache()
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in LOADERS:
+        raise ValueError("%s: unsupported model format" % path)
+    build, code = LOADERS[ext]
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    path = os.path.abspath(path)
+    name = "%s-%s" % (os.path.basename(path), hashlib.sha1(path.encode()).hexdigest()[:8])
+    params = {"format": ext}
+    if lods:
+        from simplify import add_lods
+        lods = tuple(float(r) for r in lods)
+        crease = LOD_CREASE.get(ext)
+        params["lods"], params["lod_crease"] = lods, crease
+        code = code + [os.path.join(_HERE, "simplify.py")]
+        base = build
+        build = lambda p: add_lods(base(p), lods, crease)
+    return cache.get_or_build(name, lambda: build(path), params=params,
+                              code=code, files=[path])
+
+
+def _main(argv=None):
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Compiled mesh cache")
+    parser.add_argument("--dir", help="cache directory (default: %s)" % default_dir())
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    warm = sub.add_parser("warm", help="pre-build every supported model in a directory")
+    warm.add_argument("paths", nargs="+")
+    warm.add_argument("--lods", type=float, nargs="*", default=(),
+                      help="also store decimated levels (fractions of the triangles)")
+    sub.add_parser("list", help="list cache entries")
+    sub.add_parser("clear", help="delete every cache entry")
+    args = parser.parse_args(argv)
+
+    cache = MeshCache(args.dir, enabled=True)
+    if args.cmd == "list":
+        for path in cache.entries():
+            print("%10d  %s" % (os.path.getsize(path), os.path.basename(path)))
+    elif args.cmd == "clear":
+        cache.clear()
+    else:
+        for root in args.paths:
+            files = [root] if os.path.isfile(root) else [
+                os.path.join(d, f) for d, _, names in os.walk(root) for f in sorted(names)]
+            for path in files:
+                if os.path.splitext(path)[1].lower() not in LOADERS:
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    parts = load_model(path, cache, args.lods)
+                except ValueError as e:  # .txt qui n'est pas un fichier NUMPOLLIES…
+                    print("skip  %s (%s)" % (path, e))
+                    continue
+                tris = sum(len(m) for n, m in parts.items() if "_lod" not in n)
+                levels = "".join("  lod%d %d" % (k, sum(len(m) for n, m in parts.items()
+                                                        if n.endswith("_lod%d" % k)))
+                                 for k in range(1, len(args.lods) + 1))
+                print("ok    %s  %d triangles%s  %.2fs"
+                      % (path, tris, levels, time.perf_counter() - t0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
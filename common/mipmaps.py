@@ -0,0 +1,145 @@
+# mipmaps.py – Chaîne de mipmaps en NumPy (remplace gluBuild2DMipmaps)
+# Python 3.x  +  NumPy
+#
+# • filtrage en espace LINÉAIRE (sRGB → linéaire → filtre → sRGB) : pas d'assombrissement
+#   des niveaux réduits comme avec une moyenne sur les valeurs sRGB
+# • noyaux : "box" (couverture exacte) ou "kaiser" (sinc fenêtré, plus net)
+# • tailles quelconques (non puissance de 2) : niveau k+1 = max(1, taille_k // 2), règle GL ;
+#   pot=True rééchantillonne d'abord le niveau 0 à la puissance de 2 la plus proche
+# • filtre séparable : pour chaque pixel destination, T prises (indices + poids) calculées
+#   une fois par axe, puis une somme pondérée vectorisée sur toute l'image
+import numpy as np
+
+KERNELS = ("box", "kaiser")
+DEFAULT_KERNEL = "kaiser"
+KAISER_RADIUS = 3.0   # en pixels destination
+KAISER_ALPHA = 4.0
+
+_TO_LINEAR = None
+_TO_SRGB = None
+_SRGB_STEPS = 1 << 16  # table linéaire → sRGB (16 bits : précis dans les sombres)
+
+
+def _tables():
+    global _TO_LINEAR, _TO_SRGB
+    if _TO_LINEAR is None:
+        c = np.arange(256, dtype=np.float64) / 255.0
+        _TO_LINEAR = np.where(c <= 0.04045, c / 12.92,
+                              ((c + 0.055) / 1.055) ** 2.4).astype(np.float32)
+        x = np.linspace(0.0, 1.0, _SRGB_STEPS)
+        s = np.where(x <= 0.0031308, x * 12.92, 1.055 * x ** (1 / 2.4) - 0.055)
+        _TO_SRGB = np.round(s * 255.0).astype(np.uint8)
+    return _TO_LINEAR, _TO_SRGB
+
+
+def to_linear(pixels):
+    """uint8 sRGB (h,w,c) → float32 linéaire ; un canal alpha (c=4) reste tel quel."""
+    lut, _ = _tables()
+    out = lut[pixels]
+    if pixels.shape[2] == 4:
+        out[..., 3] = pixels[..., 3] / np.float32(255.0)
+    return out
+
+
+def to_srgb(linear):
+    _, lut = _tables()
+    q = np.clip(linear, 0.0, 1.0)
+    out = lut[(q * (_SRGB_STEPS - 1) + 0.5).astype(np.intp)]
+    if linear.shape[2] == 4:
+        out[..., 3] = np.round(q[..., 3] * 255.0)
+    return out
+
+
+# ───────────────────────────────────────────────
+# NOYAUX
+# ───────────────────────────────────────────────
+def _box_taps(n, m):
+    # poids = recouvrement du pixel source j par l'empreinte [i·s, (i+1)·s) du pixel i
+    s = n / m
+    lo = np.arange(m) * s
+    first = np.floor(lo).astype(np.intp)
+    taps = int(np.ceil(s)) + 1
+    j = first[:, None] + np.arange(taps)
+    w = np.clip(np.minimum(j + 1, lo[:, None] + s) - np.maximum(j, lo[:, None]), 0.0, None)
+    return np.clip(j, 0, n - 1), w
+
+
+def _kaiser_taps(n, m):
+    s = n / m
+    scale = max(s, 1.0)               # réduction : noyau élargi ; agrandissement : tel quel
+    reach = KAISER_RADIUS * scale
+    center = (np.arange(m) + 0.5) * s - 0.5
+    first = np.floor(center - reach).astype(np.intp) + 1
+    taps = int(np.ceil(2 * reach)) + 1
+    j = first[:, None] + np.arange(taps)
+    x = (j - center[:, None]) / scale
+    window = np.i0(KAISER_ALPHA * np.sqrt(np.clip(1 - (x / KAISER_RADIUS) ** 2, 0, None)))
+    w = np.sinc(x) * window / np.i0(KAISER_ALPHA)
+    w[np.abs(x) >= KAISER_RADIUS] = 0.0
+    return np.clip(j, 0, n - 1), w    # bords : clamp (comme GL_CLAMP_TO_EDGE)
+
+
+_TAPS = {"box": _box_taps, "kaiser": _kaiser_taps}
+
+
+def _resample_axis(img, m, axis, kernel):
+    n = img.shape[axis]
+    if n == m:
+        return img
+    idx, w = _TAPS[kernel](n, m)
+    w = (w / w.sum(axis=1, keepdims=True)).astype(np.float32)
+    img = np.moveaxis(img, axis, 0)
+    out = np.zeros((m,) + img.shape[1:], dtype=np.float32)
+    extra = (slice(None),) + (None,) * (img.ndim - 1)
+    for k in range(idx.shape[1]):     # T prises, chacune vectorisée sur toute l'image
+        out += w[:, k][extra] * img[idx[:, k]]
+    return np.moveaxis(out, 0, axis)
+
+
+def resample_linear(linear, width, height, kernel=DEFAULT_KERNEL):
+    """float32 linéaire (h,w,c) → (height,width,c)."""
+    if kernel not in _TAPS:
+        raise ValueError("unknown mipmap kernel %r (expected one of %s)"
+                         % (kernel, ", ".join(KERNELS)))
+    # axe le plus réduit en premier → moins de travail pour le second
+    if linear.shape[0] / height >= linear.shape[1] / width:
+        return _resample_axis(_resample_axis(linear, height, 0, kernel), width, 1, kernel)
+    return _resample_axis(_resample_axis(linear, width, 1, kernel), height, 0, kernel)
+
+
+def resize(pixels, width, height, kernel=DEFAULT_KERNEL):
+    """uint8 sRGB (h,w,c) → (height,width,c), filtré en espace linéaire."""
+    if pixels.shape[:2] == (height, width):
+        return pixels
+    return to_srgb(resample_linear(to_linear(pixels), width, height, kernel))
+
+
+def nearest_pot(n):
+    return 1 << max(0, int(round(np.log2(n))))
+
+
+# ───────────────────────────────────────────────
+# CHAÎNE
+# ───────────────────────────────────────────────
+def level_sizes(width, height):
+    sizes = [(width, height)]
+    while width > 1 or height > 1:
+        width, height = max(1, width // 2), max(1, height // 2)
+        sizes.append((width, height))
+    return sizes
+
+
+def build_mips(pixels, kernel=DEFAULT_KERNEL, pot=False):
+    """uint8 sRGB (h,w,c) → [niveau 0, 1, …, 1×1] (uint8, contigus, prêts pour glTexImage2D).
+    Chaque niveau est filtré depuis le précédent, en linéaire (pas d'aller-retour uint8)."""
+    h, w = pixels.shape[:2]
+    linear = to_linear(pixels)
+    if pot and (w & (w - 1) or h & (h - 1)):
+        w, h = nearest_pot(w), nearest_pot(h)
+        linear = resample_linear(linear, w, h, kernel)
+        pixels = to_srgb(linear)
+    levels = [np.ascontiguousarray(pixels)]
+    for lw, lh in level_sizes(w, h)[1:]:
+        linear = resample_linear(linear, lw, lh, kernel)
+        levels.append(to_srgb(linear))
+    return levels
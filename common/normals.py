@@ -0,0 +1,80 @@
+# normals.py – Normales calculées UNE FOIS au build (NumPy vectorisé)
+# Python 3.x  +  NumPy
+#
+# compute_normals(mesh)                 → normales de face (rendu "flat")
+# compute_normals(mesh, crease_angle=α) → normales lissées entre faces voisines
+#                                         dont l'angle est ≤ α (arêtes vives conservées)
+# Les triangles dégénérés (aire ~ 0) sont signalés dans mesh.degenerate au lieu de
+# provoquer une division par zéro ; ils ne contribuent à aucun lissage.
+import numpy as np
+
+from mesh import Mesh, weld
+
+DEGENERATE_EPS = 1e-12  # |n|² en dessous duquel un triangle est considéré plat
+POSITION_EPS = 1e-5     # deux coins plus proches = même position pour le lissage
+
+
+def face_normals(mesh):
+    # renvoie (normales unitaires (M,3), aires*2 (M,), masque dégénéré (M,))
+    tri = mesh.triangle_positions().astype(np.float64)
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    length = np.sqrt(np.einsum("ij,ij->i", n, n))
+    degenerate = length * length <= DEGENERATE_EPS
+    n = np.divide(n, length[:, None], out=np.zeros_like(n), where=~degenerate[:, None])
+    return n, length, degenerate
+
+
+def _smooth_corner_normals(mesh, fn, area, degenerate, crease_angle):
+    # pour chaque coin : somme (pondérée par l'aire) des normales des faces
+    # qui partagent sa position ET font un angle ≤ crease_angle avec sa face
+    m = len(mesh.indices)
+    grid = np.round(mesh.positions / POSITION_EPS).astype(np.int64)
+    _, pos_id = np.unique(grid, axis=0, return_inverse=True)
+    corner_pos = pos_id.reshape(-1)[mesh.indices.reshape(-1)]
+    corner_face = np.repeat(np.arange(m), 3)
+
+    order = np.argsort(corner_pos, kind="stable")
+    sorted_pos = corner_pos[order]
+    starts = np.flatnonzero(np.r_[True, sorted_pos[1:] != sorted_pos[:-1]])
+    sizes = np.diff(np.r_[starts, len(sorted_pos)])
+    group = np.repeat(np.arange(len(starts)), sizes)
+
+    # toutes les paires (coin a, coin b) d'un même groupe de position
+    counts = sizes[group]
+    a = np.repeat(np.arange(len(order)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    b = starts[group[a]] + (np.arange(len(a)) - first)
+    fa, fb = corner_face[order[a]], corner_face[order[b]]
+
+    cos_limit = np.cos(np.radians(crease_angle))
+    keep = (np.einsum("ij,ij->i", fn[fa], fn[fb]) >= cos_limit - 1e-6) & ~degenerate[fb]
+    acc = np.zeros((len(order), 3))
+    np.add.at(acc, a[keep], fn[fb[keep]] * area[fb[keep], None])
+
+    out = np.zeros((m * 3, 3))
+    out[order] = acc
+    length = np.linalg.norm(out, axis=1, keepdims=True)
+    flat = np.repeat(fn, 3, axis=0)
+    return np.divide(out, length, out=flat, where=length > 0)
+
+
+def compute_normals(mesh, crease_angle=None):
+    """Renvoie un nouveau Mesh indexé avec normales par sommet.
+
+    Les sommets sont dédoublés là où la normale diffère (arêtes vives),
+    puis re-soudés quand (position, uv, normale) coïncident (voir mesh.weld)."""
+    if len(mesh.indices) == 0:
+        out = Mesh(mesh.positions, mesh.uvs, mesh.indices, np.zeros_like(mesh.positions))
+        out.degenerate = np.zeros(0, dtype=bool)
+        return out
+
+    fn, area, degenerate = face_normals(mesh)
+    if crease_angle is None:
+        corner_n = np.repeat(fn, 3, axis=0)
+    else:
+        corner_n = _smooth_corner_normals(mesh, fn, area, degenerate, crease_angle)
+
+    corners = mesh.indices.reshape(-1)
+    soup = Mesh(mesh.positions[corners], mesh.uvs[corners], None, corner_n)
+    soup.degenerate = degenerate
+    return weld(soup)
@@ -0,0 +1,116 @@
+# profiler.py – Temps par passe de rendu (anneau de N frames, p50/p95/p99, CSV)
+# Python 3.x  +  NumPy  (+ PyOpenGL si sync=True)
+#
+# Mesure "au tour" : begin_frame() puis mark(passe) après chaque passe → le temps écoulé
+# depuis le repère précédent est attribué à la passe (1 perf_counter par passe, la somme
+# des passes = la frame). Les percentiles ne sont recalculés que toutes les `refresh`
+# secondes (version++ → le HUD sait quand se recompiler).
+# sync=True : glFinish() avant chaque repère → temps GPU inclus (plus lent, plus juste).
+import csv
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class PassProfiler:
+    def __init__(self, passes=(), capacity=600, refresh=0.5, sync=False):
+        self.names = list(passes)
+        self._col = {n: i for i, n in enumerate(self.names)}
+        self.capacity = capacity
+        self.refresh = refresh
+        self.sync = sync
+        self.enabled = False
+
+        self._ring = np.zeros((capacity, len(self.names)))  # ms, une ligne par frame
+        self._frame_ids = np.zeros(capacity, dtype=np.int64)
+        self._row = np.zeros(len(self.names))
+        self.frames = 0      # frames enregistrées depuis le début
+        self.version = 0     # incrémenté à chaque recalcul des percentiles
+        self.stats = None    # (len(PERCENTILES), passes) en ms
+        self.frame_stats = None  # (len(PERCENTILES),) : frame entière
+        self._t = None
+        self._last_refresh = 0.0
+
+    # ---------- mesure -----------------------------------------------------------------
+    def _now(self):
+        if self.sync:
+            from OpenGL.GL import glFinish
+            glFinish()
+        return time.perf_counter()
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._row[:] = 0.0
+        self._t = self._now()
+
+    def mark(self, name):
+        if not self.enabled or self._t is None:
+            return
+        now = self._now()
+        col = self._col.get(name)
+        if col is None:
+            col = self._add_pass(name)
+        self._row[col] += (now - self._t) * 1000.0
+        self._t = now
+
+    def _add_pass(self, name):
+        self._col[name] = len(self.names)
+        self.names.append(name)
+        self._ring = np.hstack([self._ring, np.zeros((self.capacity, 1))])
+        self._row = np.append(self._row, 0.0)
+        return self._col[name]
+
+    def end_frame(self):
+        if not self.enabled or self._t is None:
+            return
+        slot = self.frames % self.capacity
+        self._ring[slot] = self._row
+        self._frame_ids[slot] = self.frames
+        self.frames += 1
+        self._t = None
+        now = time.perf_counter()
+        if now - self._last_refresh >= self.refresh:
+            self._last_refresh = now
+            samples = self.samples()
+            self.stats = np.percentile(samples, PERCENTILES, axis=0)
+            self.frame_stats = np.percentile(samples.sum(axis=1), PERCENTILES)
+            self.version += 1
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._t = None
+        return self.enabled
+
+    # ---------- lecture ------------------------------------------------------------------
+    def _order(self):
+        # indices des lignes de l'anneau, de la plus ancienne à la plus récente
+        n = min(self.frames, self.capacity)
+        start = self.frames % self.capacity if self.frames > self.capacity else 0
+        return (np.arange(n) + start) % self.capacity
+
+    def samples(self):
+        # (n, passes) en ms, ordre chronologique
+        return self._ring[self._order()]
+
+    def lines(self):
+        """Texte du HUD : une ligne par passe, percentiles en ms (+ total)."""
+        if self.stats is None:
+            return ["profiler: collecting..."]
+        head = "pass            " + "".join("  p%-5d" % p for p in PERCENTILES)
+        out = [head]
+        for name, col in zip(self.names, self.stats.T):
+            out.append("%-16s" % name + "".join("%8.3f" % v for v in col))
+        out.append("%-16s" % "frame" + "".join("%8.3f" % v for v in self.frame_stats))
+        return out
+
+    def dump_csv(self, path):
+        order = self._order()
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["frame"] + self.names + ["total_ms"])
+            for fid, row in zip(self._frame_ids[order], self._ring[order]):
+                w.writerow([int(fid)] + ["%.4f" % v for v in row] + ["%.4f" % row.sum()])
+        return path
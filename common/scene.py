@@ -0,0 +1,272 @@
+# scene.py – Graphe de scène "retenu" avec suivi des modifications
+# Python 3.x  +  PyOpenGL  +  NumPy
+#
+# Chaque nœud garde :
+#   • sa transformation locale (recalculée seulement si la clé transform() change)
+#     et sa transformation monde (recalculée paresseusement si un parent a bougé)
+#   • une display list compilée de son contenu (recompilée seulement si la clé
+#     inputs() change : toggle, position affichée dans le HUD…)
+#   • son état de rendu (matériau, capacités activées/désactivées), appliqué HORS
+#     display list via le cache d'état (glstate.py) → appels redondants évités
+#   • le volume englobant de son sous-arbre (bounds.py), dans le repère du parent :
+#     les nœuds forment une BVH ; seuls les nœuds dont la transformation a changé
+#     (et leurs ancêtres) sont réajustés par refit()
+# render(frustum) écarte un sous-arbre entier hors du frustum, et ne teste plus rien
+# sous un nœud entièrement dedans. Un nœud qui dessine sans `bounds` (axes, HUD…)
+# n'est jamais écarté.
+# Déplacer la voiture = 1 matrice recalculée ; le reste est rejoué tel quel.
+import math
+
+import numpy as np
+from OpenGL.GL import *
+
+from bounds import INSIDE, OUTSIDE, Bounds, CullStats
+from glstate import StateCache, sort_key
+
+_UNSET = object()
+UNBOUNDED = "unbounded"  # sous-arbre sans volume connu → toujours dessiné
+
+
+# ---- opérations de transformation (clés hashables) --------------------------------
+def translate(x, y, z):
+    return ("T", float(x), float(y), float(z))
+
+def rotate(angle, x, y, z):
+    return ("R", float(angle), float(x), float(y), float(z))
+
+def scale(x, y, z):
+    return ("S", float(x), float(y), float(z))
+
+def quaternion(x, y, z, w):
+    # rotation d'un quaternion unitaire (x, y, z, w) — ex. Trackball.op()
+    return ("Q", float(x), float(y), float(z), float(w))
+
+
+def _op_matrix(op):
+    m = np.identity(4)
+    kind = op[0]
+    if kind == "T":
+        m[:3, 3] = op[1:4]
+    elif kind == "S":
+        m[0, 0], m[1, 1], m[2, 2] = op[1:4]
+    elif kind == "R":  # même convention que glRotatef (degrés, axe normalisé)
+        a = math.radians(op[1])
+        axis = np.array(op[2:5])
+        x, y, z = axis / np.linalg.norm(axis)
+        c, s = math.cos(a), math.sin(a)
+        m[:3, :3] = [
+            [c + x*x*(1-c),   x*y*(1-c) - z*s, x*z*(1-c) + y*s],
+            [y*x*(1-c) + z*s, c + y*y*(1-c),   y*z*(1-c) - x*s],
+            [z*x*(1-c) - y*s, z*y*(1-c) + x*s, c + z*z*(1-c)],
+        ]
+    elif kind == "Q":
+        x, y, z, w = op[1:5]
+        m[:3, :3] = [
+            [1 - 2*(y*y + z*z), 2*(x*y - z*w),     2*(x*z + y*w)],
+            [2*(x*y + z*w),     1 - 2*(x*x + z*z), 2*(y*z - x*w)],
+            [2*(x*z - y*w),     2*(y*z + x*w),     1 - 2*(x*x + y*y)],
+        ]
+    return m
+
+
+def compose(ops):
+    m = np.identity(4)
+    for op in ops:
+        m = m @ _op_matrix(op)
+    return m
+
+
+# ───────────────────────────────────────────────
+# NŒUD
+# ───────────────────────────────────────────────
+class SceneNode:
+    use_display_lists = True  # False → contenu rejoué en direct (débogage)
+    profiler = None           # PassProfiler : un repère (mark) par nœud dessiné
+    state = None              # StateCache partagé (créé au 1er besoin)
+    cull_stats = None         # CullStats partagé (créé au 1er rendu avec frustum)
+
+    def __init__(self, name, draw=None, inputs=None, transform=None, visible=None,
+                 compiled=True, material=None, enable=(), disable=(), bounds=None):
+        self.name = name
+        self.parent = None
+        self.children = []
+        self._draw = draw            # émet les commandes GL du contenu
+        self._inputs = inputs        # () → clé ; changement ⇒ recompilation
+        self._transform = transform  # () → tuple d'opérations translate/rotate/scale
+        self._visible = visible      # () → bool
+        self.compiled = compiled     # False → contenu émis à chaque frame (draw instancié)
+        self.material = material     # glstate.material(...) : clé de tri des draws
+        self.enable = tuple(enable)  # capacités requises par le contenu
+        self.disable = tuple(disable)
+        self.bounds = bounds         # Bounds du contenu, repère local (None = inconnu)
+
+        self._sub_bounds = None      # Bounds du sous-arbre, repère parent (ou UNBOUNDED)
+        self._draw_count = 0         # nœuds qui dessinent dans le sous-arbre
+        self._bounds_dirty = True
+
+        self.local = np.identity(4)
+        self._gl_local = None        # matrice colonne-majeur pour glMultMatrixf
+        self._xform_key = _UNSET
+        self._world = np.identity(4)
+        self._world_dirty = True
+
+        self.display_list = 0
+        self._input_key = _UNSET
+        self.compiles = 0            # nombre de (re)compilations du contenu
+        self.transform_updates = 0   # nombre de recalculs de la matrice locale
+
+    def add(self, child):
+        child.parent = self
+        self.children.append(child)
+        child._mark_world_dirty()
+        self._mark_bounds_dirty()
+        return child
+
+    def sort_children(self):
+        # enfants groupés par matériau (tri stable) → matériaux identiques consécutifs
+        self.children.sort(key=lambda c: sort_key(c.material))
+
+    def walk(self):
+        yield self
+        for c in self.children:
+            yield from c.walk()
+
+    def find(self, name):
+        for n in self.walk():
+            if n.name == name:
+                return n
+        return None
+
+    # ---- transformations ----------------------------------------------------------
+    def _mark_world_dirty(self):
+        if self._world_dirty:
+            return
+        self._world_dirty = True
+        for c in self.children:
+            c._mark_world_dirty()
+
+    def _sync_transform(self):
+        key = self._transform() if self._transform else None
+        if key == self._xform_key:
+            return
+        self._xform_key = key
+        self.local = compose(key) if key else np.identity(4)
+        self._gl_local = np.ascontiguousarray(self.local.T, dtype=np.float32) if key else None
+        self.transform_updates += 1
+        self._world_dirty = False  # force la propagation aux enfants
+        self._mark_world_dirty()
+        self._mark_bounds_dirty()
+
+    @property
+    def world(self):
+        if self._world_dirty:
+            self._world = self.local if self.parent is None else self.parent.world @ self.local
+            self._world_dirty = False
+        return self._world
+
+    # ---- volumes englobants (BVH) ---------------------------------------------------
+    def set_bounds(self, bounds):
+        self.bounds = bounds
+        self._mark_bounds_dirty()
+
+    def _mark_bounds_dirty(self):
+        # le volume du nœud change → celui de chaque ancêtre aussi (arrêt au 1er déjà sale)
+        node = self
+        while node is not None and not node._bounds_dirty:
+            node._bounds_dirty = True
+            node = node.parent
+
+    def refit(self):
+        """Synchronise les transformations puis réajuste les volumes sales (enfants
+        d'abord). Renvoie le volume du sous-arbre dans le repère parent."""
+        self._sync_transform()
+        for c in self.children:
+            c.refit()
+        if self._bounds_dirty:
+            own = self._draw is not None
+            if own and self.bounds is None:
+                sub = UNBOUNDED
+            else:
+                items = [self.bounds] if own else []
+                items += [c._sub_bounds for c in self.children]
+                sub = UNBOUNDED if UNBOUNDED in items else Bounds.union(items)
+                if sub is not None and sub is not UNBOUNDED and self._xform_key:
+                    sub = sub.transformed(self.local)
+            self._sub_bounds = sub
+            self._draw_count = int(own) + sum(c._draw_count for c in self.children)
+            self._bounds_dirty = False
+        return self._sub_bounds
+
+    # ---- contenu ---------------------------------------------------------------------
+    def invalidate(self):
+        self._input_key = _UNSET
+
+    def _call(self):
+        if not (SceneNode.use_display_lists and self.compiled):
+            self._draw()
+            return
+        key = self._inputs() if self._inputs else None
+        if key != self._input_key or not self.display_list:
+            if not self.display_list:
+                self.display_list = glGenLists(1)
+            glNewList(self.display_list, GL_COMPILE)
+            self._draw()
+            glEndList()
+            self._input_key = key
+            self.compiles += 1
+        glCallList(self.display_list)
+
+    def render(self, frustum=None):
+        """frustum : bounds.Frustum exprimé dans le repère du parent de ce nœud
+        (repère œil pour la racine) ; None → pas de culling."""
+        if frustum is None:
+            self._render(None, True)
+            return
+        if SceneNode.cull_stats is None:
+            SceneNode.cull_stats = CullStats()
+        self.refit()
+        self._render(frustum, False)
+
+    def _render(self, frustum, inside):
+        if self._visible is not None and not self._visible():
+            return
+        self._sync_transform()
+        if not inside:
+            stats = SceneNode.cull_stats
+            sub = self._sub_bounds
+            if sub is None:          # sous-arbre vide
+                return
+            if sub is not UNBOUNDED:
+                stats.tested += 1
+                where = frustum.classify(sub)
+                if where == OUTSIDE:
+                    stats.culled += self._draw_count
+                    return
+                inside = where == INSIDE
+            if not inside and self._xform_key:
+                frustum = frustum.transformed(self.local)  # plans → repère local
+        pushed = self._gl_local is not None
+        if pushed:
+            glPushMatrix()
+            glMultMatrixf(self._gl_local)
+        if self.material is not None or self.enable or self.disable:
+            if SceneNode.state is None:
+                SceneNode.state = StateCache()
+            SceneNode.state.apply(self.material, self.enable, self.disable)
+        if self._draw is not None:
+            self._call()
+            if SceneNode.profiler is not None:
+                SceneNode.profiler.mark(self.name)
+            if frustum is not None:
+                SceneNode.cull_stats.drawn += 1
+        for c in self.children:
+            c._render(frustum, inside)
+        if pushed:
+            glPopMatrix()
+
+    def delete(self):
+        for n in self.walk():
+            if n.display_list:
+                glDeleteLists(n.display_list, 1)
+                n.display_list = 0
+            n._input_key = _UNSET
@@ -0,0 +1,109 @@
+# scheduler.py – Redessin piloté par événements (remplace glutIdleFunc(render))
+# Python 3.x  +  PyOpenGL  +  FreeGLUT
+#
+# On ne redessine que si quelque chose le demande :
+#   notify_input()    → entrée clavier/souris (réveille aussi le mode basse conso)
+#   request_redraw()  → état "sale" (toggle, reshape…)
+#   set_animating()   → animation continue (lesson10), cadencée par le plafond FPS
+# Sans demande, aucun timer n'est armé → 0 % CPU quand la scène est immobile.
+import time
+
+from OpenGL.GLUT import *
+
+
+class FrameScheduler:
+    def __init__(self, render, max_fps=60.0, vsync=True, refresh_hz=60.0,
+                 low_power=True, idle_fps=10.0, idle_after=5.0):
+        self.render = render
+        self.max_fps = max_fps
+        self.vsync = vsync            # swap bloquant → on cale l'intervalle sur la trame écran
+        self.refresh_hz = refresh_hz
+        self.low_power = low_power    # animation ralentie après idle_after s sans entrée
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.animating = False
+
+        # compteurs (voir stats())
+        self.frames_rendered = 0
+        self.frames_skipped = 0       # demandes absorbées par une frame déjà prévue
+        self.busy_time = 0.0          # temps passé dans render()
+        self.idle_time = 0.0          # temps entre deux frames (CPU rendu au système)
+
+        self._pending = False
+        self._timer_armed = False
+        self._last_start = 0.0
+        self._last_end = None
+        self._last_input = time.perf_counter()
+
+    # ---------- intervalle entre deux frames ---------------------------------------
+    def frame_interval(self, now=None):
+        now = time.perf_counter() if now is None else now
+        fps = self.max_fps
+        if self.low_power and self.animating and now - self._last_input > self.idle_after:
+            fps = min(fps, self.idle_fps)
+        interval = 1.0 / fps if fps > 0 else 0.0
+        if self.vsync and self.refresh_hz > 0:
+            # multiple entier de la période écran → pas de saccade (60 → 60/30/20…)
+            period = 1.0 / self.refresh_hz
+            interval = max(1, round(interval / period + 0.49)) * period
+        return interval
+
+    # ---------- demandes -----------------------------------------------------------
+    def install(self):
+        glutDisplayFunc(self._display)
+        self.request_redraw()
+
+    def request_redraw(self):
+        if self._pending:
+            self.frames_skipped += 1
+            return
+        self._pending = True
+        self._arm()
+
+    def notify_input(self):
+        self._last_input = time.perf_counter()
+        self.request_redraw()
+
+    def set_animating(self, on=True):
+        self.animating = on
+        if on:
+            self.request_redraw()
+
+    # ---------- boucle GLUT ----------------------------------------------------------
+    def _arm(self):
+        if self._timer_armed:
+            return
+        now = time.perf_counter()
+        delay = max(0.0, self._last_start + self.frame_interval(now) - now)
+        self._timer_armed = True
+        glutTimerFunc(int(delay * 1000), self._on_timer, 0)
+
+    def _on_timer(self, _value):
+        self._timer_armed = False
+        if self._pending or self.animating:
+            glutPostRedisplay()
+
+    def _display(self):
+        start = time.perf_counter()
+        if self._last_end is not None:
+            self.idle_time += start - self._last_end
+        self._pending = False
+        self.render()
+        end = time.perf_counter()
+        self.busy_time += end - start
+        self.frames_rendered += 1
+        self._last_start, self._last_end = start, end
+        if self.animating:
+            self._pending = True
+            self._arm()
+
+    def stats(self):
+        total = self.busy_time + self.idle_time
+        return {
+            "frames_rendered": self.frames_rendered,
+            "frames_skipped": self.frames_skipped,
+            "busy_time": self.busy_time,
+            "idle_time": self.idle_time,
+            "idle_ratio": self.idle_time / total if total > 0 else 0.0,
+            "interval_ms": self.frame_interval() * 1000.0,
+        }
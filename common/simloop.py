@@ -0,0 +1,116 @@
+# simloop.py – File d'entrées + simulation à pas fixe, découplées du rendu
+# Python 3.x
+#
+# Les callbacks GLUT ne modifient plus l'état du viewer : ils postent un événement dans
+# une InputQueue, vidée UNE fois par tick (début de frame).
+#   • mouvements souris consécutifs fusionnés : seule la dernière position est gardée
+#     → une rafale de N événements = 1 événement traité, 1 frame au plus
+#   • touches maintenues : ensemble `held` (glutKeyboardFunc / glutKeyboardUpFunc) ;
+#     le viewer en tire un mouvement en unités / s, intégré pas par pas
+#   • wake() n'est appelé qu'au 1er événement d'un tick (scheduler.notify_input)
+# FixedStep : horloge murale → pas fixes de DT s (accumulateur plafonné à MAX_STEPS,
+# comme traffic.py) ; alpha = part du pas suivant déjà écoulée → le rendu interpole entre
+# l'état du pas précédent et celui du pas courant. La cadence d'affichage peut chuter
+# sous la charge : la simulation avance au même rythme.
+import time
+
+DT = 1.0 / 60.0
+MAX_STEPS = 8  # rattrapage max par tick (évite la spirale après une pause)
+
+
+def lerp(a, b, t):
+    """Interpolation composante par composante de deux séquences."""
+    return tuple(x + (y - x) * t for x, y in zip(a, b))
+
+
+class InputQueue:
+    def __init__(self, wake=None):
+        self.wake = wake
+        self.held = set()     # touches enfoncées (mis à jour au vidage)
+        self.posted = 0       # événements reçus
+        self.coalesced = 0    # mouvements absorbés par le précédent
+        self._events = []
+        self._fresh = set()   # appuyées depuis le dernier pas joué
+        self._tapped = set()  # appuyées puis relâchées avant d'avoir vécu un pas
+
+    def __len__(self):
+        return len(self._events)
+
+    def post(self, kind, *args):
+        self.posted += 1
+        events = self._events
+        if kind == "motion" and events and events[-1][0] == "motion":
+            events[-1] = (kind,) + args
+            self.coalesced += 1
+            return
+        events.append((kind,) + args)
+        if len(events) == 1 and self.wake is not None:
+            self.wake()
+
+    # callbacks GLUT prêts à brancher
+    def key_down(self, key, *_):
+        self.post("key", key)
+
+    def key_up(self, key, *_):
+        self.post("key_up", key)
+
+    def special(self, key, *_):
+        # touches spéciales (F1…F12, flèches) : événement ponctuel, jamais « tenu »
+        self.post("special", key)
+
+    def click(self, button, state, x, y):
+        self.post("click", button, state, x, y)
+
+    def motion(self, x, y):
+        self.post("motion", x, y)
+
+    def drain(self):
+        """Événements reçus depuis le tick précédent, dans l'ordre ; `held` mis à jour."""
+        events, self._events = self._events, []
+        for event in events:
+            if event[0] == "key":
+                self.held.add(event[1])
+                self._fresh.add(event[1])
+            elif event[0] == "key_up":
+                self.held.discard(event[1])
+                if event[1] in self._fresh:
+                    self._tapped.add(event[1])
+        return events
+
+    def keys(self):
+        # touches actives pour les pas de ce tick : un appui bref compte pour au moins un pas
+        return self.held | self._tapped if self._tapped else self.held
+
+    def stepped(self):
+        self._fresh.clear()
+        self._tapped.clear()
+
+
+class FixedStep:
+    def __init__(self, dt=DT, max_steps=MAX_STEPS, clock=time.perf_counter):
+        self.dt = float(dt)
+        self.max_steps = max_steps
+        self.clock = clock
+        self.ticks = 0     # pas joués depuis le début
+        self.alpha = 0.0   # ∈ [0, 1[ : avance du rendu sur le dernier pas joué
+        self._acc = 0.0
+        self._last = None
+
+    def advance(self, now=None):
+        """Nombre de pas fixes écoulés depuis l'appel précédent (0 au premier)."""
+        now = self.clock() if now is None else now
+        if self._last is None:
+            self._last = now
+            return 0
+        self._acc += min(now - self._last, self.max_steps * self.dt)
+        self._last = now
+        steps = int(self._acc / self.dt)
+        self._acc -= steps * self.dt
+        self.ticks += steps
+        self.alpha = self._acc / self.dt
+        return steps
+
+    def pause(self):
+        # état au repos : le prochain advance() repart de zéro, sans rattrapage
+        self._last = None
+        self._acc = self.alpha = 0.0
@@ -0,0 +1,270 @@
+# simplify.py – Décimation par contraction d'arêtes (quadriques de Garland-Heckbert)
+# Python 3.x  +  NumPy
+#
+# simplify(mesh, target=…, max_error=…) → nouveau Mesh avec moins de triangles.
+#   • chaque point porte une quadrique Q (somme des plans de ses faces, pondérés par
+#     l'aire) ; contracter l'arête (a,b) en p coûte pᵀ(Qa+Qb)p = somme des distances²
+#     de p aux plans d'origine
+#   • les contractions se font par PASSES vectorisées : toutes les arêtes sont évaluées
+#     d'un coup, puis un ensemble indépendant des moins chères (aucune face ne touche
+#     deux contractions) est appliqué en une fois ; on recommence jusqu'à la cible
+#   • points verrouillés (jamais déplacés ni supprimés) : bords ouverts (ex. la couture
+#     x=0 des builders *_half_open_x0, qui doit rester droite pour le miroir), coutures
+#     UV (même position, uv différents), arêtes non manifold, masque `lock` de l'appelant
+#   • une contraction est refusée si elle retourne une face ou casse la variété
+#     (condition de lien : exactement 2 voisins communs)
+# Les normales sont recalculées (compute_normals) si le maillage d'entrée en avait.
+# add_lods(parts, ratios) ajoute des niveaux "<pièce>_lodK" à un dict de pièces : ils
+# sont écrits dans la même entrée du cache disque que le maillage compilé.
+import math
+
+import numpy as np
+
+from mesh import WELD_EPS, Mesh, weld
+from normals import compute_normals
+
+MIN_COS = 0.2      # cos minimal entre normale avant / après contraction (retournement)
+MIN_AREA = 1e-6    # aire minimale après contraction, relative à l'aire d'avant
+MAX_PASSES = 200   # garde-fou : une passe contracte au moins une arête sinon on s'arrête
+SINGULAR_EPS = 1e-10
+
+
+class SimplifyStats:
+    def __init__(self, triangles_in, triangles_out, passes, error, locked):
+        self.triangles_in, self.triangles_out = triangles_in, triangles_out
+        self.passes = passes
+        self.error = error      # coût quadrique (distance²) de la pire contraction appliquée
+        self.locked = locked    # points verrouillés (bords, coutures)
+
+    def __repr__(self):
+        return (f"SimplifyStats({self.triangles_in} → {self.triangles_out} triangles, "
+                f"{self.passes} passes, erreur {self.error:.3g}, {self.locked} points fixes)")
+
+
+def _face_quadrics(points, faces, n_points):
+    # Q (P,4,4) : Σ aire · ppᵀ, p = (n, d) plan de chaque face touchant le point
+    tri = points[faces]
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    area = np.sqrt(np.einsum("ij,ij->i", n, n))
+    unit = np.divide(n, area[:, None], out=np.zeros_like(n), where=area[:, None] > 0)
+    plane = np.hstack([unit, -np.einsum("ij,ij->i", unit, tri[:, 0])[:, None]])
+    k = np.einsum("fi,fj->fij", plane, plane) * (0.5 * area)[:, None, None]
+    q = np.zeros((n_points, 4, 4))
+    for c in range(3):
+        np.add.at(q, faces[:, c], k)
+    return q
+
+
+def _quadric_cost(q, p):
+    h = np.hstack([p, np.ones((len(p), 1))])
+    return np.maximum(np.einsum("ei,eij,ej->e", h, q, h), 0.0)
+
+
+def _placement(q, pa, pb, lock_a, lock_b):
+    """Position (E,3) et coût (E,) de la contraction de chaque arête (a,b)."""
+    mid = 0.5 * (pa + pb)
+    opt = mid.copy()
+    a3, b3 = q[:, :3, :3], q[:, :3, 3]
+    scale = np.einsum("eii->e", a3) / 3.0
+    ok = np.abs(np.linalg.det(a3)) > SINGULAR_EPS * np.maximum(scale, SINGULAR_EPS) ** 3
+    if ok.any():
+        opt[ok] = np.linalg.solve(a3[ok], -b3[ok][:, :, None])[:, :, 0]
+    # solution mal conditionnée (loin de l'arête) → on reste sur l'arête
+    reach = np.einsum("ij,ij->i", pb - pa, pb - pa)
+    far = ~np.isfinite(opt).all(axis=1) | \
+        (np.einsum("ij,ij->i", opt - mid, opt - mid) > 4.0 * reach)
+    opt[far] = mid[far]
+
+    cands = np.stack([opt, mid, pa, pb], axis=1)               # (E,4,3)
+    cost = np.stack([_quadric_cost(q, cands[:, k]) for k in range(4)], axis=1)
+    # un point verrouillé ne bouge pas : seule sa propre position est permise
+    cost[lock_a | lock_b, :2] = np.inf
+    cost[lock_a, 3] = np.inf
+    cost[lock_b, 2] = np.inf
+    best = cost.argmin(axis=1)
+    e = np.arange(len(q))
+    return cands[e, best], cost[e, best]
+
+
+def _independent_edges(a, b, cost, fp, n_points, rng):
+    """Sous-ensemble d'arêtes (a,b) sans face commune à deux d'entre elles, par rondes :
+    une arête est prise si c'est la moins chère de son voisinage (égalités départagées
+    au hasard), puis les points des faces qu'elle touche sont bloqués."""
+    rank = np.empty(len(cost), dtype=np.intp)
+    rank[np.lexsort((rng.random(len(cost)), cost))] = np.arange(len(cost))
+    free = np.ones(n_points, dtype=bool)
+    live = np.ones(len(cost), dtype=bool)
+    chosen = []
+    while live.any():
+        idx = np.flatnonzero(live)
+        vmin = np.full(n_points, len(cost))
+        np.minimum.at(vmin, a[idx], rank[idx])
+        np.minimum.at(vmin, b[idx], rank[idx])
+        rmin = np.full(n_points, len(cost))
+        np.minimum.at(rmin, fp.reshape(-1), np.repeat(vmin[fp].min(axis=1), 3))
+        pick = idx[(rank[idx] == rmin[a[idx]]) & (rank[idx] == rmin[b[idx]])]
+        chosen.append(pick)
+        hit = np.zeros(n_points, dtype=bool)
+        hit[a[pick]] = hit[b[pick]] = True
+        free[fp[hit[fp].any(axis=1)].reshape(-1)] = False
+        live &= free[a] & free[b]
+    return np.concatenate(chosen)
+
+
+def simplify(mesh, target=None, max_error=None, crease_angle=None, lock=None):
+    """Décime mesh jusqu'à `target` triangles (int) ou `target` × len(mesh) (float ≤ 1),
+    et/ou tant que le coût d'une contraction reste ≤ max_error (distance² monde).
+
+    lock : masque (N,) des sommets de mesh à ne jamais déplacer.
+    crease_angle : passé à compute_normals si mesh porte des normales."""
+    if target is None and max_error is None:
+        raise ValueError("simplify: give a target triangle count and/or max_error")
+    n_in = len(mesh.indices)
+    if target is None:
+        target = 0
+    elif isinstance(target, float):
+        if not 0.0 < target <= 1.0:
+            raise ValueError("simplify: target ratio must be in (0, 1], got %r" % target)
+        target = int(math.ceil(target * n_in))
+    if max_error is None:
+        max_error = np.inf
+
+    # sommets d'attributs (position + uv ; les normales seront recalculées)
+    src = weld(Mesh(mesh.positions, mesh.uvs, mesh.indices))
+    uv = src.uvs.astype(np.float64)
+    faces = src.indices.astype(np.intp)
+    # topologie : même position (uv différents) = un seul point
+    grid = np.round(src.positions.astype(np.float64) / WELD_EPS).astype(np.int64)
+    _, first, attr_point = np.unique(grid, axis=0, return_index=True, return_inverse=True)
+    attr_point = attr_point.reshape(-1)
+    points = src.positions[first].astype(np.float64)
+    n_points = len(points)
+    locked = np.zeros(n_points, dtype=bool)
+    if lock is not None:  # masque sur les sommets de mesh → points
+        corner_src = mesh.indices.reshape(-1)
+        corner_lock = np.asarray(lock, dtype=bool)[corner_src]
+        locked[attr_point[src.indices.reshape(-1)[corner_lock]]] = True
+
+    fp = attr_point[faces]
+    alive = (fp[:, 0] != fp[:, 1]) & (fp[:, 1] != fp[:, 2]) & (fp[:, 2] != fp[:, 0])
+    faces, fp = faces[alive], fp[alive]
+    quadric = _face_quadrics(points, fp, n_points)
+
+    rng = np.random.default_rng(0)  # départage des égalités : résultat reproductible
+    passes, worst = 0, 0.0
+    while len(faces) > target and passes < MAX_PASSES:
+        passes += 1
+        # ---- arêtes uniques (espace points) + coutures / bords ------------------
+        e = fp[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+        ea = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+        swap = e[:, 0] > e[:, 1]
+        e[swap], ea[swap] = e[swap][:, ::-1], ea[swap][:, ::-1]
+        key = e[:, 0] * n_points + e[:, 1]
+        _, occ, inv, count = np.unique(key, return_index=True, return_inverse=True,
+                                       return_counts=True)
+        inv = inv.reshape(-1)
+        seam = np.bincount(inv, weights=(ea != ea[occ][inv]).any(axis=1),
+                           minlength=len(occ)) > 0
+        lo, hi = e[occ, 0], e[occ, 1]
+        border = (count != 2) | seam
+        locked[lo[border]] = locked[hi[border]] = True
+
+        cand = np.flatnonzero(~(locked[lo] & locked[hi]))
+        if not len(cand):
+            break
+        a, b = lo[cand], hi[cand]
+        pos, cost = _placement(quadric[a] + quadric[b], points[a], points[b],
+                               locked[a], locked[b])
+
+        # ---- ensemble indépendant des contractions les moins chères ---------------
+        sel = np.flatnonzero(cost <= max_error)
+        if not len(sel):
+            break
+        sel = sel[_independent_edges(a[sel], b[sel], cost[sel], fp, n_points, rng)]
+        sel = sel[np.argsort(cost[sel], kind="stable")]
+        sel = sel[:max(1, (len(faces) - target + 1) // 2)]  # ~2 faces par contraction
+
+        # survivant : le point verrouillé s'il y en a un
+        a, b, pos, cost = a[sel], b[sel], pos[sel], cost[sel]
+        keep = np.where(locked[b], b, a)
+        gone = np.where(locked[b], a, b)
+        owner = np.full(n_points, -1)
+        owner[keep] = owner[gone] = np.arange(len(sel))
+
+        # ---- condition de lien : a et b ont exactement 2 voisins communs ---------
+        src_p, dst_p = np.r_[lo, hi], np.r_[hi, lo]
+        side_a, side_b = np.full(n_points, -1), np.full(n_points, -1)
+        side_a[a], side_b[b] = np.arange(len(sel)), np.arange(len(sel))
+        na = side_a[src_p] >= 0
+        nb = side_b[src_p] >= 0
+        common = np.intersect1d(side_a[src_p[na]] * n_points + dst_p[na],
+                                side_b[src_p[nb]] * n_points + dst_p[nb])
+        ok = np.bincount(common // n_points, minlength=len(sel)) == 2
+
+        # ---- retournement des faces déplacées -----------------------------------
+        moved = points.copy()
+        moved[keep] = pos
+        remap = np.arange(n_points)
+        remap[gone] = keep
+        touched = np.flatnonzero((owner[fp] >= 0).any(axis=1))
+        old = points[fp[touched]]
+        new_fp = remap[fp[touched]]
+        survives = (new_fp[:, 0] != new_fp[:, 1]) & (new_fp[:, 1] != new_fp[:, 2]) & \
+            (new_fp[:, 2] != new_fp[:, 0])
+        new = moved[new_fp]
+        n_old = np.cross(old[:, 1] - old[:, 0], old[:, 2] - old[:, 0])
+        n_new = np.cross(new[:, 1] - new[:, 0], new[:, 2] - new[:, 0])
+        dot = np.einsum("ij,ij->i", n_old, n_new)
+        len_old, len_new = np.linalg.norm(n_old, axis=1), np.linalg.norm(n_new, axis=1)
+        # face retournée, ou aplatie (aire nulle : le test du cosinus ne la voit pas)
+        flipped = survives & ((dot < MIN_COS * len_old * len_new) |
+                              (len_new <= MIN_AREA * len_old))
+        ok[owner[fp[touched[flipped]]].max(axis=1)] = False
+        if not ok.any():
+            break
+        a, b, keep, gone, pos, cost = a[ok], b[ok], keep[ok], gone[ok], pos[ok], cost[ok]
+        worst = max(worst, float(cost.max()))
+
+        # ---- application ----------------------------------------------------------
+        # attributs : ceux du point supprimé prennent l'attribut du survivant sur l'arête
+        edge = occ[np.searchsorted(lo * n_points + hi, a * n_points + b)]
+        attr_a, attr_b = ea[edge, 0], ea[edge, 1]
+        attr_keep = np.where(keep == a, attr_a, attr_b)
+        free = ~locked[keep]  # survivant libre : il se déplace, son uv est interpolé
+        d = points[b] - points[a]
+        t = np.clip(np.einsum("ij,ij->i", pos - points[a], d) /
+                    np.maximum(np.einsum("ij,ij->i", d, d), 1e-300), 0.0, 1.0)
+        uv_new = uv[attr_a] + t[:, None] * (uv[attr_b] - uv[attr_a])
+        uv[attr_keep[free]] = uv_new[free]
+
+        points[keep] = pos
+        quadric[keep] += quadric[gone]
+        removed = np.full(n_points, -1)
+        removed[gone] = np.arange(len(gone))
+        attr_map = np.arange(len(attr_point))
+        hit = np.flatnonzero(removed[attr_point] >= 0)
+        attr_map[hit] = attr_keep[removed[attr_point[hit]]]
+
+        faces = attr_map[faces]
+        fp = attr_point[faces]
+        alive = (fp[:, 0] != fp[:, 1]) & (fp[:, 1] != fp[:, 2]) & (fp[:, 2] != fp[:, 0])
+        faces, fp = faces[alive], fp[alive]
+
+    # ---- compactage ------------------------------------------------------------------
+    used, indices = np.unique(faces.reshape(-1), return_inverse=True)
+    out = Mesh(points[attr_point[used]], uv[used], indices.reshape(-1, 3))
+    if mesh.normals is not None:
+        out = compute_normals(out, crease_angle)
+    out.simplify_stats = SimplifyStats(n_in, len(out.indices), passes, worst,
+                                       int(locked.sum()))
+    return out
+
+
+def add_lods(parts, ratios, crease_angle=None, names=None):
+    """Ajoute à parts (dict nom → Mesh) les niveaux "<nom>_lodK" (K = 1, 2, …),
+    ratios[K-1] × triangles du niveau 0. Renvoie parts."""
+    for name in list(names or parts):
+        for k, ratio in enumerate(ratios, 1):
+            parts["%s_lod%d" % (name, k)] = simplify(parts[name], float(ratio), None,
+                                                     crease_angle)
+    return parts
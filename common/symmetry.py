@@ -0,0 +1,154 @@
+# symmetry.py – Symétries appliquées au build, sur des tableaux entiers
+# Python 3.x  +  NumPy
+#
+# Une pièce n'est modélisée qu'en partie (½ carrosserie, 1 phare, 1 secteur de cylindre)
+# puis complétée en UNE opération vectorisée, déclarée par pièce :
+#   MIRROR_X / ("mirror", axe[, centre])     copie réfléchie par le plan axe = centre
+#   rotation(n, axe, centre)                  n copies tournées de 360/n degrés
+# symmetrize(mesh, symétrie) → Mesh complet :
+#   • positions (k,V,3) = base × k matrices 3×3 (aucun objet Python par sommet)
+#   • copie à déterminant < 0 : winding rétabli en permutant 2 colonnes d'indices
+#   • couture soudée : les paires (i, j) telles que l'image de i par UN pas de la symétrie
+#     retombe sur j (position, uv, normale quantifiées à SEAM_EPS) sont cherchées une fois
+#     sur la base, par hachage ; la copie k de i est fusionnée avec la copie k-1 de j (et
+#     la 1re avec la dernière pour un tour complet) → sommets du plan / de l'axe partagés
+#   • faces posées sur le plan de symétrie : la copie retombe sur l'original, dos à dos
+#     → capot interne de la coupe, les deux supprimées
+# Normales (si présentes) transformées avec la pièce : symétriser APRÈS compute_normals
+# évite de les recalculer sur la copie ; AVANT si un lissage doit traverser la couture ou
+# si la pièce a des faces sur le plan (sinon leurs normales opposées les gardent distinctes).
+# Le rendu ne fait plus aucun miroir (ni glScalef(-1,1,1), ni glFrontFace, ni instance
+# miroir) : la pièce complète est un maillage ordinaire.
+import math
+
+import numpy as np
+
+from mesh import Mesh, unique_rows
+
+SEAM_EPS = 1e-5  # grille de quantification de la couture : même case = même sommet
+
+MIRROR_X, MIRROR_Y, MIRROR_Z = ("mirror", 0), ("mirror", 1), ("mirror", 2)
+
+
+def rotation(n, axis=2, center=(0.0, 0.0, 0.0)):
+    """Symétrie d'ordre n autour de l'axe (0, 1, 2) passant par center."""
+    return ("rotate", int(n), axis, tuple(center))
+
+
+def _axis_rotation(angle, axis):
+    c, s = math.cos(angle), math.sin(angle)
+    u, v = [k for k in range(3) if k != axis]  # plan de rotation (sens direct)
+    m = np.identity(3)
+    m[u, u], m[u, v], m[v, u], m[v, v] = c, -s, s, c
+    return m
+
+
+def _seam_pairs(mesh, step, center, eps):
+    # paires (i, j) : step · (p_i - c) + c ≈ p_j, uv égaux (et normales, si présentes) ;
+    # mêmes lignes quantifiées à eps → même clé (mesh.unique_rows), O(V) et non O(V²)
+    p = mesh.positions.astype(np.float64) - center
+    src, dst = [p @ step.T, mesh.uvs], [p, mesh.uvs]
+    if mesh.normals is not None:
+        src.append(mesh.normals @ step.T)
+        dst.append(mesh.normals)
+    q = np.round(np.vstack([np.hstack(src), np.hstack(dst)]) / eps).astype(np.int64)
+    _, group = unique_rows(q)
+    v = len(p)
+    target = np.full(v * 2, -1)
+    target[group[v:]] = np.arange(v)
+    j = target[group[:v]]
+    i = np.flatnonzero(j >= 0)
+    return i, j[i]
+
+
+def _components(n, a, b):
+    # plus petit représentant de chaque composante connexe (arêtes a—b), vectorisé
+    labels = np.arange(n)
+    while len(a):
+        low = np.minimum(labels[a], labels[b])
+        if np.array_equal(low, labels[a]) and np.array_equal(low, labels[b]):
+            break
+        np.minimum.at(labels, a, low)
+        np.minimum.at(labels, b, low)
+        labels = labels[labels]  # saut de pointeurs
+    return labels
+
+
+def _replicate(mesh, step, copies, center, cyclic, eps):
+    # copies k = 0 … copies-1 : step^k appliqué à la base
+    center = np.asarray(center, dtype=np.float64)
+    mats = [np.identity(3)]
+    for _ in range(copies - 1):
+        mats.append(step @ mats[-1])
+    mats = np.array(mats)
+    v = len(mesh.positions)
+
+    p = mesh.positions.astype(np.float64) - center
+    positions = (p @ mats.transpose(0, 2, 1) + center).reshape(-1, 3)
+    normals = None
+    if mesh.normals is not None:
+        normals = (mesh.normals.astype(np.float64) @ mats.transpose(0, 2, 1)).reshape(-1, 3)
+    idx = mesh.indices.astype(np.int64)[None] + (v * np.arange(copies))[:, None, None]
+    flip = np.linalg.det(mats) < 0
+    idx[flip] = idx[flip][:, :, [0, 2, 1]]  # réflexion : winding CCW rétabli
+
+    # couture : copie k de i ≡ copie k-1 de j
+    i, j = _seam_pairs(mesh, step, center, eps)
+    ks = np.arange(1 if not cyclic else 0, copies)
+    a = (ks[:, None] * v + i).reshape(-1)
+    b = (((ks - 1) % copies)[:, None] * v + j).reshape(-1)
+    labels = _components(copies * v, a, b)
+
+    keep = labels == np.arange(copies * v)
+    remap = np.cumsum(keep) - 1
+    idx = remap[labels[idx.reshape(-1, 3)]]
+    # triangles dégénérés (soudure), puis doublons : même sens → un seul gardé ;
+    # dos à dos (face posée sur le plan de coupe et sa copie) → face interne, supprimée
+    ok = (idx[:, 0] != idx[:, 1]) & (idx[:, 1] != idx[:, 2]) & (idx[:, 0] != idx[:, 2])
+    idx, faces = idx[ok], np.flatnonzero(ok)
+    # clé exacte par face : les 3 indices triés vus comme un seul enregistrement (void)
+    key = np.ascontiguousarray(np.sort(idx, axis=1))
+    key = key.view(np.dtype((np.void, 3 * key.itemsize))).reshape(-1)
+    _, first, inv, counts = np.unique(key, return_index=True,
+                                      return_inverse=True, return_counts=True)
+    rows, low = np.arange(len(idx)), idx.argmin(axis=1)
+    direct = idx[rows, (low + 1) % 3] < idx[rows, (low + 2) % 3]  # sens du cycle
+    n_direct = np.bincount(inv.reshape(-1), weights=direct, minlength=len(first))
+    one_way = (n_direct == 0) | (n_direct == counts)
+    kept = np.sort(first[one_way])
+    idx, faces = idx[kept], faces[kept]
+    out = Mesh(positions[keep], np.tile(mesh.uvs, (copies, 1))[keep], idx,
+               None if normals is None else normals[keep])
+    if mesh.degenerate is not None:
+        out.degenerate = np.tile(mesh.degenerate, copies)[faces]
+    return out
+
+
+def mirror(mesh, axis=0, center=0.0, eps=SEAM_EPS):
+    """Pièce + sa réflexion par le plan axe = center, couture soudée."""
+    step = np.identity(3)
+    step[axis, axis] = -1.0
+    origin = np.zeros(3)
+    origin[axis] = center
+    return _replicate(mesh, step, 2, origin, False, eps)
+
+
+def rotate_copies(mesh, n, axis=2, center=(0.0, 0.0, 0.0), eps=SEAM_EPS):
+    """n copies de la pièce tournées de 360/n degrés autour de l'axe, coutures soudées."""
+    if n < 1:
+        raise ValueError("rotate_copies: n must be >= 1, got %r" % (n,))
+    if n == 1:
+        return mesh
+    return _replicate(mesh, _axis_rotation(2.0 * math.pi / n, axis), n, center, True, eps)
+
+
+def symmetrize(mesh, symmetry, eps=SEAM_EPS):
+    """Applique une symétrie déclarée (None = pièce telle quelle)."""
+    if symmetry is None:
+        return mesh
+    kind, args = symmetry[0], symmetry[1:]
+    if kind == "mirror":
+        return mirror(mesh, *args, eps=eps)
+    if kind == "rotate":
+        return rotate_copies(mesh, *args, eps=eps)
+    raise ValueError("unknown symmetry %r" % (symmetry,))
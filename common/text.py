@@ -0,0 +1,184 @@
+# text.py – Texte du HUD : atlas de glyphes + mises en page en cache + 1 draw par lot
+# Python 3.x  +  PyOpenGL  +  NumPy  +  Pillow
+#
+# GlyphAtlas : la police est rastérisée UNE fois dans une texture (ASCII imprimable) ;
+#   upload() à appeler dans init_gl, hors de toute display list : draw() ne fait que
+#   lier la texture (compilé dans la liste du HUD, un upload serait rejoué à chaque frame)
+# TextRenderer.draw(lignes, w, h) :
+#   • chaque chaîne distincte → quads (positions + uv) calculés une fois (cache LRU)
+#   • le lot complet (toutes les lignes) est réutilisé tel quel si rien n'a changé
+#   • 1 glDrawArrays pour tout le lot, projection = taille réelle de la fenêtre
+# Coordonnées en pixels depuis le coin haut-gauche (le HUD reste collé en haut).
+import collections
+
+import numpy as np
+from OpenGL.GL import *
+from PIL import Image, ImageDraw, ImageFont
+
+# polices à chasse fixe essayées dans l'ordre (colonnes du profiler alignées)
+FONTS = ("DejaVuSansMono.ttf", "consola.ttf", "Menlo.ttc", "cour.ttf")
+FIRST_CHAR, LAST_CHAR = 32, 126
+
+
+def load_font(size, names=FONTS):
+    for name in names:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1 : police bitmap fixe, sans taille
+        return ImageFont.load_default()
+
+
+# ───────────────────────────────────────────────
+# ATLAS
+# ───────────────────────────────────────────────
+class GlyphAtlas:
+    def __init__(self, size=16, font=None, padding=1):
+        font = font or load_font(size)
+        ascent, descent = font.getmetrics()
+        self.line_height = ascent + descent
+        self.ascent = ascent
+        chars = [chr(c) for c in range(FIRST_CHAR, LAST_CHAR + 1)]
+        cell_w = max(int(np.ceil(font.getlength(c))) for c in chars) + 2 * padding
+        cell_h = self.line_height + 2 * padding
+        cols = 16
+        rows = -(-len(chars) // cols)
+        self.width = 1 << (cols * cell_w - 1).bit_length()    # puissance de 2 (GL 1.x)
+        self.height = 1 << (rows * cell_h - 1).bit_length()
+
+        image = Image.new("L", (self.width, self.height), 0)
+        draw = ImageDraw.Draw(image)
+        n = LAST_CHAR + 1
+        self.advance = np.zeros(n, dtype=np.float32)   # avance horizontale (px)
+        self.glyph_w = np.zeros(n, dtype=np.float32)   # largeur du quad (px)
+        self.uv = np.zeros((n, 4), dtype=np.float32)   # u0 v0 u1 v1 (v0 = haut)
+        for k, ch in enumerate(chars):
+            x = (k % cols) * cell_w + padding
+            y = (k // cols) * cell_h + padding
+            draw.text((x, y), ch, fill=255, font=font)
+            code = ord(ch)
+            self.advance[code] = font.getlength(ch)
+            w = float(np.ceil(self.advance[code]))
+            self.glyph_w[code] = w
+            self.uv[code] = (x / self.width, y / self.height,
+                             (x + w) / self.width, (y + self.line_height) / self.height)
+        self.pixels = np.asarray(image, dtype=np.uint8)
+        self.texture = 0
+
+    def upload(self):
+        if self.texture:
+            return self.texture
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        # image PIL : ligne 0 en haut → v=0 en haut, on garde cette convention dans les uv
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, self.width, self.height, 0,
+                     GL_ALPHA, GL_UNSIGNED_BYTE, self.pixels)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return self.texture
+
+    def layout(self, text):
+        """Quads d'une chaîne, origine = coin haut-gauche : (4n,2) positions, (4n,2) uv."""
+        codes = np.frombuffer(text.encode("ascii", "replace"), dtype=np.uint8).astype(np.intp)
+        codes[(codes < FIRST_CHAR) | (codes > LAST_CHAR)] = ord("?")
+        x0 = np.concatenate([[0.0], np.cumsum(self.advance[codes])[:-1]]).astype(np.float32)
+        x1 = x0 + self.glyph_w[codes]
+        h = float(self.line_height)
+        pos = np.empty((len(codes), 4, 2), dtype=np.float32)
+        pos[:, 0] = np.stack([x0, np.full_like(x0, h)], 1)   # bas-gauche (y vers le bas)
+        pos[:, 1] = np.stack([x1, np.full_like(x0, h)], 1)
+        pos[:, 2] = np.stack([x1, np.zeros_like(x0)], 1)
+        pos[:, 3] = np.stack([x0, np.zeros_like(x0)], 1)
+        u0, v0, u1, v1 = self.uv[codes].T
+        uv = np.empty_like(pos)
+        uv[:, 0] = np.stack([u0, v1], 1)
+        uv[:, 1] = np.stack([u1, v1], 1)
+        uv[:, 2] = np.stack([u1, v0], 1)
+        uv[:, 3] = np.stack([u0, v0], 1)
+        return pos.reshape(-1, 2), uv.reshape(-1, 2)
+
+
+# ───────────────────────────────────────────────
+# RENDU PAR LOT
+# ───────────────────────────────────────────────
+class TextRenderer:
+    def __init__(self, size=16, cache_size=256):
+        self.atlas = GlyphAtlas(size)
+        self.line_height = self.atlas.line_height
+        self._layouts = collections.OrderedDict()  # chaîne → (pos, uv), LRU
+        self._cache_size = cache_size
+        self._batch_key = None
+        self._batch = None
+        self.layouts_built = 0   # compteurs (mises en page calculées / lots reconstruits)
+        self.batches_built = 0
+
+    def _layout(self, text):
+        hit = self._layouts.get(text)
+        if hit is not None:
+            self._layouts.move_to_end(text)
+            return hit
+        hit = self._layouts[text] = self.atlas.layout(text)
+        self.layouts_built += 1
+        if len(self._layouts) > self._cache_size:
+            self._layouts.popitem(last=False)
+        return hit
+
+    def _build_batch(self, lines, height):
+        pos, uv, col = [], [], []
+        for text, x, y, color in lines:
+            p, t = self._layout(text)
+            # y depuis le haut → repère GL (origine en bas)
+            pos.append(np.column_stack([p[:, 0] + x, height - y - p[:, 1]]))
+            uv.append(t)
+            col.append(np.broadcast_to(np.asarray(color, dtype=np.float32)[:3], (len(p), 3)))
+        self.batches_built += 1
+        if not pos:
+            return None
+        return (np.ascontiguousarray(np.concatenate(pos), dtype=np.float32),
+                np.ascontiguousarray(np.concatenate(uv), dtype=np.float32),
+                np.ascontiguousarray(np.concatenate(col), dtype=np.float32))
+
+    def draw(self, lines, width, height):
+        """lines : [(texte, x, y, (r,g,b))] en pixels depuis le haut-gauche."""
+        key = (tuple((t, x, y, tuple(c)) for t, x, y, c in lines), width, height)
+        if key != self._batch_key:
+            self._batch = self._build_batch(lines, height)
+            self._batch_key = key
+        if self._batch is None:
+            return
+        if not self.atlas.texture:
+            raise RuntimeError("glyph atlas not uploaded: call atlas.upload() in init_gl")
+        pos, uv, col = self._batch
+
+        glPushAttrib(GL_ENABLE_BIT | GL_TEXTURE_BIT | GL_CURRENT_BIT | GL_COLOR_BUFFER_BIT)
+        glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity()
+        glOrtho(0, width, 0, height, -1, 1)
+        glMatrixMode(GL_MODELVIEW); glPushMatrix(); glLoadIdentity()
+        glDisable(GL_LIGHTING); glDisable(GL_DEPTH_TEST); glDisable(GL_CULL_FACE)
+        glEnable(GL_TEXTURE_2D); glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glBindTexture(GL_TEXTURE_2D, self.atlas.texture)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, pos)
+        glTexCoordPointer(2, GL_FLOAT, 0, uv)
+        glColorPointer(3, GL_FLOAT, 0, col)
+        glDrawArrays(GL_QUADS, 0, len(pos))
+        glPopClientAttrib()
+
+        glPopMatrix(); glMatrixMode(GL_PROJECTION); glPopMatrix(); glMatrixMode(GL_MODELVIEW)
+        glPopAttrib()
+
+    def delete(self):
+        if self.atlas.texture:
+            glDeleteTextures([self.atlas.texture])
+            self.atlas.texture = 0
@@ -0,0 +1,314 @@
+# textures.py – Gestionnaire de textures : décodage en tâche de fond + cache disque
+# Python 3.x  +  PyOpenGL  +  NumPy  +  Pillow
+#
+# prefetch(chemin, taille) : décodage + redimensionnement + chaîne de mipmaps (mipmaps.py,
+#   filtrée en espace linéaire) dans un pool de threads (lancé AVANT glutCreateWindow → se recouvre avec l'ouverture de la fenêtre).
+# get(chemin, taille)      : attend le décodage puis envoie les niveaux au GPU, UNE fois ;
+#   les appels suivants (même fichier, même taille) partagent le même objet Texture.
+# Cache disque : une entrée par (sha256 du fichier, taille cible, noyau), relue par mmap :
+#   [MAGIC 8o | version u32 | taille en-tête u32] [en-tête JSON] [niveaux alignés 64o]
+# Filtres : une seule image GPU, le filtre (nearest / linear / mipmap) est changé par
+#   glTexParameteri au bind, seulement quand il diffère (≈ objets sampler de GL 3.3).
+#
+# CLI :  python common/textures.py warm <dossier> [--size 256x256] [--kernel box] [--pot]
+#        python common/textures.py list | clear
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from OpenGL.GL import *
+from PIL import Image
+
+from mipmaps import DEFAULT_KERNEL, KERNELS, build_mips, resize
+
+MAGIC = b"TEXCACHE"
+VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<8sII")
+# le code de décodage fait partie de la clé
+_HERE = os.path.dirname(os.path.abspath(__file__))
+CODE_FILES = [os.path.join(_HERE, f) for f in ("textures.py", "mipmaps.py")]
+IMAGE_EXTS = (".bmp", ".png", ".jpg", ".jpeg", ".tga", ".tif", ".tiff")
+
+# nom → (MIN_FILTER, MAG_FILTER)
+FILTERS = {
+    "nearest": (GL_NEAREST, GL_NEAREST),
+    "linear": (GL_LINEAR, GL_LINEAR),
+    "mipmap": (GL_LINEAR_MIPMAP_NEAREST, GL_LINEAR),
+}
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def default_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pyopengl-viewers", "textures")
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+_code_hash = None
+
+
+def _code_key():
+    global _code_hash
+    if _code_hash is None:
+        h = hashlib.sha256()
+        for path in CODE_FILES:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _code_hash = h.hexdigest()
+    return _code_hash
+
+
+# ───────────────────────────────────────────────
+# DÉCODAGE (CPU, thread-safe)
+# ───────────────────────────────────────────────
+def decode(data, size=None, kernel=DEFAULT_KERNEL, pot=False):
+    """Octets d'une image → chaîne de mipmaps RGB, ligne 0 en bas (convention GL)."""
+    image = Image.open(io.BytesIO(data)).convert("RGB").transpose(Image.FLIP_TOP_BOTTOM)
+    pixels = np.asarray(image, dtype=np.uint8)
+    if size is not None:
+        pixels = resize(pixels, size[0], size[1], kernel)
+    return build_mips(pixels, kernel, pot)
+
+
+# ───────────────────────────────────────────────
+# CACHE DISQUE
+# ───────────────────────────────────────────────
+class TextureCache:
+    def __init__(self, directory=None, enabled=None):
+        self.directory = directory or os.environ.get("TEXTURE_CACHE_DIR") or default_dir()
+        if enabled is None:  # TEXTURE_CACHE=0 → toujours redécoder
+            enabled = os.environ.get("TEXTURE_CACHE", "1") != "0"
+        self.enabled = enabled
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def _tag(size, kernel, pot):
+        tag = "%s-%s" % ("x".join(map(str, size)) if size else "orig", kernel)
+        return tag + "-pot" if pot else tag
+
+    def key(self, digest, *options):
+        return "%s-%s-%s" % (digest, self._tag(*options), _code_key())
+
+    def path(self, digest, *options):
+        return os.path.join(self.directory, "%s-%s.tex" % (digest[:16], self._tag(*options)))
+
+    def load(self, digest, *options):
+        """Liste des niveaux (vues mmap en lecture seule), ou None si absent/périmé."""
+        if not self.enabled:
+            return None
+        path = self.path(digest, *options)
+        try:
+            with open(path, "rb") as f:
+                magic, version, hsize = _PREFIX.unpack(f.read(_PREFIX.size))
+                if magic != MAGIC or version != VERSION:
+                    return None
+                header = json.loads(f.read(hsize))
+        except (OSError, ValueError, struct.error):
+            return None
+        if header["key"] != self.key(digest, *options):
+            return None
+        start = _align(_PREFIX.size + hsize)
+        raw = np.asarray(np.memmap(path, dtype=np.uint8, mode="r"))
+        return [raw[start + off:start + off + h * w * c].reshape(h, w, c)
+                for off, h, w, c in header["levels"]]
+
+    def store(self, digest, options, levels):
+        if not self.enabled:
+            return
+        table, offset = [], 0
+        for lv in levels:
+            offset = _align(offset)
+            table.append((offset,) + lv.shape)
+            offset += lv.nbytes
+        header = json.dumps({"key": self.key(digest, *options), "levels": table}).encode()
+        start = _align(_PREFIX.size + len(header))
+
+        path = self.path(digest, *options)
+        tmp = "%s.%d.%d.tmp" % (path, os.getpid(), id(levels))  # plusieurs threads
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+                f.write(header)
+                for (off, *_), lv in zip(table, levels):
+                    f.seek(start + off)
+                    np.ascontiguousarray(lv).tofile(f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Warning: texture cache entry '{os.path.basename(path)}' not written ({e})")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get_or_decode(self, path, size=None, kernel=DEFAULT_KERNEL, pot=False):
+        """Niveaux de mipmaps de l'image : relus du cache, sinon décodés puis écrits."""
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = _sha256(data)
+        options = (tuple(size) if size else None, kernel, pot)
+        levels = self.load(digest, *options)
+        if levels is not None:
+            self.hits += 1
+            return levels
+        self.misses += 1
+        levels = decode(data, size, kernel, pot)
+        self.store(digest, options, levels)
+        return levels
+
+    def entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, f)
+                      for f in os.listdir(self.directory) if f.endswith(".tex"))
+
+    def clear(self):
+        for path in self.entries():
+            os.remove(path)
+
+
+# ───────────────────────────────────────────────
+# TEXTURE GPU (une image, filtre commutable)
+# ───────────────────────────────────────────────
+class Texture:
+    def __init__(self, levels, filter="linear"):
+        self.levels = len(levels)
+        self.height, self.width = levels[0].shape[:2]
+        self.id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)  # lignes RGB des petits niveaux non alignées
+        for i, lv in enumerate(levels):
+            h, w = lv.shape[:2]
+            glTexImage2D(GL_TEXTURE_2D, i, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, lv)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, self.levels - 1)
+        self.filter = None
+        self._set_filter(filter)
+
+    def _set_filter(self, name):
+        if name == "mipmap" and self.levels == 1:
+            name = "linear"
+        if name == self.filter:
+            return
+        min_f, mag_f = FILTERS[name]
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, min_f)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, mag_f)
+        self.filter = name
+
+    def bind(self, filter=None, state=None):
+        # state : glstate.StateCache → bind évité si la texture est déjà liée
+        if state is not None:
+            state.bind_texture(self.id)
+        else:
+            glBindTexture(GL_TEXTURE_2D, self.id)
+        if filter is not None:
+            self._set_filter(filter)
+
+    def delete(self):
+        if self.id:
+            glDeleteTextures([self.id])
+            self.id = 0
+
+
+# ───────────────────────────────────────────────
+# GESTIONNAIRE
+# ───────────────────────────────────────────────
+class TextureManager:
+    def __init__(self, cache=None, workers=None):
+        self.cache = cache or TextureCache()
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._pool = None
+        self._pending = {}   # (chemin absolu, taille, noyau, pot) → Future des niveaux
+        self._textures = {}  # (chemin absolu, taille, noyau, pot) → Texture
+
+    @staticmethod
+    def _key(path, size, kernel, pot):
+        return os.path.abspath(path), tuple(size) if size else None, kernel, pot
+
+    def prefetch(self, path, size=None, kernel=DEFAULT_KERNEL, pot=False):
+        """Lance le décodage en tâche de fond (aucun appel GL : avant la fenêtre)."""
+        key = self._key(path, size, kernel, pot)
+        if key not in self._pending and key not in self._textures:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="texture")
+            self._pending[key] = self._pool.submit(self.cache.get_or_decode, *key)
+        return self._pending.get(key)
+
+    def get(self, path, size=None, filter="linear", kernel=DEFAULT_KERNEL, pot=False):
+        """Texture GPU partagée ; FileNotFoundError / OSError si l'image est illisible."""
+        key = self._key(path, size, kernel, pot)
+        tex = self._textures.get(key)
+        if tex is None:
+            self.prefetch(path, size, kernel, pot)
+            levels = self._pending.pop(key).result()  # relance l'exception du thread
+            tex = self._textures[key] = Texture(levels, filter)
+        return tex
+
+    def clear(self):
+        for tex in self._textures.values():
+            tex.delete()
+        self._textures.clear()
+
+
+_default = None
+
+
+def default_manager():
+    global _default
+    if _default is None:
+        _default = TextureManager()
+    return _default
+
+
+def _main(argv=None):
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Decoded texture cache")
+    parser.add_argument("--dir", help="cache directory (default: %s)" % default_dir())
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    warm = sub.add_parser("warm", help="pre-compute the mip chain of every image in a directory")
+    warm.add_argument("paths", nargs="+")
+    warm.add_argument("--size", help="target size WxH (default: keep the source size)")
+    warm.add_argument("--kernel", choices=KERNELS, default=DEFAULT_KERNEL)
+    warm.add_argument("--pot", action="store_true", help="round level 0 to a power of two")
+    sub.add_parser("list", help="list cache entries")
+    sub.add_parser("clear", help="delete every cache entry")
+    args = parser.parse_args(argv)
+
+    cache = TextureCache(args.dir, enabled=True)
+    if args.cmd == "list":
+        for path in cache.entries():
+            print("%10d  %s" % (os.path.getsize(path), os.path.basename(path)))
+    elif args.cmd == "clear":
+        cache.clear()
+    else:
+        size = tuple(int(v) for v in args.size.lower().split("x")) if args.size else None
+        for root in args.paths:
+            files = [root] if os.path.isfile(root) else [
+                os.path.join(d, f) for d, _, names in os.walk(root) for f in sorted(names)]
+            for path in files:
+                if os.path.splitext(path)[1].lower() not in IMAGE_EXTS:
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    levels = cache.get_or_decode(path, size, args.kernel, args.pot)
+                except OSError as e:  # fichier illisible / format non reconnu par Pillow
+                    print("skip  %s (%s)" % (path, e))
+                    continue
+                h, w = levels[0].shape[:2]
+                print("ok    %s  %dx%d  %d levels  %.2fs"
+                      % (path, w, h, len(levels), time.perf_counter() - t0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
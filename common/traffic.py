@@ -0,0 +1,90 @@
+# traffic.py – Trafic de N voitures : cinématique vectorisée à pas de temps fixe
+# Python 3.x  +  NumPy
+#
+# L'état vit dans des tableaux (N,…) : position, cap (heading), vitesse, vitesse de virage.
+# step()    : UN pas de DT secondes pour toutes les voitures (aucune boucle Python par voiture)
+# advance() : horloge murale → nombre de pas fixes à jouer (accumulateur, plafonné à
+#             MAX_STEPS par appel) → la simulation ne dépend pas de la cadence d'affichage
+# matrices(): (N,4,4) rotation autour de Y + translation, remplies sur place, prêtes pour
+#             InstanceBatch.set_matrices (avant du modèle = +Z)
+# Le monde est un tore [-extent, extent]² sur X/Z : une voiture qui sort revient en face.
+import math
+
+import numpy as np
+
+DT = 1.0 / 60.0
+MAX_STEPS = 8            # rattrapage max par appel (évite la spirale après une pause)
+SPEED_RANGE = (2.0, 8.0)  # unités / s
+TURN_RANGE = 0.35        # rad / s, tiré dans [-TURN_RANGE, TURN_RANGE]
+
+
+class Traffic:
+    def __init__(self, count, extent=40.0, dt=DT, seed=0, max_steps=MAX_STEPS):
+        rng = np.random.default_rng(seed)
+        self.count = count
+        self.extent = float(extent)
+        self.dt = float(dt)
+        self.max_steps = max_steps
+
+        self.position = np.zeros((count, 3))
+        self.position[:, [0, 2]] = rng.uniform(-extent, extent, (count, 2))
+        self.heading = rng.uniform(0.0, 2.0 * math.pi, count)
+        self.speed = rng.uniform(*SPEED_RANGE, count)
+        self.turn_rate = rng.uniform(-TURN_RANGE, TURN_RANGE, count)
+        self.velocity = np.zeros((count, 3))
+        self._update_velocity()
+
+        self.ticks = 0          # pas fixes joués depuis le début
+        self._acc = 0.0
+        self._last = None
+        self._matrices = np.zeros((count, 4, 4))
+        self._matrices[:, 1, 1] = self._matrices[:, 3, 3] = 1.0
+        self._matrices_tick = -1
+
+    def __len__(self):
+        return self.count
+
+    def _update_velocity(self):
+        self.velocity[:, 0] = np.sin(self.heading) * self.speed
+        self.velocity[:, 2] = np.cos(self.heading) * self.speed
+
+    # ---------- intégration ------------------------------------------------------------
+    def step(self):
+        dt = self.dt
+        self.heading += self.turn_rate * dt
+        self._update_velocity()
+        self.position += self.velocity * dt
+        e = self.extent
+        xz = self.position[:, [0, 2]]
+        self.position[:, [0, 2]] = (xz + e) % (2.0 * e) - e
+        self.ticks += 1
+
+    def advance(self, now):
+        """now : temps mural (s). Joue les pas fixes écoulés depuis l'appel précédent."""
+        if self._last is None:
+            self._last = now
+            return 0
+        self._acc += min(now - self._last, self.max_steps * self.dt)
+        self._last = now
+        steps = int(self._acc / self.dt)
+        self._acc -= steps * self.dt
+        for _ in range(steps):  # une itération = toutes les voitures
+            self.step()
+        return steps
+
+    def pause(self):
+        # la prochaine advance() repart de zéro (pas de rattrapage du temps en pause)
+        self._last = None
+        self._acc = 0.0
+
+    # ---------- rendu ----------------------------------------------------------------------
+    def matrices(self):
+        """(N,4,4) monde de chaque voiture ; recalculé au plus une fois par pas."""
+        if self._matrices_tick != self.ticks:
+            m = self._matrices
+            c, s = np.cos(self.heading), np.sin(self.heading)
+            m[:, 0, 0] = c; m[:, 0, 2] = s
+            m[:, 2, 0] = -s; m[:, 2, 2] = c
+            m[:, :3, 3] = self.position
+            self._matrices_tick = self.ticks
+        return self._matrices
@@ -0,0 +1,104 @@
+# world.py – Chargeur des fichiers "NUMPOLLIES" (World.txt de NeHe lesson10)
+# Python 3.x  +  NumPy
+#
+# Format :  NUMPOLLIES n  puis 3·n lignes "x y z u v" ; lignes vides et
+#           commentaires ("// …") ignorés.
+# Lecture en flux par blocs de taille fixe : le texte n'est jamais chargé en
+# entier, chaque bloc est converti d'un coup (np.fromstring) dans un tableau
+# (3·n, 5) alloué une seule fois d'après l'en-tête → mémoire ≈ résultat + 1 bloc.
+# line_chunks / fields_per_row servent aussi aux autres formats texte (importers.py).
+import numpy as np
+
+from mesh import Mesh
+
+CHUNK_BYTES = 1 << 22  # 4 Mio de texte par bloc
+FIELDS = 5             # x y z u v
+
+
+def _data_rows(lines):
+    # lignes utiles d'un bloc (ni vides, ni commentaires)
+    return [l for l in lines if l.strip() and not l.lstrip().startswith(b"/")]
+
+
+def fields_per_row(text, n_rows):
+    """Nombre de jetons (séparés par des blancs) de chacune des n_rows lignes de text,
+    vectorisé sur les octets du bloc → (n_rows,) int."""
+    buf = np.frombuffer(text, dtype=np.uint8)
+    space = buf <= 32
+    starts = np.flatnonzero(~space & np.r_[True, space[:-1]])
+    line = np.searchsorted(np.flatnonzero(buf == 10), starts)
+    return np.bincount(line, minlength=n_rows)
+
+
+def _bad_row(rows, first_row, filename):
+    # chemin d'erreur seulement : on localise la première ligne fautive
+    for k, row in enumerate(rows):
+        try:
+            ok = len([float(t) for t in row.split()]) == FIELDS
+        except ValueError:
+            ok = False
+        if not ok:
+            raise ValueError("%s: malformed vertex row %d: %r"
+                             % (filename, first_row + k + 1, row.decode(errors="replace")))
+    raise ValueError("%s: could not parse vertex rows %d-%d"
+                     % (filename, first_row + 1, first_row + len(rows)))
+
+
+def line_chunks(f, chunk_bytes):
+    """Lit f (binaire) par blocs de ~chunk_bytes coupés sur une fin de ligne (le reste
+    passe au bloc suivant) → listes de lignes (bytes)."""
+    tail = b""
+    while True:
+        block = f.read(chunk_bytes)
+        if not block:
+            break
+        block = tail + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            tail = block
+            continue
+        tail = block[cut:]
+        yield block[:cut].split(b"\n")
+    if tail:
+        yield [tail]
+
+
+def load_world(filename, chunk_bytes=CHUNK_BYTES):
+    """Lit un fichier NUMPOLLIES → Mesh "soupe" (3 sommets par triangle, non soudé).
+
+    Lève ValueError si l'en-tête manque, si une ligne n'a pas 5 nombres, ou si le
+    nombre de lignes lues ne correspond pas au NUMPOLLIES déclaré."""
+    with open(filename, "rb") as f:
+        data = None
+        row = 0
+        for lines in line_chunks(f, chunk_bytes):
+            rows = _data_rows(lines)
+            if data is None:
+                if not rows:
+                    continue
+                header = rows.pop(0).split()
+                if len(header) != 2 or header[0] != b"NUMPOLLIES" or not header[1].isdigit():
+                    raise ValueError("%s: expected 'NUMPOLLIES <count>' header" % filename)
+                data = np.empty((int(header[1]) * 3, FIELDS), dtype=np.float32)
+            if not rows:
+                continue
+            text = b"\n".join(rows)
+            fields = fields_per_row(text, len(rows))
+            try:
+                values = np.fromstring(text, dtype=np.float32, sep=" ")
+            except ValueError:  # jeton non numérique (NumPy récent lève au lieu d'avertir)
+                values = np.empty(0, dtype=np.float32)
+            if values.size != len(rows) * FIELDS or (fields != FIELDS).any():
+                _bad_row(rows, row, filename)
+            if row + len(rows) > len(data):
+                raise ValueError("%s: NUMPOLLIES %d declared, more vertex rows found"
+                                 % (filename, len(data) // 3))
+            data[row:row + len(rows)] = values.reshape(-1, FIELDS)
+            row += len(rows)
+
+    if data is None:
+        raise ValueError("%s: expected 'NUMPOLLIES <count>' header" % filename)
+    if row != len(data):
+        raise ValueError("%s: NUMPOLLIES %d declared, %d vertex rows found (expected %d)"
+                         % (filename, len(data) // 3, row, len(data)))
+    return Mesh(data[:, :3], data[:, 3:])
@@ -1,18 +1,17 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+import glbackend  # GL_BACKEND=record|trace : rendu sans écran / comptage des appels
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
-from PIL import Image
-import numpy as np
-import sys
+from mesh import MeshBuilder, Vertex
+from gpu import GpuMesh, vbo_supported
+from scheduler import FrameScheduler
+from textures import default_manager
+from glstate import StateCache
 
-class Vertex:
-    def __init__(self, x, y, z, u, v):
-        self.x, self.y, self.z = x, y, z
-        self.u, self.v = u, v
-
-class Triangle:
-    def __init__(self, vertices):
-        self.vertices = vertices
+TEXTURE_FILE = "mud.bmp"
+TEXTURE_SIZE = (256, 256)
 
 class Sector:
     def __init__(self):
@@ -20,10 +19,9 @@ class Sector:
 
     @staticmethod
     def create_cube():
-        faces = []
+        faces = MeshBuilder()
         def add_face(vs):
-            faces.append(Triangle([vs[0], vs[1], vs[2]]))
-            faces.append(Triangle([vs[0], vs[2], vs[3]]))
+            faces.add_quad(vs[0], vs[1], vs[2], vs[3])
 
         uv = [(0,0), (1,0), (1,1), (0,1)]
         def V(x, y, z, i): return Vertex(x, y, z, *uv[i])
@@ -35,13 +33,16 @@ class Sector:
         add_face([V(-1,-1,-1,0), V(-1,-1, 1,1), V(-1, 1, 1,2), V(-1, 1,-1,3)])  # left
         add_face([V( 1,-1, 1,0), V( 1,-1,-1,1), V( 1, 1,-1,2), V( 1, 1, 1,3)])  # right
 
-        return faces
+        return faces.build()
 
 class Renderer:
     def __init__(self):
         self.sector = Sector()
-        self.texture_ids = glGenTextures(3)
-        self.filter_mode = 0
+        self.scheduler = FrameScheduler(self.render)  # redessin à la demande
+        self.use_vbo = True  # False → ancien mode immédiat
+        self.gpu = None
+        self.texture = None
+        self.state = StateCache()  # bind de texture évité s'il ne change rien
         self.angle_x = 20.0
         self.angle_y = 30.0
         self.mouse_dragging = False
@@ -49,26 +50,19 @@ class Renderer:
 
     def load_texture(self, image_path):
         try:
-            image = Image.open(image_path)
+            self.texture = default_manager().get(image_path, TEXTURE_SIZE, "linear")
         except FileNotFoundError:
             print(f"Error: texture file '{image_path}' not found.")
             sys.exit(1)
 
-        image = image.resize((256, 256)).transpose(Image.FLIP_TOP_BOTTOM)
-        img_data = np.array(image.convert("RGB"), dtype=np.uint8)
-        w, h = image.size
-
-        glBindTexture(GL_TEXTURE_2D, self.texture_ids[0])
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-
     def init_gl(self):
         glEnable(GL_TEXTURE_2D)
         glShadeModel(GL_SMOOTH)
         glClearColor(0.0, 0.0, 0.0, 1.0)
         glEnable(GL_DEPTH_TEST)
-        self.load_texture("mud.bmp")
+        self.load_texture(TEXTURE_FILE)
+        if self.use_vbo and vbo_supported():
+            self.gpu = GpuMesh(self.sector.triangles, textured=True)
 
     def render(self):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -77,15 +71,19 @@ class Renderer:
         glRotatef(self.angle_x, 1, 0, 0)
         glRotatef(self.angle_y, 0, 1, 0)
 
-        glBindTexture(GL_TEXTURE_2D, self.texture_ids[self.filter_mode])
-        for tri in self.sector.triangles:
-            glBegin(GL_TRIANGLES)
-            for v in tri.vertices:
-                glTexCoord2f(v.u, v.v)
-                glVertex3f(v.x, v.y, v.z)
-            glEnd()
+        self.texture.bind(state=self.state)
+        if self.use_vbo and self.gpu:
+            self.gpu.draw()
+        else:
+            for tri in self.sector.triangles:
+                glBegin(GL_TRIANGLES)
+                for v in tri.vertices:
+                    glTexCoord2f(v.u, v.v)
+                    glVertex3f(v.x, v.y, v.z)
+                glEnd()
 
         glutSwapBuffers()
+        self.state.end_frame()
 
     def on_mouse_motion(self, x, y):
         if self.mouse_dragging:
@@ -94,6 +92,7 @@ class Renderer:
             self.angle_y += dx * 0.5
             self.angle_x += dy * 0.5
             self.last_mouse = (x, y)
+            self.scheduler.notify_input()
 
     def on_mouse_click(self, button, state, x, y):
         if button == GLUT_LEFT_BUTTON:
@@ -111,6 +110,7 @@ def reshape(w, h):
 
 def main():
     global app
+    default_manager().prefetch(TEXTURE_FILE, TEXTURE_SIZE)  # décodage pendant l'ouverture
     glutInit(sys.argv)
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
     glutInitWindowSize(800, 600)
@@ -119,11 +119,10 @@ def main():
     app = Renderer()
     app.init_gl()
 
-    glutDisplayFunc(app.render)
     glutReshapeFunc(reshape)
     glutMouseFunc(app.on_mouse_click)
     glutMotionFunc(app.on_mouse_motion)
-    glutIdleFunc(app.render)
+    app.scheduler.install()
 
     glutMainLoop()
 
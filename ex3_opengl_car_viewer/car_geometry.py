@@ -0,0 +1,448 @@
+# car_geometry.py – Géométrie de la voiture low-poly (sans GL) : CarSpec → maillages
+# Python 3.x  +  NumPy
+#
+# CarSpec : proportions d'UNE voiture (valeur immuable, hashable) ; les constantes du
+# module sont les valeurs par défaut. Sector(spec) construit ses pièces à partir d'elle,
+# plusieurs formes de voiture coexistent donc dans un même processus.
+#   build_car(spec)        → dict nom → Mesh, mémoïsé (LRU, SPEC_CACHE_SIZE specs) et
+#                            passé par le cache disque (une entrée par spec)
+#   build_variants(specs)  → VariantBatch : N variantes construites dans un pool de
+#                            processus ; les workers renvoient des tableaux bruts, rangés
+#                            dans quelques grands tableaux contigus + une table de plages
+#                            (une spec répétée n'est rangée qu'une fois : plages partagées)
+# Ce module n'importe pas OpenGL : les workers du pool le chargent à bas coût.
+import functools
+import hashlib
+import math
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+
+from mesh import Mesh, MeshBuilder, Vertex
+from mesh_cache import default_cache
+from normals import compute_normals
+from symmetry import MIRROR_X, rotate_copies, symmetrize
+
+# --- proportions "blueprint" (repère: X=gauche/droite, Y=haut/bas, Z=avant/arrière) ---
+HALF_LEN   = 2.25
+HALF_W     = 1.30
+BASE_Y0    = -0.52
+BASE_Y1    =  0.32
+ROOF_Y0    = 0.44
+ROOF_Y1    = 1.02
+ROOF_W     = 0.75
+ROOF_L     = 1.10
+ROOF_SHIFT = 0.10
+WHEEL_R      = 0.45
+WHEEL_HALF_W = 0.22
+NOSE_LEN   = 1.35
+TRUNK_LEN  = 1.00
+HOOD_DROP  = 0.42
+TRUNK_DROP = 0.30
+CREASE_ANGLE = 45.0  # lissage des normales (cylindres) ; arêtes plus vives = flat
+# niveaux de détail des cylindres (niveau 0 = le plus fin)
+CYLINDER_LODS = (24, 12, 6)                 # segments (roues, phares, poteau)
+
+SPEC_CACHE_SIZE = 64   # specs gardées par build_car (LRU)
+BATCH_CHUNK = 8        # variantes par tâche envoyée à un worker
+
+_SPEC_FIELDS = ("half_len", "half_w", "base_y0", "base_y1", "roof_y0", "roof_y1", "roof_w",
+                "roof_l", "roof_shift", "wheel_r", "wheel_half_w", "nose_len", "trunk_len",
+                "hood_drop", "trunk_drop")
+_POSITIVE = ("half_len", "half_w", "wheel_r", "wheel_half_w", "nose_len", "trunk_len")
+
+
+class CarSpec(namedtuple("CarSpec", _SPEC_FIELDS, defaults=(
+        HALF_LEN, HALF_W, BASE_Y0, BASE_Y1, ROOF_Y0, ROOF_Y1, ROOF_W, ROOF_L, ROOF_SHIFT,
+        WHEEL_R, WHEEL_HALF_W, NOSE_LEN, TRUNK_LEN, HOOD_DROP, TRUNK_DROP))):
+    """Proportions d'une voiture ; CarSpec(half_len=2.6) = défaut sauf la longueur."""
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls, *args, **kwargs)
+        bad = [f for f in _POSITIVE if not getattr(self, f) > 0]
+        if bad:
+            raise ValueError("CarSpec: %s must be > 0" % ", ".join(bad))
+        if self.nose_len + self.trunk_len > 2 * self.half_len:
+            raise ValueError("CarSpec: nose_len + trunk_len exceed the car length")
+        return self
+
+    def params(self):
+        # paramètres de géométrie → clé du cache disque (avec le code de ce module)
+        return dict(self._asdict(), CREASE_ANGLE=CREASE_ANGLE, CYLINDER_LODS=CYLINDER_LODS)
+
+    def digest(self):
+        return hashlib.sha1(repr(tuple(map(float, self))).encode()).hexdigest()[:12]
+
+    def wheel_positions(self):
+        # centres des 4 roues (repère voiture) : avant droite / gauche, arrière droite / gauche
+        x = self.half_w - 0.12
+        return [(sx * x, self.base_y0, z)
+                for z in (self.half_len - 0.55, -(self.half_len - 1.55)) for sx in (1, -1)]
+
+
+# ───────────────────────────────────────────────
+# SECTOR : maillages d'une voiture
+# ───────────────────────────────────────────────
+class Sector:
+    @staticmethod
+    def _add_quad(tris, v0, v1, v2, v3):
+        tris.add_quad(v0, v1, v2, v3)
+
+    @staticmethod
+    def _cuboid_half_open_x0(min_pt, max_pt):
+        x0, y0, z0 = min_pt
+        x1, y1, z1 = max_pt
+        V = lambda x, y, z: Vertex(x, y, z)
+        t = MeshBuilder()
+        # avant / arrière
+        Sector._add_quad(t, V(x0, y0, z1), V(x1, y0, z1), V(x1, y1, z1), V(x0, y1, z1))
+        Sector._add_quad(t, V(x1, y0, z0), V(x0, y0, z0), V(x0, y1, z0), V(x1, y1, z0))
+        # dessus
+        Sector._add_quad(t, V(x0, y1, z1), V(x1, y1, z1), V(x1, y1, z0), V(x0, y1, z0))
+        # >>> DESSOUS (winding corrigé pour normal vers -Y) <<<
+        Sector._add_quad(t, V(x0, y0, z1), V(x1, y0, z1), V(x1, y0, z0), V(x0, y0, z0))
+        # côté x1 (seulement)
+        Sector._add_quad(t, V(x1, y0, z1), V(x1, y0, z0), V(x1, y1, z0), V(x1, y1, z1))
+        return t
+
+    @staticmethod
+    def _wedge_half_open_x0(tris, x0, x1, z0, z1, yb, yt0, yt1):
+        V = lambda x, y, z: Vertex(x, y, z)
+        # >>> DESSOUS (winding corrigé pour normal vers -Y) <<<
+        Sector._add_quad(tris, V(x0, yb, z1), V(x1, yb, z1), V(x1, yb, z0), V(x0, yb, z0))
+        # dessus incliné — winding inversé pour normale vers l'extérieur (+Y côté pente)
+        Sector._add_quad(tris, V(x0, yt1, z1), V(x1, yt1, z1), V(x1, yt0, z0), V(x0, yt0, z0))
+        # face z1
+        Sector._add_quad(tris, V(x0, yb, z1), V(x1, yb, z1), V(x1, yt1, z1), V(x0, yt1, z1))
+        # face z0
+        Sector._add_quad(tris, V(x1, yb, z0), V(x0, yb, z0), V(x0, yt0, z0), V(x1, yt0, z0))
+        # côté x1 uniquement
+        Sector._add_quad(tris, V(x1, yb, z1), V(x1, yb, z0), V(x1, yt0, z0), V(x1, yt1, z1))
+
+    @staticmethod
+    def _cuboid(min_pt, max_pt):
+        x1, y1, z1 = min_pt; x2, y2, z2 = max_pt
+        V=lambda x,y,z: Vertex(x,y,z); t=MeshBuilder()
+        Sector._add_quad(t, V(x1,y1,z2), V(x2,y1,z2), V(x2,y2,z2), V(x1,y2,z2))
+        Sector._add_quad(t, V(x2,y1,z1), V(x1,y1,z1), V(x1,y2,z1), V(x2,y2,z1))
+        Sector._add_quad(t, V(x1,y2,z2), V(x2,y2,z2), V(x2,y2,z1), V(x1,y2,z1))
+        Sector._add_quad(t, V(x1,y1,z1), V(x2,y1,z1), V(x2,y1,z2), V(x1,y1,z2))
+        Sector._add_quad(t, V(x1,y1,z1), V(x1,y1,z2), V(x1,y2,z2), V(x1,y2,z1))
+        Sector._add_quad(t, V(x2,y1,z2), V(x2,y1,z1), V(x2,y2,z1), V(x2,y2,z2))
+        return t
+
+    @staticmethod
+    def _cylinder(center, radius, half_w, segments=24):
+        # UN secteur modélisé, puis segments copies tournées autour de l'axe Z (symmetry.py)
+        cx, cy, cz = center; tris=MeshBuilder()
+        a=2*math.pi/segments
+        x1=cx+radius; y1=cy
+        x2=cx+radius*math.cos(a); y2=cy+radius*math.sin(a)
+        zf,zb = cz-half_w, cz+half_w
+        v0,v1=Vertex(x1,y1,zf),Vertex(x2,y2,zf); v2,v3=Vertex(x2,y2,zb),Vertex(x1,y1,zb)
+        Sector._add_quad(tris, v0,v1,v2,v3)                      # manteau
+        tris.add_tri(Vertex(cx,cy,zf), v1, v0)                   # face -z
+        tris.add_tri(Vertex(cx,cy,zb), v3, v2)                   # face +z
+        return rotate_copies(tris.build(), segments, 2, center)
+
+    @staticmethod
+    def _sphere(center, radius, slices=12, stacks=12):
+        # sphère UV (remplace glutSolidSphere : tessellée une fois, instanciable)
+        cx, cy, cz = center; tris = MeshBuilder()
+        def P(i, j):
+            th = 2*math.pi*i/slices; ph = math.pi*j/stacks - math.pi/2
+            return Vertex(cx + radius*math.cos(ph)*math.cos(th), cy + radius*math.sin(ph),
+                          cz - radius*math.cos(ph)*math.sin(th))
+        for j in range(stacks):
+            for i in range(slices):
+                v0, v1, v2, v3 = P(i, j), P(i+1, j), P(i+1, j+1), P(i, j+1)
+                if j == 0:            tris.add_tri(v0, v2, v3)   # pôle sud
+                elif j == stacks - 1: tris.add_tri(v0, v1, v2)   # pôle nord
+                else:                 Sector._add_quad(tris, v0, v1, v2, v3)
+        return tris
+
+    # symétries déclarées par pièce : la moitié droite (x ≥ 0) est modélisée, le reste
+    # est produit au build ; le rendu ne fait aucun miroir
+    SYMMETRY = {"triangles_body": MIRROR_X, "triangles_windows": MIRROR_X,
+                "triangles_under_headlight": MIRROR_X, "triangles_headlight": MIRROR_X}
+    headlight_radius = 0.12  # taille d'un phare (niveau de détail de la paire)
+
+    def __init__(self, spec=None, cache=None):
+        # pièces mémoïsées par spec (build_car) ; cache explicite → lu / construit ici
+        self.spec = CarSpec() if spec is None else spec
+        parts = build_car(self.spec) if cache is None else _load(self.spec, cache)
+        for name, mesh in parts.items():
+            setattr(self, name, mesh)
+
+    @classmethod
+    def compile(cls, spec):
+        """Construit les pièces d'une spec, sans aucun cache : dict nom → Mesh."""
+        builder = cls.__new__(cls)
+        builder.spec = spec
+        return builder._build()
+
+    def lod_levels(self, name):
+        # [niveau 0, 1, …] d'une pièce tessellée (triangles_wheel, triangles_wheel_lod1…)
+        return [getattr(self, name)] + [getattr(self, "%s_lod%d" % (name, k))
+                                        for k in range(1, len(CYLINDER_LODS))]
+
+    def _build(self):
+        spec = self.spec
+        # 1/2 voiture (droite) + panneaux centraux + jupe sous phares
+        half, win_side, glass_center, under_headlight = (
+            b.build() for b in self._build_body_half())
+
+        # symétries AU BUILD (SYMMETRY), après les normales : la copie hérite des normales
+        # réfléchies (pas de 2e calcul) ; couture soudée là où elles coïncident
+        sym = lambda name, mesh: symmetrize(mesh, Sector.SYMMETRY.get(name))
+        # roues & phares : cylindres lissés (crease), un maillage par niveau de détail
+        lods = {}
+        for k, segments in enumerate(CYLINDER_LODS[1:], 1):
+            lods["triangles_wheel_lod%d" % k] = compute_normals(self._cylinder(
+                (0, 0, 0), spec.wheel_r, spec.wheel_half_w, segments), CREASE_ANGLE)
+            lods["triangles_headlight_lod%d" % k] = sym("triangles_headlight", compute_normals(
+                self._build_headlight(segments), CREASE_ANGLE))
+        return dict({
+            "triangles_body": sym("triangles_body", compute_normals(half)),
+            "triangles_windows": sym("triangles_windows", compute_normals(win_side))
+                                 + compute_normals(glass_center),
+            "triangles_under_headlight": sym("triangles_under_headlight",
+                                             compute_normals(under_headlight)),
+            "triangles_wheel": compute_normals(self._cylinder(
+                (0, 0, 0), spec.wheel_r, spec.wheel_half_w, CYLINDER_LODS[0]), CREASE_ANGLE),
+            "triangles_headlight": sym("triangles_headlight", compute_normals(
+                self._build_headlight(CYLINDER_LODS[0]), CREASE_ANGLE)),
+        }, **lods)
+
+    def _build_body_half(self):
+        spec = self.spec
+        body_half = MeshBuilder()
+        windows_side = MeshBuilder()
+        glass_center = MeshBuilder()  # pare-brise + lunette
+        under_headlight = MeshBuilder()  # jupe sous phares (séparée pour couleur)
+
+        x0, x1 = 0.0, spec.half_w
+        z_mid_front = spec.half_len - spec.nose_len
+        z_mid_back = -spec.half_len + spec.trunk_len
+
+        V = lambda x, y, z: Vertex(x, y, z)
+        EPS = 0.002
+
+        # 1) Bas de caisse central (demi, ouvert sur x=0)
+        body_half += self._cuboid_half_open_x0(
+            (x0, spec.base_y0, z_mid_back),
+            (x1, spec.base_y1, z_mid_front)
+        )
+
+        # 2) Cloison avant à z = z_mid_front (normale vers -Z)
+        Sector._add_quad(
+            body_half,
+            V(x1, spec.base_y0, z_mid_front + EPS),
+            V(x0, spec.base_y0, z_mid_front + EPS),
+            V(x0, spec.base_y1, z_mid_front + EPS),
+            V(x1, spec.base_y1, z_mid_front + EPS)
+        )
+
+        # 3) Plancher sous capot (horizontal) z_mid_front → half_len (normale -Y)
+        floor_y = spec.base_y0 + 0.01
+        Sector._add_quad(
+            body_half,
+            V(x0, floor_y, spec.half_len - EPS),
+            V(x1, floor_y, spec.half_len - EPS),
+            V(x1, floor_y, z_mid_front + EPS),
+            V(x0, floor_y, z_mid_front + EPS)
+        )
+
+        # 4) Jupe sous phares (fermeture inférieure du nez) — stockée séparément
+        BUMPER_LIP = 0.12
+        BUMPER_TAPER = 0.18
+        yb = spec.base_y0 + EPS
+        yt0 = spec.base_y1 - BUMPER_LIP
+        yt1 = spec.base_y1 - spec.hood_drop - BUMPER_TAPER
+        tmp = MeshBuilder()
+        self._wedge_half_open_x0(tmp, x0, x1, z_mid_front, spec.half_len, yb, yt0, yt1)
+        # On ne l’ajoute qu’à under_headlight, pas au body_half
+        under_headlight += tmp
+
+        # 5) Capot avant (pente supérieure)
+        self._wedge_half_open_x0(
+            body_half, x0, x1, z_mid_front, spec.half_len,
+            spec.base_y0, spec.base_y1, spec.base_y1 - spec.hood_drop
+        )
+
+        # 6) Malle arrière
+        self._wedge_half_open_x0(
+            body_half, x0, x1, -spec.half_len, z_mid_back,
+            spec.base_y0, spec.base_y1 - spec.trunk_drop, spec.base_y1
+        )
+
+        # 7) Pavillon (moitié droite) — ALIGNE EN X AVEC LA CAISSE
+        #    → x1 = half_w (au lieu de roof_w) + bas collé à base_y1
+        roof_z0 = -spec.roof_l + spec.roof_shift - 0.25
+        roof_z1 = spec.roof_l + spec.roof_shift - 0.25
+        body_half += self._cuboid_half_open_x0(
+            (0.0, spec.base_y1, roof_z0),  # bas du pavillon collé à la caisse
+            (spec.half_w, spec.roof_y1, roof_z1)  # demi-largeur = même que la caisse
+        )
+
+        # 8) Vitres latérales (droite) — deux vitres séparées par un montant (B-pillar)
+        inset = 0.05
+        yb_w, yt_w = spec.base_y1 + 0.05, spec.roof_y1 - 0.06
+        xg = spec.half_w + inset
+
+        # positions le long de Z
+        pillar_w = 0.08                                    # largeur du montant central
+        midZ = (roof_z0 + roof_z1) * 0.5
+        zA = roof_z0 + 0.20                             # début vitre avant
+        zB = midZ - pillar_w * 0.9                         # fin vitre avant
+        zC = midZ + pillar_w * 0.9                         # début vitre arrière
+        zD = roof_z1 - 0.20                              # fin vitre arrière
+
+        # vitre avant (plan x = half_w + inset)
+        windows_side.add_tri(V(xg, yb_w, zA), V(xg, yb_w, zB), V(xg, yt_w, zB))
+        windows_side.add_tri(V(xg, yb_w, zA), V(xg, yt_w, zB), V(xg, yt_w, zA))
+        # vitre arrière
+        windows_side.add_tri(V(xg, yb_w, zC), V(xg, yb_w, zD), V(xg, yt_w, zD))
+        windows_side.add_tri(V(xg, yb_w, zC), V(xg, yt_w, zD), V(xg, yt_w, zC))
+
+        # 9) Pare-brise + lunette (panneaux centraux) — insets plus grands pour éviter le Z-fighting
+        # 9) Pare-brise + lunette (panneaux centraux)
+        #    Même technique que les vitres latérales : 2 triangles coplanaires
+        #    sur un plan vertical à z constant (plus d'inclinaison → plus d'espace).
+        inset_front = 0.001   # pousse très légèrement vers +Z (évite Z-fighting)
+        inset_back  = -0.001  # pousse très légèrement vers −Z
+        y_bottom_ws = spec.base_y1 + 0.02
+        y_top_ws    = spec.roof_y1 - 0.02
+
+        zf = z_mid_front + inset_front
+        zb = z_mid_back  + inset_back
+        pb_half_width = spec.half_w * 0.7
+        # Pare-brise avant (plan z = zf)
+        glass_center.add_tri(V(-pb_half_width, y_bottom_ws, zf+0.05),
+                             V( pb_half_width, y_bottom_ws, zf+0.05),
+                             V( pb_half_width, y_top_ws,    zf+0.05))
+        glass_center.add_tri(V(-pb_half_width, y_bottom_ws, zf+0.05),
+                             V( pb_half_width, y_top_ws,    zf+0.05),
+                             V(-pb_half_width, y_top_ws,    zf+0.05))
+
+        # Lunette arrière (plan z = zb)
+        glass_center.add_tri(V( pb_half_width, y_bottom_ws, zb),
+                             V(-pb_half_width, y_bottom_ws, zb),
+                             V(-pb_half_width, y_top_ws,    zb))
+        glass_center.add_tri(V( pb_half_width, y_bottom_ws, zb),
+                             V(-pb_half_width, y_top_ws,    zb),
+                             V( pb_half_width, y_top_ws,    zb))
+
+        return body_half, windows_side, glass_center, under_headlight
+
+
+
+    def _build_headlight(self, segments=24):
+        spec = self.spec
+        r = self.headlight_radius; half_t = 0.03
+        cx = spec.half_w - 0.28
+        cy = spec.base_y1 - 0.60
+        cz = spec.half_len + 0.02
+        return self._cylinder((cx, cy, cz), r, half_t, segments=segments)
+
+
+# ───────────────────────────────────────────────
+# CONSTRUCTION : mémoïsée par spec, ou par lots dans un pool de processus
+# ───────────────────────────────────────────────
+def _load(spec, cache):
+    # spec par défaut → entrée historique "ex3_sector" ; variantes → une entrée chacune
+    name = "ex3_sector" if spec == CarSpec() else "ex3_sector-" + spec.digest()
+    return cache.get_or_build(name, lambda: Sector.compile(spec), params=spec.params(),
+                              code=[__file__])
+
+
+@functools.lru_cache(maxsize=SPEC_CACHE_SIZE)
+def build_car(spec):
+    """dict nom → Mesh de la voiture `spec` (pièces partagées : ne pas les modifier)."""
+    return _load(spec, default_cache())
+
+
+def _compile_arrays(specs):
+    # côté worker : tableaux bruts seulement (pas d'objets Mesh à sérialiser)
+    out = []
+    for spec in specs:
+        parts = Sector.compile(spec)
+        out.append({name: (m.positions, m.uvs, m.normals, m.indices)
+                    for name, m in parts.items()})
+    return out
+
+
+class VariantBatch:
+    """N variantes rangées dans des tableaux contigus :
+    positions / normals (V,3) float32, uvs (V,2) float32, indices (I,3) uint32 (locaux
+    à chaque pièce), ranges (N, pièces, 4) = (v0, v1, i0, i1) de chaque pièce de chaque
+    variante. Les variantes de même spec partagent les mêmes plages (rangées une fois)."""
+
+    def __init__(self, specs, part_names, positions, uvs, normals, indices, ranges):
+        self.specs = list(specs)
+        self.part_names = list(part_names)
+        self.positions, self.uvs, self.normals = positions, uvs, normals
+        self.indices = indices
+        self.ranges = ranges
+
+    def __len__(self):
+        return len(self.specs)
+
+    @property
+    def nbytes(self):
+        return (self.positions.nbytes + self.uvs.nbytes + self.normals.nbytes
+                + self.indices.nbytes + self.ranges.nbytes)
+
+    def mesh(self, i, part):
+        """Mesh (vues, sans copie) de la pièce `part` de la variante i."""
+        v0, v1, i0, i1 = self.ranges[i, self.part_names.index(part)]
+        return Mesh(self.positions[v0:v1], self.uvs[v0:v1], self.indices[i0:i1],
+                    self.normals[v0:v1])
+
+    def parts(self, i):
+        return {name: self.mesh(i, name) for name in self.part_names}
+
+
+def build_variants(specs, processes=None, chunk=BATCH_CHUNK):
+    """Construit les variantes `specs` (doublons construits une fois) → VariantBatch.
+    processes : taille du pool (défaut : nombre de CPU) ; 1 → dans ce processus."""
+    specs = list(specs)
+    unique = list(dict.fromkeys(specs))
+    tasks = [unique[k:k + chunk] for k in range(0, len(unique), chunk)]
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or len(tasks) <= 1:
+        results = [_compile_arrays(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(min(processes, len(tasks))) as pool:
+            results = list(pool.map(_compile_arrays, tasks))
+    built = dict(zip(unique, (r for rs in results for r in rs)))
+    if not specs:
+        return VariantBatch([], [], np.zeros((0, 3), np.float32), np.zeros((0, 2), np.float32),
+                            np.zeros((0, 3), np.float32), np.zeros((0, 3), np.uint32),
+                            np.zeros((0, 0, 4), np.int64))
+
+    names = list(built[specs[0]])
+    # une spec distincte = un jeu de tableaux ; ses doublons pointent sur les mêmes plages
+    table = np.zeros((len(unique), len(names), 4), dtype=np.int64)
+    pos, uvs, nrm, idx = [], [], [], []
+    v = i = 0
+    for u, spec in enumerate(unique):
+        arrays = built[spec]
+        for p, name in enumerate(names):
+            positions, uv, normals, indices = arrays[name]
+            table[u, p] = (v, v + len(positions), i, i + len(indices))
+            v, i = v + len(positions), i + len(indices)
+            pos.append(positions)
+            uvs.append(uv)
+            nrm.append(normals)
+            idx.append(indices)
+    slot = {spec: u for u, spec in enumerate(unique)}
+    ranges = table[[slot[spec] for spec in specs]]
+    return VariantBatch(specs, names, np.concatenate(pos), np.concatenate(uvs),
+                        np.concatenate(nrm), np.concatenate(idx), ranges)
@@ -1,67 +1,43 @@
 from OpenGL.GL import *
 from OpenGL.GLU import *
 
-def draw_car(wireframe=False, show_lights=True):
-    glPushMatrix()
-    draw_chassis()
-    draw_windows()
-    draw_doors()
-
-    # --- PNEU de référence : on le dessine une seule fois ---
-    # Position de base (équivalent à +X, +Z dans ton ancien repère)
-    glPushMatrix()
-    draw_wheel(0.8, 0.6)
-    glPopMatrix()
+from glstate import StateCache
 
-    # Miroir X -> (-X, +Z)  => 1 axe négatif => inverser winding
-    glPushMatrix()
-    glScalef(-1, 1, 1)
-    glFrontFace(GL_CW)
-    draw_wheel(0.8, 0.6)
-    glFrontFace(GL_CCW)
-    glPopMatrix()
+# instances miroir : (glScalef, nombre d'axes négatifs impair → winding inversé)
+MIRROR_X = (-1, 1, 1)
+MIRROR_Z = (1, 1, -1)
+MIRROR_XZ = (-1, 1, -1)
 
-    # Miroir Z -> (+X, -Z)  => 1 axe négatif => inverser winding
-    glPushMatrix()
-    glScalef(1, 1, -1)
-    glFrontFace(GL_CW)
-    draw_wheel(0.8, 0.6)
-    glFrontFace(GL_CCW)
-    glPopMatrix()
 
-    # Miroir X et Z -> (-X, -Z)  => 2 axes négatifs (pair) => winding conservé
-    glPushMatrix()
-    glScalef(-1, 1, -1)
-    # pas besoin de glFrontFace ici
-    draw_wheel(0.8, 0.6)
-    glPopMatrix()
+def _mirrored(scale):
+    return (scale[0] * scale[1] * scale[2]) < 0
 
-    # --- PHARE de référence (droite, +X) ---
-    draw_headlight(0.5)
 
-    # Miroir X pour le phare gauche (-X) => 1 axe négatif => inverser winding
+def draw_car(wireframe=False, show_lights=True, state=None):
+    # state : glstate.StateCache partagé avec le renderer (sinon cache local)
+    state = state or StateCache()
     glPushMatrix()
-    glScalef(-1, 1, 1)
-    glFrontFace(GL_CW)
-    draw_headlight(0.5)
-    glFrontFace(GL_CCW)
-    glPopMatrix()
+    draw_chassis()
+    draw_windows()
+    draw_doors(state)
 
-    # --- SPHÈRES de lumière (debug), même logique ---
+    # draws (fonction, arg, échelle) triés par winding : un seul glFrontFace(GL_CW)
+    # pour tout le groupe miroir au lieu d'une paire CW/CCW autour de chaque pièce
+    draws = [(draw_wheel, (0.8, 0.6), None), (draw_wheel, (0.8, 0.6), MIRROR_X),
+             (draw_wheel, (0.8, 0.6), MIRROR_Z), (draw_wheel, (0.8, 0.6), MIRROR_XZ),
+             (draw_headlight, (0.5,), None), (draw_headlight, (0.5,), MIRROR_X)]
     if show_lights:
-        glPushAttrib(GL_LIGHTING_BIT)
-        glMaterialfv(GL_FRONT, GL_EMISSION, [1, 1, 0, 1])
-        # droite (+X)
-        draw_light_sphere(0.5)
-        # gauche (miroir X)
+        draws += [(draw_light_sphere, (0.5,), None), (draw_light_sphere, (0.5,), MIRROR_X)]
+    draws.sort(key=lambda d: d[2] is not None and _mirrored(d[2]))
+
+    for fn, args, scale in draws:
+        state.front_face(GL_CW if scale is not None and _mirrored(scale) else GL_CCW)
         glPushMatrix()
-        glScalef(-1, 1, 1)
-        glFrontFace(GL_CW)
-        draw_light_sphere(0.5)
-        glFrontFace(GL_CCW)
+        if scale is not None:
+            glScalef(*scale)
+        fn(*args)
         glPopMatrix()
-        glMaterialfv(GL_FRONT, GL_EMISSION, [0, 0, 0, 1])
-        glPopAttrib()
+    state.front_face(GL_CCW)
 
     glPopMatrix()
 
@@ -84,14 +60,14 @@ def draw_windows():
     glVertex3f(-0.3, 0.0, 0.51)
     glEnd()
 
-def draw_doors():
-    glDisable(GL_LIGHTING)
+def draw_doors(state):
+    state.disable(GL_LIGHTING)
     glColor3f(1,1,1)
     glBegin(GL_LINES)
     glVertex3f(0, -0.3, 0.51)
     glVertex3f(0, 0.3, 0.51)
     glEnd()
-    glEnable(GL_LIGHTING)
+    state.enable(GL_LIGHTING)
 
 def draw_wheel(x, z):
     glPushMatrix()
@@ -1,41 +1,112 @@
-from OpenGL.GL import *
+# trackball.py – Trackball à quaternion : rotation accumulée sans allocation
+# Python 3.x  +  PyOpenGL  +  NumPy
+#
+# drag(x, y) ne fait que noter la dernière position (deux affectations) : une souris à
+# 1000 Hz ne coûte pas plus de calcul qu'une souris à 60 Hz. update(), appelé UNE fois
+# par frame rendue, fusionne tous les déplacements reçus depuis la frame précédente en
+# UN arc sur la sphère (point intégré → dernière position), l'accumule dans le
+# quaternion, puis remplit la matrice 4×4 (tampon préalloué, colonne-majeur).
+#   op()     → rotation pour le graphe de scène (scene.quaternion), même tuple entre deux
+#              rotations → la matrice de la caméra n'est recomposée que si elle a tourné
+#   apply()  → glMultMatrixf du tampon (rendu immédiat)
+# Viewport : resize(w, h), appelé par reshape.
+import math
+
 import numpy as np
+from OpenGL.GL import *
+
+from scene import quaternion
+
 
 class Trackball:
-    def __init__(self):
-        self.prev = None
-        self.rot = np.identity(4)
+    def __init__(self, width=800, height=600):
+        self.win_w, self.win_h = width, height
+        self.quat = np.array([0.0, 0.0, 0.0, 1.0])      # (x, y, z, w) rotation accumulée
+        self.matrix = np.identity(4, dtype=np.float32)  # colonne-majeur (glMultMatrixf)
+        self._flat = self.matrix.reshape(16)            # vue : remplie élément par élément
+        self._op = quaternion(0.0, 0.0, 0.0, 1.0)
+        self.prev = None   # dernier point intégré (pixels) ; None → prochain drag = ancre
+        self._last = None  # dernière position reçue, pas encore intégrée
+        self.events = 0    # drag() reçus
+        self.updates = 0   # update() qui ont fait tourner la sphère
+
+    def resize(self, width, height):
+        self.win_w, self.win_h = width, max(height, 1)
 
     def _project(self, x, y):
-        x = 2.0 * x / 800 - 1
-        y = 1 - 2.0 * y / 600
-        z2 = 1.0 - x*x - y*y
-        z = np.sqrt(z2) if z2 > 0 else 0.0
-        return np.array([x, y, z])
+        # pixels → point de la sphère unité ; hors sphère → ramené sur l'équateur
+        x = 2.0 * x / self.win_w - 1.0
+        y = 1.0 - 2.0 * y / self.win_h
+        d2 = x * x + y * y
+        if d2 < 1.0:
+            return x, y, math.sqrt(1.0 - d2)
+        d = math.sqrt(d2)
+        return x / d, y / d, 0.0
+
+    # ---------- événements (aucun calcul) --------------------------------------------
+    def begin(self, x, y):
+        self.prev, self._last = (x, y), None
+
+    def end(self):
+        # relâchement : le reste du drag est intégré tout de suite, puis plus d'ancre
+        if self._last is not None:
+            self.update()
+        self.prev = None
 
     def drag(self, x, y):
-        curr = self._project(x, y)
+        self.events += 1
         if self.prev is None:
-            self.prev = curr
-            return
-        axis = np.cross(self.prev, curr)
-        angle = np.arccos(np.clip(np.dot(self.prev, curr), -1, 1))
-        self.prev = curr
-        self.rot = np.dot(self.rotation_matrix(axis, np.degrees(angle)), self.rot)
+            self.prev = (x, y)
+        else:
+            self._last = (x, y)
+
+    # ---------- une fois par frame -----------------------------------------------------
+    def update(self):
+        """Intègre les déplacements en attente ; True si la rotation a changé."""
+        last, prev = self._last, self.prev
+        self._last = None
+        if last is None or last == prev:
+            return False
+        self.prev = last
+        px, py, pz = self._project(*prev)
+        cx, cy, cz = self._project(*last)
+        # arc prev → last (angle θ entre les deux) : quaternion (p×c, 1 + p·c) normalisé
+        ax, ay, az = py * cz - pz * cy, pz * cx - px * cz, px * cy - py * cx
+        aw = 1.0 + px * cx + py * cy + pz * cz
+        n = math.sqrt(ax * ax + ay * ay + az * az + aw * aw)
+        if n < 1e-12:  # points diamétralement opposés : axe indéfini
+            return False
+        self._premultiply(ax / n, ay / n, az / n, aw / n)
+        self.updates += 1
+        return True
+
+    def rotate(self, angle, x, y, z):
+        # rotation écran (degrés, comme glRotatef) ajoutée après la rotation courante
+        n = math.sqrt(x * x + y * y + z * z)
+        s = math.sin(math.radians(angle) / 2.0) / n
+        self._premultiply(x * s, y * s, z * s, math.cos(math.radians(angle) / 2.0))
+
+    def _premultiply(self, ax, ay, az, aw):
+        # q ← a·q, renormalisé (la dérive s'accumulerait sur des milliers de drags)
+        q = self.quat
+        qx, qy, qz, qw = float(q[0]), float(q[1]), float(q[2]), float(q[3])
+        x = aw * qx + ax * qw + ay * qz - az * qy
+        y = aw * qy - ax * qz + ay * qw + az * qx
+        z = aw * qz + ax * qy - ay * qx + az * qw
+        w = aw * qw - ax * qx - ay * qy - az * qz
+        n = math.sqrt(x * x + y * y + z * z + w * w)
+        x, y, z, w = x / n, y / n, z / n, w / n
+        q[0], q[1], q[2], q[3] = x, y, z, w
+        self._op = quaternion(x, y, z, w)
+        # matrice de rotation, stockée colonne par colonne
+        m = self._flat
+        m[0], m[1], m[2] = 1 - 2 * (y * y + z * z), 2 * (x * y + z * w), 2 * (x * z - y * w)
+        m[4], m[5], m[6] = 2 * (x * y - z * w), 1 - 2 * (x * x + z * z), 2 * (y * z + x * w)
+        m[8], m[9], m[10] = 2 * (x * z + y * w), 2 * (y * z - x * w), 1 - 2 * (x * x + y * y)
+
+    # ---------- rendu ------------------------------------------------------------------
+    def op(self):
+        return self._op
 
     def apply(self):
-        glMultMatrixf(self.rot.T)
-
-    def rotation_matrix(self, axis, angle):
-        axis = axis / np.linalg.norm(axis)
-        a = np.radians(angle)
-        c = np.cos(a)
-        s = np.sin(a)
-        x, y, z = axis
-        R = np.array([
-            [c + x*x*(1-c), x*y*(1-c) - z*s, x*z*(1-c) + y*s, 0],
-            [y*x*(1-c) + z*s, c + y*y*(1-c), y*z*(1-c) - x*s, 0],
-            [z*x*(1-c) - y*s, z*y*(1-c) + x*s, c + z*z*(1-c), 0],
-            [0, 0, 0, 1]
-        ], dtype=np.float32)
-        return R
+        glMultMatrixf(self.matrix)
@@ -1,78 +1,71 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+import glbackend  # GL_BACKEND=record|trace : rendu sans écran / comptage des appels
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
-from PIL import Image
-import numpy as np
-import sys
-
-class Vertex:
-    def __init__(self, x, y, z, u, v):
-        self.x, self.y, self.z = x, y, z
-        self.u, self.v = u, v
-
-class Triangle:
-    def __init__(self, vertices):
-        self.vertices = vertices
+from gpu import GpuMesh, vbo_supported
+from scheduler import FrameScheduler
+from mesh_cache import load_model
+from textures import default_manager
+from glstate import StateCache
+from mesh import Mesh
+from bounds import BVH, CullStats, Frustum, perspective
+from scene import compose, translate, rotate
+from simloop import FixedStep
+
+TEXTURE_FILE = "Mud.bmp"
+TEXTURE_SIZE = None  # taille du fichier, ramenée à une puissance de 2 (TEXTURE_POT)
+TEXTURE_POT = True  # GL 1.x d'origine : textures non puissance de 2 refusées
+FILTER_MODES = ("nearest", "linear", "mipmap")  # une seule image GPU, filtre au bind
+BVH_LEAF_SIZE = 4  # triangles par feuille : 1 test de frustum couvre une feuille entière
+SPIN_SPEED = 30.0  # degrés / s (ex-0.5° par frame à 60 FPS), indépendant de la cadence
 
 class Sector:
     def __init__(self, filename):
-        self.triangles = self.load_world_file(filename)
+        world = self.load_world_file(filename)
+        # BVH sur les boîtes des triangles ; indices réordonnés feuille par feuille
+        # → les feuilles visibles sont des plages contiguës de l'IBO
+        corners = world.triangle_positions()
+        self.bvh = BVH(corners.min(axis=1), corners.max(axis=1), BVH_LEAF_SIZE)
+        self.triangles = Mesh(world.positions, world.uvs, world.indices[self.bvh.order],
+                              world.normals)
 
     @staticmethod
     def load_world_file(filename):
-        triangles = []
         try:
-            with open(filename, "r") as f:
-                lines = [line.strip() for line in f if line.strip() and not line.startswith("/")]
-                num = int(lines[0].split()[1])
-                for i in range(num):
-                    v0 = Vertex(*map(float, lines[i * 3 + 1].split()))
-                    v1 = Vertex(*map(float, lines[i * 3 + 2].split()))
-                    v2 = Vertex(*map(float, lines[i * 3 + 3].split()))
-                    triangles.append(Triangle([v0, v1, v2]))
+            # 1er lancement : lecture en flux + soudure ; ensuite relu du cache disque (mmap)
+            return load_model(filename)["world"]
         except FileNotFoundError:
             print(f"Error: {filename} not found.")
             sys.exit(1)
-        return triangles
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
 class Renderer:
     def __init__(self):
-        self.sector = Sector("world.txt")
-        self.texture_ids = glGenTextures(3)
+        self.sector = Sector("World.txt")
+        # rotation continue : pas de ralenti basse conso (vitesse juste, mais saccadée)
+        self.scheduler = FrameScheduler(self.render, low_power=False)
+        self.use_vbo = True  # False → ancien mode immédiat
+        self.gpu = None
+        self.texture = None
+        self.state = StateCache()  # bind de texture évité s'il ne change rien
         self.filter_mode = 0
-        self.angle = 0.0
+        self.angle = self.prev_angle = 0.0  # état des deux derniers pas fixes
+        self.clock = FixedStep()
+        self.projection = None  # matrice de gluPerspective (reshape) → frustum
+        self.cull_stats = CullStats()
 
     def load_texture(self, image_path):
         try:
-            image = Image.open(image_path)
+            # décodage lancé par prefetch() avant l'ouverture de la fenêtre ; ici : upload
+            self.texture = default_manager().get(image_path, TEXTURE_SIZE, pot=TEXTURE_POT)
         except FileNotFoundError:
             print(f"Error: texture file '{image_path}' not found.")
             sys.exit(1)
 
-        # Force resize to 256x256 if needed (safe for legacy OpenGL)
-        image = image.resize((256, 256))
-        image = image.transpose(Image.FLIP_TOP_BOTTOM)
-        img_data = np.array(image.convert("RGB"), dtype=np.uint8)
-        w, h = image.size
-
-        # NEAREST
-        glBindTexture(GL_TEXTURE_2D, self.texture_ids[0])
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-
-        # LINEAR
-        glBindTexture(GL_TEXTURE_2D, self.texture_ids[1])
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-
-        # MIPMAP
-        glBindTexture(GL_TEXTURE_2D, self.texture_ids[2])
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_NEAREST)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        gluBuild2DMipmaps(GL_TEXTURE_2D, GL_RGB, w, h, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-
     def init_gl(self):
         glEnable(GL_TEXTURE_2D)
         glShadeModel(GL_SMOOTH)
@@ -81,24 +74,47 @@ class Renderer:
         glEnable(GL_DEPTH_TEST)
         glDepthFunc(GL_LEQUAL)
         glHint(GL_PERSPECTIVE_CORRECTION_HINT, GL_NICEST)
-        self.load_texture("mud.bmp")
+        self.load_texture(TEXTURE_FILE)
+        if self.use_vbo and vbo_supported():
+            self.gpu = GpuMesh(self.sector.triangles, textured=True)
+
+    def update(self):
+        # simulation à pas fixe ; angle affiché interpolé entre les deux derniers pas
+        clock = self.clock
+        for _ in range(clock.advance()):
+            self.prev_angle = self.angle
+            self.angle = (self.angle + SPIN_SPEED * clock.dt) % 360.0
+        delta = (self.angle - self.prev_angle + 180.0) % 360.0 - 180.0  # passage 360 → 0
+        return self.prev_angle + delta * clock.alpha
 
     def render(self):
+        angle = self.update()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
         glTranslatef(0.0, 0.0, -5.0)
-        glRotatef(self.angle, 0.0, 1.0, 0.0)
-        glBindTexture(GL_TEXTURE_2D, self.texture_ids[self.filter_mode])
-
-        for tri in self.sector.triangles:
-            glBegin(GL_TRIANGLES)
-            for v in tri.vertices:
-                glTexCoord2f(v.u, v.v)
-                glVertex3f(v.x, v.y, v.z)
-            glEnd()
+        glRotatef(angle, 0.0, 1.0, 0.0)
+        self.texture.bind(FILTER_MODES[self.filter_mode], self.state)
+
+        tris = self.sector.triangles
+        spans = [(0, len(tris))]
+        if self.projection is not None:
+            view = compose((translate(0.0, 0.0, -5.0), rotate(angle, 0.0, 1.0, 0.0)))
+            spans = self.sector.bvh.visible_ranges(Frustum(self.projection @ view),
+                                                   self.cull_stats).tolist()
+        if self.use_vbo and self.gpu:
+            self.gpu.draw_spans(spans)
+        else:
+            for t0, t1 in spans:
+                for t in range(t0, t1):
+                    glBegin(GL_TRIANGLES)
+                    for v in tris[t].vertices:
+                        glTexCoord2f(v.u, v.v)
+                        glVertex3f(v.x, v.y, v.z)
+                    glEnd()
 
         glutSwapBuffers()
-        self.angle += 0.5
+        self.state.end_frame()
+        self.cull_stats.end_frame()
 
 def reshape(w, h):
     h = max(h, 1)
@@ -106,15 +122,13 @@ def reshape(w, h):
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
     gluPerspective(80.0, w / h, 0.1, 100.0)
+    app.projection = perspective(80.0, w / h, 0.1, 100.0)  # même matrice, côté CPU
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
 
-def timer(value):
-    glutPostRedisplay()
-    glutTimerFunc(16, timer, 0)
-
 def main():
     global app
+    default_manager().prefetch(TEXTURE_FILE, TEXTURE_SIZE, pot=TEXTURE_POT)
     glutInit(sys.argv)
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
     glutInitWindowSize(800, 600)
@@ -123,9 +137,9 @@ def main():
     app = Renderer()
     app.init_gl()
 
-    glutDisplayFunc(app.render)
     glutReshapeFunc(reshape)
-    glutTimerFunc(0, timer, 0)
+    app.scheduler.set_animating(True)  # rotation continue, cadencée par le plafond FPS
+    app.scheduler.install()
     glutMainLoop()
 
 if __name__ == "__main__":
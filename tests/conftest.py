@@ -0,0 +1,6 @@
+# conftest.py – Rend les modules partagés (common/) importables par les tests
+# Python 3.x  +  pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
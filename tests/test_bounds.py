@@ -0,0 +1,73 @@
+# test_bounds.py – Frustum, BVH : culling hiérarchique et plages visibles
+# Python 3.x  +  NumPy  +  pytest
+import numpy as np
+import pytest
+
+from bounds import BVH, INSIDE, INTERSECT, OUTSIDE, Bounds, CullStats, Frustum
+
+# clip = identité → frustum = cube [-1, 1]³ : on sait tout calculer à la main
+CUBE = Frustum(np.eye(4))
+
+
+def boxes(n, seed=0, spread=3.0):
+    rng = np.random.default_rng(seed)
+    lo = rng.uniform(-spread, spread, (n, 3))
+    return lo, lo + rng.uniform(0.01, 0.5, (n, 3))
+
+
+def brute_force(lo, hi):
+    # une boîte est visible si elle touche le cube sur les 3 axes
+    return ((hi >= -1) & (lo <= 1)).all(axis=1)
+
+
+def test_classify():
+    assert CUBE.classify(Bounds([-0.5] * 3, [0.5] * 3)) == INSIDE
+    assert CUBE.classify(Bounds([0.5] * 3, [1.5] * 3)) == INTERSECT
+    assert CUBE.classify(Bounds([2.0] * 3, [3.0] * 3)) == OUTSIDE
+
+
+@pytest.mark.parametrize("n, leaf_size", [(1, 4), (7, 1), (200, 4), (1000, 8)])
+def test_cull_matches_brute_force(n, leaf_size):
+    lo, hi = boxes(n)
+    bvh = BVH(lo, hi, leaf_size)
+    assert sorted(bvh.order.tolist()) == list(range(n))
+    np.testing.assert_array_equal(bvh.cull(CUBE), brute_force(lo, hi))
+
+
+def test_visible_ranges():
+    lo, hi = boxes(500, seed=1)
+    bvh = BVH(lo, hi)
+    ranges = bvh.visible_ranges(CUBE)
+    assert (ranges[:, 0] < ranges[:, 1]).all()
+    assert (ranges[1:, 0] > ranges[:-1, 1]).all()  # triées, disjointes et fusionnées
+    items = np.concatenate([bvh.order[s:e] for s, e in ranges])
+    assert sorted(items.tolist()) == np.flatnonzero(brute_force(lo, hi)).tolist()
+
+
+def test_visible_ranges_all_and_none():
+    lo, hi = boxes(50, spread=0.4)
+    bvh = BVH(lo, hi)
+    np.testing.assert_array_equal(bvh.visible_ranges(CUBE), [[0, 50]])
+    bvh = BVH(lo + 10, hi + 10)
+    assert bvh.visible_ranges(CUBE).shape == (0, 2)
+    assert BVH(np.zeros((0, 3)), np.zeros((0, 3))).visible_ranges(CUBE).shape == (0, 2)
+
+
+def test_refit_moved_items():
+    lo, hi = boxes(300, seed=2)
+    bvh = BVH(lo, hi)
+    moved = np.arange(0, 300, 7)
+    lo[moved] += 5.0
+    hi[moved] += 5.0
+    bvh.refit(moved, lo[moved], hi[moved])
+    np.testing.assert_array_equal(bvh.cull(CUBE), brute_force(lo, hi))
+    np.testing.assert_allclose(bvh.lo[0], lo.min(axis=0))
+    np.testing.assert_allclose(bvh.hi[0], hi.max(axis=0))
+
+
+def test_cull_stats():
+    lo, hi = boxes(200, seed=3)
+    stats = CullStats()
+    visible = BVH(lo, hi).cull(CUBE, stats)
+    assert stats.drawn == visible.sum() and stats.drawn + stats.culled == 200
+    assert stats.tested > 0
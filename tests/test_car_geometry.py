@@ -0,0 +1,41 @@
+# test_car_geometry.py – Variantes de voiture : specs distinctes rangées une seule fois
+# Python 3.x  +  NumPy  +  pytest
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                "ex3_opengl_car_viewer"))
+
+from car_geometry import CarSpec, Sector, build_variants  # noqa: E402
+
+
+def test_build_variants_packs_duplicates_once():
+    a, b = CarSpec(), CarSpec(half_len=2.3)
+    batch = build_variants([a, b, a, a, b], processes=1)
+    one = build_variants([a], processes=1)
+    two = build_variants([a, b], processes=1)
+    assert len(batch) == 5
+    assert batch.positions.shape == two.positions.shape  # 2 specs distinctes rangées
+    assert batch.indices.shape == two.indices.shape
+    np.testing.assert_array_equal(batch.ranges[[2, 3]], batch.ranges[[0, 0]])
+    np.testing.assert_array_equal(batch.ranges[4], batch.ranges[1])
+    assert len(batch.positions) == len(batch.uvs) == len(batch.normals)
+    assert len(one.positions) < len(two.positions)
+
+
+def test_variant_meshes_match_compile():
+    spec = CarSpec(roof_w=0.7)
+    batch = build_variants([spec, spec], processes=1)
+    for name, mesh in Sector.compile(spec).items():
+        got = batch.mesh(1, name)
+        np.testing.assert_array_equal(got.positions, mesh.positions)
+        np.testing.assert_array_equal(got.uvs, mesh.uvs)
+        np.testing.assert_array_equal(got.normals, mesh.normals)
+        np.testing.assert_array_equal(got.indices, mesh.indices)
+
+
+def test_build_variants_empty():
+    batch = build_variants([], processes=1)
+    assert len(batch) == 0 and batch.uvs.shape == (0, 2)
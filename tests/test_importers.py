@@ -0,0 +1,168 @@
+# test_importers.py – OBJ / STL / PLY binaires sur de petits fichiers écrits à la main
+# Python 3.x  +  NumPy  +  pytest
+import struct
+
+import numpy as np
+import pytest
+
+from importers import load_obj, load_ply, load_stl
+
+SQUARE = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def corners(mesh):
+    # triangles en positions : indépendant de la soudure et de la numérotation
+    return mesh.positions[mesh.indices].tolist()
+
+
+def fan(points, *polygons):
+    return [[list(points[p[0]]), list(points[p[k]]), list(points[p[k + 1]])]
+            for p in polygons for k in range(1, len(p) - 1)]
+
+
+# ───────────────────────────────────────────────
+# OBJ
+# ───────────────────────────────────────────────
+# carré puis triangle : indices négatifs, v//n, normale d'indice -1
+OBJ = b"""v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+vn 0 0 1
+f -4//1 -3//1 -2//1 -1//1
+v 2 0 0
+f 2//1 5//-1 3//-1
+"""
+
+
+@pytest.mark.parametrize("chunk_bytes", [1 << 22, 8])
+def test_obj_negative_indices_and_normals(tmp_path, chunk_bytes):
+    parts = load_obj(write(tmp_path, "a.obj", OBJ), chunk_bytes)
+    assert list(parts) == ["default"]
+    mesh = parts["default"]
+    points = SQUARE + [(2, 0, 0)]
+    assert corners(mesh) == fan(points, (0, 1, 2, 3), (1, 4, 2))
+    np.testing.assert_array_equal(mesh.normals, np.tile([0, 0, 1], (mesh.vertex_count, 1)))
+    assert mesh.vertex_count == 5  # coins partagés soudés
+
+
+def test_obj_uvs_materials_and_plain_faces(tmp_path):
+    data = b"""v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+vt 0 0
+vt 1 0
+vt 1 1
+usemtl red
+f 1/1 2/2 3/3
+usemtl blue
+f 1 3 4
+"""
+    parts = load_obj(write(tmp_path, "b.obj", data))
+    assert sorted(parts) == ["blue", "red"]
+    red, blue = parts["red"], parts["blue"]
+    assert corners(red) == fan(SQUARE, (0, 1, 2))
+    assert red.uvs[red.indices].tolist() == [[[0, 0], [1, 0], [1, 1]]]
+    assert corners(blue) == fan(SQUARE, (0, 2, 3))
+    np.testing.assert_array_equal(blue.uvs, 0)  # pas de vt : uv nuls
+    np.testing.assert_allclose(blue.normals, np.tile([0, 0, 1], (3, 1)))  # flat calculées
+
+
+@pytest.mark.parametrize("face", [b"f 1 2 5", b"f 1 2 -5", b"f 1/4 2/1 3/1", b"f 1 2"])
+def test_obj_bad_faces(tmp_path, face):
+    data = b"v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nvt 0 0\n" + face + b"\n"
+    with pytest.raises(ValueError):
+        load_obj(write(tmp_path, "c.obj", data))
+
+
+# ───────────────────────────────────────────────
+# STL BINAIRE
+# ───────────────────────────────────────────────
+def stl_bytes(triangles, header=b"binary"):
+    out = header.ljust(80, b" ") + struct.pack("<I", len(triangles))
+    for tri in triangles:
+        out += struct.pack("<12fH", *([0.0] * 3 + [c for p in tri for c in p]), 0)
+    return out
+
+
+@pytest.mark.parametrize("chunk_bytes", [1 << 22, 50])
+def test_stl(tmp_path, chunk_bytes):
+    tris = fan(SQUARE, (0, 1, 2)) + [[[0, 0, 0], [1, 0, 0], [2, 0, 0]]]
+    mesh = load_stl(write(tmp_path, "a.stl", stl_bytes(tris)), chunk_bytes)["default"]
+    assert corners(mesh) == tris
+    np.testing.assert_array_equal(mesh.normals[:3], np.tile([0, 0, 1], (3, 1)))
+    np.testing.assert_array_equal(mesh.degenerate, [False, True])
+
+
+def test_stl_errors(tmp_path):
+    tris = fan(SQUARE, (0, 1, 2))
+    with pytest.raises(ValueError, match="ASCII"):
+        load_stl(write(tmp_path, "a.stl", b"solid x\nfacet normal 0 0 1\n" + b" " * 80))
+    with pytest.raises(ValueError, match="does not match"):
+        load_stl(write(tmp_path, "b.stl", stl_bytes(tris)[:-1]))
+
+
+# ───────────────────────────────────────────────
+# PLY BINAIRE
+# ───────────────────────────────────────────────
+# triangle, quad et pentagone mêlés, avec material_index par face
+POLYGONS = [((0, 1, 2), 0), ((0, 2, 3, 4), 1), ((1, 5, 6, 7, 2), 1), ((4, 3, 8), 0)]
+PLY_POINTS = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (-1, 0.5, 0),
+              (2, 0, 0), (2.5, 1, 0), (2, 2, 0), (0, 2, 0)]
+
+
+def ply_bytes(endian="<", extras=True, polygons=POLYGONS):
+    fmt = {"<": "binary_little_endian", ">": "binary_big_endian"}[endian]
+    head = ["ply", "format %s 1.0" % fmt, "comment écrit à la main",
+            "element vertex %d" % len(PLY_POINTS),
+            "property float x", "property float y", "property float z",
+            "property uchar red"]
+    body = b"".join(struct.pack(endian + "3fB", *p, 200) for p in PLY_POINTS)
+    if extras:  # élément à taille fixe ignoré, entre les sommets et les faces
+        head += ["element camera 2", "property double fov", "property int id"]
+        body += struct.pack(endian + "di", 60.0, 1) * 2
+    head += ["element face %d" % len(polygons), "property uchar material_index",
+             "property list uchar int vertex_indices"]
+    for poly, mat in polygons:
+        body += struct.pack(endian + "BB%di" % len(poly), mat, len(poly), *poly)
+    if extras:  # élément à liste ignoré, après les faces
+        head += ["element tristrips 1", "property list int int vertex_indices"]
+        body += struct.pack(endian + "i4i", 4, 0, 1, 2, 3)
+    return ("\n".join(head) + "\nend_header\n").encode() + body
+
+
+@pytest.mark.parametrize("endian", ["<", ">"])
+@pytest.mark.parametrize("chunk_bytes", [1 << 22, 7])
+def test_ply_mixed_polygons(tmp_path, endian, chunk_bytes):
+    parts = load_ply(write(tmp_path, "a.ply", ply_bytes(endian)), chunk_bytes)
+    assert sorted(parts) == ["material_0", "material_1"]
+    for mat in (0, 1):
+        expected = fan(PLY_POINTS, *[p for p, m in POLYGONS if m == mat])
+        assert corners(parts["material_%d" % mat]) == expected
+        np.testing.assert_allclose(parts["material_%d" % mat].normals[:, 2], 1.0)
+
+
+def test_ply_triangles_only(tmp_path):
+    data = ply_bytes(extras=False, polygons=[((0, 1, 2), 0), ((0, 2, 3), 0)])
+    parts = load_ply(write(tmp_path, "b.ply", data))
+    mesh = parts["material_0"]
+    assert mesh.vertex_count == len(PLY_POINTS)  # une seule pièce : sommets gardés
+    np.testing.assert_array_equal(mesh.indices, [[0, 1, 2], [0, 2, 3]])
+
+
+def test_ply_errors(tmp_path):
+    data = ply_bytes(extras=False)
+    with pytest.raises(ValueError, match="truncated"):
+        load_ply(write(tmp_path, "a.ply", data[:-3]))
+    with pytest.raises(ValueError, match="binary only"):
+        load_ply(write(tmp_path, "b.ply", data.replace(b"binary_little_endian", b"ascii")))
+    bad = data.replace(struct.pack("<BB3i", 0, 3, 4, 3, 8), struct.pack("<BB3i", 0, 3, 4, 3, 99))
+    with pytest.raises(ValueError, match="out of range"):
+        load_ply(write(tmp_path, "c.ply", bad))
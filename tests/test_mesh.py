@@ -0,0 +1,70 @@
+# test_mesh.py – Soudure des sommets (weld, MeshBuilder)
+# Python 3.x  +  NumPy  +  pytest
+import numpy as np
+
+from mesh import Mesh, MeshBuilder, unique_rows, weld
+
+
+def quad_soup():
+    # carré unité en 2 triangles, 6 sommets dont 2 doublons
+    p = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 0, 0), (1, 1, 0), (0, 1, 0)]
+    uv = [(x, y) for x, y, _ in p]
+    return Mesh(np.array(p), np.array(uv))
+
+
+def corners(mesh):
+    # triangles exprimés en positions : indépendant de la numérotation
+    return mesh.positions[mesh.indices]
+
+
+def test_weld_round_trip():
+    soup = quad_soup()
+    out = weld(soup)
+    assert out.vertex_count == 4
+    assert len(out) == 2
+    np.testing.assert_array_equal(corners(out), corners(soup))
+    np.testing.assert_array_equal(out.uvs[out.indices], soup.uvs[soup.indices])
+    assert out.weld_stats.vertices_in == 6 and out.weld_stats.saved_vertices == 2
+
+
+def test_weld_within_eps():
+    soup = quad_soup()
+    soup.positions[3] += 1e-8  # bruit sous WELD_EPS → même sommet
+    assert weld(soup).vertex_count == 4
+    assert weld(soup, eps=0).vertex_count == 5
+
+
+def test_weld_keeps_uv_seams_and_hard_edges():
+    soup = quad_soup()
+    soup.uvs[3] = (0.5, 0.5)  # même position, uv différente : couture gardée
+    assert weld(soup).vertex_count == 5
+    soup = quad_soup()
+    soup.normals = np.tile([0, 0, 1], (6, 1)).astype(np.float32)
+    soup.normals[4] = (0, 1, 0)  # arête vive : normales distinctes
+    out = weld(soup)
+    assert out.vertex_count == 5
+    np.testing.assert_array_equal(out.normals[out.indices], soup.normals[soup.indices])
+
+
+def test_weld_carries_degenerate_mask():
+    soup = quad_soup()
+    soup.degenerate = np.array([False, True])
+    np.testing.assert_array_equal(weld(soup).degenerate, [False, True])
+
+
+def test_builder_welds_quads():
+    b = MeshBuilder()
+    b.add_quad((0, 0, 0, 0, 0), (1, 0, 0, 1, 0), (1, 1, 0, 1, 1), (0, 1, 0, 0, 1))
+    b.add_quad((1, 0, 0, 1, 0), (2, 0, 0, 2, 0), (2, 1, 0, 2, 1), (1, 1, 0, 1, 1))
+    assert len(b) == 4
+    out = b.build()
+    assert out.vertex_count == 6 and len(out) == 4
+    assert out.indices.dtype == np.uint32
+
+
+def test_unique_rows():
+    q = np.array([[1, 2, 3], [4, 5, 6], [1, 2, 3], [-1, 0, 0], [4, 5, 6]])
+    first, inverse = unique_rows(q)
+    assert len(first) == 3
+    np.testing.assert_array_equal(q[first][inverse], q)
+    assert inverse[0] == inverse[2] and inverse[1] == inverse[4]
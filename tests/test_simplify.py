@@ -0,0 +1,103 @@
+# test_simplify.py – Décimation par quadriques : cible, bords et coutures verrouillés
+# Python 3.x  +  NumPy  +  pytest
+import numpy as np
+import pytest
+
+from mesh import Mesh, weld
+from simplify import add_lods, simplify
+
+
+def grid(n, seam_at=None, bump=0.0):
+    """Plaque ouverte n×n quads sur [0,1]² (z = bosse optionnelle) ; seam_at : colonne
+    où les uv sont dédoublés (même position, uv différents de part et d'autre)."""
+    k = np.arange(n + 1) / n
+    x, y = np.meshgrid(k, k, indexing="ij")
+    z = bump * np.sin(np.pi * x) * np.sin(np.pi * y)
+    pos = np.stack([x, y, z], axis=-1).reshape(-1, 3)
+    i = np.arange(n)[:, None] * (n + 1) + np.arange(n)[None, :]
+    a, b, c, d = i, i + n + 1, i + n + 2, i + 1
+    tris = np.concatenate([np.stack([a, b, c], -1), np.stack([a, c, d], -1)]).reshape(-1, 3)
+    soup = pos[tris.reshape(-1)]
+    uv = soup[:, :2].copy()
+    if seam_at is not None:  # faces à droite de la couture : uv décalés
+        cx = soup[:, 0].reshape(-1, 3).mean(axis=1)
+        right = np.repeat(cx > seam_at, 3)
+        uv[right, 0] += 1.0
+    return weld(Mesh(soup, uv))
+
+
+def border_points(mesh):
+    p = mesh.positions
+    on = (np.isclose(p[:, 0], 0) | np.isclose(p[:, 0], 1) |
+          np.isclose(p[:, 1], 0) | np.isclose(p[:, 1], 1))
+    return {tuple(np.round(q, 6)) for q in p[on]}
+
+
+def test_reaches_target():
+    mesh = grid(8, bump=0.2)
+    out = simplify(mesh, 0.5)
+    assert len(out) <= len(mesh) // 2 + 1
+    assert out.simplify_stats.triangles_in == len(mesh)
+    assert out.simplify_stats.triangles_out == len(out)
+    assert out.indices.max() < out.vertex_count
+
+
+def test_flat_plate_keeps_area_and_orientation():
+    out = simplify(grid(8), 0.25)
+    tri = out.positions[out.indices].astype(np.float64)
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    assert (n[:, 2] > 0).all()                        # aucune face retournée
+    assert np.isclose(0.5 * n[:, 2].sum(), 1.0)       # la plaque reste entière
+    np.testing.assert_allclose(out.positions[:, 2], 0, atol=1e-6)
+
+
+def test_open_border_is_locked():
+    mesh = grid(8)
+    out = simplify(mesh, 0.1)
+    assert len(out) < len(mesh)
+    assert border_points(out) == border_points(mesh)  # aucun point du bord bougé
+
+
+def test_uv_seam_is_locked():
+    mesh = grid(8, seam_at=0.5)
+    assert mesh.vertex_count == 81 + 9
+    out = simplify(mesh, 0.1)
+    on_seam = np.isclose(out.positions[:, 0], 0.5)
+    # les 9 points de la couture, chacun avec ses deux uv
+    assert on_seam.sum() == 18
+    seam_uv = np.sort(out.uvs[on_seam, 0])
+    np.testing.assert_allclose(seam_uv, [0.5] * 9 + [1.5] * 9)
+    # chaque face garde ses uv d'un seul côté de la couture
+    u = out.uvs[out.indices, 0]
+    assert ((u <= 0.5 + 1e-6).all(axis=1) | (u >= 1.5 - 1e-6).all(axis=1)).all()
+
+
+def test_caller_lock():
+    mesh = grid(8, bump=0.2)
+    lock = np.isclose(mesh.positions[:, 1], 0.5)
+    out = simplify(mesh, 0.1, lock=lock)
+    kept = {tuple(np.round(q, 6)) for q in out.positions}
+    assert all(tuple(np.round(q, 6)) in kept for q in mesh.positions[lock])
+
+
+def test_max_error_zero_only_removes_coplanar_points():
+    out = simplify(grid(8, bump=0.2), max_error=0.0)
+    assert out.simplify_stats.error == 0.0
+    flat = simplify(grid(8), max_error=1e-12)
+    assert len(flat) < 128
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        simplify(grid(2))
+    with pytest.raises(ValueError):
+        simplify(grid(2), 1.5)
+
+
+def test_add_lods_names_and_normals():
+    mesh = grid(8, bump=0.2)
+    mesh.normals = np.tile([0, 0, 1], (mesh.vertex_count, 1)).astype(np.float32)
+    parts = add_lods({"plate": mesh}, (0.5, 0.25))
+    assert list(parts) == ["plate", "plate_lod1", "plate_lod2"]
+    assert len(parts["plate_lod1"]) > len(parts["plate_lod2"])
+    assert parts["plate_lod2"].normals is not None
@@ -0,0 +1,101 @@
+# test_symmetry.py – Miroir et copies tournées : winding, couture soudée, faces du plan
+# Python 3.x  +  NumPy  +  pytest
+import math
+
+import numpy as np
+import pytest
+
+from mesh import Mesh
+from normals import compute_normals
+from symmetry import MIRROR_X, mirror, rotate_copies, rotation, symmetrize
+
+
+def half_plate():
+    # plaque x ∈ [0, 1], y ∈ [0, 2] : 2 quads, 6 sommets dont 3 sur le plan x = 0
+    p = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (1, 2, 0), (0, 2, 0)]
+    return Mesh(np.array(p), np.array(p)[:, 1:], [[0, 1, 2], [0, 2, 3], [3, 2, 4], [3, 4, 5]])
+
+
+def face_normals(mesh):
+    t = mesh.positions[mesh.indices].astype(np.float64)
+    return np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+
+
+def test_mirror_winding_and_seam():
+    out = mirror(half_plate())
+    assert out.vertex_count == 9   # 6 + 6 - 3 sommets de couture partagés
+    assert len(out) == 8
+    n = face_normals(out)
+    assert (n[:, 2] > 0).all()     # copie réfléchie : winding rétabli
+    assert np.isclose(0.5 * n[:, 2].sum(), 4.0)
+    np.testing.assert_array_equal(np.sort(out.positions[:, 0]), [-1] * 3 + [0] * 3 + [1] * 3)
+
+
+def test_mirror_keeps_uv_seams_apart():
+    # couture uv le long du plan : (0,1,0) dédoublé, uv différents en haut et en bas
+    mesh = half_plate()
+    mesh = Mesh(np.vstack([mesh.positions, mesh.positions[3]]),
+                np.vstack([mesh.uvs, [9.0, 9.0]]), [[0, 1, 2], [0, 2, 3], [6, 2, 4], [6, 4, 5]])
+    out = mirror(mesh)
+    assert out.vertex_count == 10  # 7 + 7 - 4 sommets du plan, chacun soudé à sa copie
+    on_seam = (out.positions == (0, 1, 0)).all(axis=1)
+    assert sorted(out.uvs[on_seam].tolist()) == [[1.0, 0.0], [9.0, 9.0]]
+
+
+def test_mirror_offset_plane_and_normals():
+    mesh = compute_normals(half_plate())
+    mesh.normals[:] = (0.6, 0, 0.8)  # normales penchées vers +x
+    out = mirror(mesh, axis=0, center=1.0)
+    right = out.positions[:, 0] > 1.0
+    assert right.sum() == 3 and out.positions[:, 0].max() == 2.0
+    np.testing.assert_allclose(out.normals[right], np.tile([-0.6, 0, 0.8], (3, 1)), atol=1e-6)
+    # normales ±x différentes de part et d'autre du plan : aucun sommet soudé
+    assert out.vertex_count == 12
+
+
+def test_mirror_drops_faces_on_the_plane():
+    # coin de boîte : une face dans le plan x = 0 (capot de la coupe), une face ouverte
+    p = [(0, 0, 0), (0, 1, 0), (0, 0, 1), (1, 0, 0)]
+    mesh = Mesh(np.array(p), None, [[0, 1, 2], [0, 3, 1]])
+    out = mirror(mesh)
+    assert len(out) == 2            # le capot et sa copie (dos à dos) supprimés
+    assert out.vertex_count == 5    # (0,0,0), (0,1,0) et (0,0,1) partagés avec la copie
+    assert sorted(set(out.indices.reshape(-1).tolist())) == [0, 1, 3, 4]  # (0,0,1) sans face
+    assert (face_normals(out)[:, 2] > 0).all()
+
+
+def test_mirror_carries_degenerate_mask():
+    mesh = half_plate()
+    mesh.degenerate = np.array([False, True, False, False])
+    np.testing.assert_array_equal(mirror(mesh).degenerate, [False, True, False, False] * 2)
+
+
+@pytest.mark.parametrize("n", [3, 6, 24])
+def test_rotate_copies_closes_the_disk(n):
+    a = 2 * math.pi / n  # un secteur de disque autour de z
+    wedge = Mesh(np.array([(0, 0, 0), (1, 0, 0), (math.cos(a), math.sin(a), 0)]))
+    out = rotate_copies(wedge, n)
+    assert out.vertex_count == n + 1  # centre commun + un sommet par rayon
+    assert len(out) == n
+    n_z = face_normals(out)[:, 2]
+    assert (n_z > 0).all()
+    assert np.isclose(0.5 * n_z.sum(), 0.5 * n * math.sin(a))
+
+
+def test_rotate_copies_about_other_axis_and_center():
+    wedge = Mesh(np.array([(5, 0, 0), (5, 1, 0), (5, 0, 1)]))
+    out = symmetrize(wedge, rotation(4, axis=0, center=(5, 0, 0)))
+    assert out.vertex_count == 5 and len(out) == 4
+    np.testing.assert_allclose(out.positions[:, 0], 5.0)
+    assert (face_normals(out)[:, 0] > 0).all()  # rotations : pas de changement de sens
+
+
+def test_symmetrize_dispatch():
+    mesh = half_plate()
+    assert symmetrize(mesh, None) is mesh
+    assert rotate_copies(mesh, 1) is mesh
+    assert symmetrize(mesh, MIRROR_X).vertex_count == 9
+    with pytest.raises(ValueError):
+        symmetrize(mesh, ("shear", 0))
+    with pytest.raises(ValueError):
+        rotate_copies(mesh, 0)
@@ -0,0 +1,54 @@
+# test_world.py – Chargeur NUMPOLLIES en flux (world.load_world)
+# Python 3.x  +  NumPy  +  pytest
+import numpy as np
+import pytest
+
+from world import load_world
+
+WORLD = b"""// monde minimal
+NUMPOLLIES 2
+
+// triangle 1
+-1.0 0.0 -1.0 0.0 1.0
+ 1.0 0.0 -1.0 1.0 1.0
+ 1.0 0.0  1.0 1.0 0.0
+
+// triangle 2
+-1.0 1.0 -1.0 0.0 1.0
+ 1.0 1.0 -1.0 1.0 1.0
+ 1.0 1.0  1.0 1.0 0.0
+"""
+
+
+def write(tmp_path, data):
+    path = tmp_path / "World.txt"
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_bytes", [1 << 22, 16, 7, 1])
+def test_load_world_any_chunk_size(tmp_path, chunk_bytes):
+    # blocs coupés au milieu des lignes, des nombres et de l'en-tête
+    mesh = load_world(write(tmp_path, WORLD), chunk_bytes)
+    assert mesh.vertex_count == 6 and len(mesh) == 2
+    np.testing.assert_array_equal(mesh.positions[4], [1, 1, -1])
+    np.testing.assert_array_equal(mesh.uvs[:3], [[0, 1], [1, 1], [1, 0]])
+
+
+def test_load_world_crlf_and_no_final_newline(tmp_path):
+    data = WORLD.rstrip(b"\n").replace(b"\n", b"\r\n")
+    mesh = load_world(write(tmp_path, data), 16)
+    np.testing.assert_array_equal(mesh.positions[5], [1, 1, 1])
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"1 2 3 4 5\n", "NUMPOLLIES"),
+    (b"NUMPOLLIES two\n", "NUMPOLLIES"),
+    (WORLD.replace(b" 1.0 1.0 -1.0 1.0 1.0", b" 1.0 1.0 -1.0 1.0"), "row 5"),
+    (WORLD.replace(b"1.0 0.0  1.0 1.0 0.0", b"1.0 0.0  x 1.0 0.0"), "row 3"),
+    (WORLD.replace(b"NUMPOLLIES 2", b"NUMPOLLIES 3"), "6 vertex rows found"),
+    (WORLD.replace(b"NUMPOLLIES 2", b"NUMPOLLIES 1"), "more vertex rows"),
+])
+def test_load_world_errors(tmp_path, data, message):
+    with pytest.raises(ValueError, match=message):
+        load_world(write(tmp_path, data), 16)